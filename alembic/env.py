@@ -26,6 +26,16 @@ if config.config_file_name is not None:
 # Use SQLModel.metadata directly
 target_metadata = SQLModel.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip schema managed outside the models (full-text search index)."""
+    if type_ == "table" and reflected and compare_to is None:
+        if name.endswith("_fts") or "_fts_" in name:
+            return False
+    if name in ("search_vector", "ix_post_search_vector", "ix_channel_search_vector"):
+        return False
+    return True
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     context.configure(
@@ -34,6 +44,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         render_as_batch=True,  # Enable batch mode for SQLite
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -55,6 +66,7 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             render_as_batch=True,  # Enable batch mode for SQLite
+            include_object=include_object,
         )
 
         with context.begin_transaction():
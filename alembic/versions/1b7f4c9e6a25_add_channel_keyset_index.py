@@ -0,0 +1,33 @@
+"""add channel keyset pagination index
+
+Revision ID: 1b7f4c9e6a25
+Revises: e7a9d3c5b812
+Create Date: 2026-10-18 13:35:22.614408
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b7f4c9e6a25'
+down_revision: Union[str, None] = 'e7a9d3c5b812'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_channel_created_at_id',
+        'channel',
+        ['created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_channel_created_at_id', table_name='channel')
@@ -0,0 +1,45 @@
+"""add media variants
+
+Revision ID: 2d6f8a4c1e93
+Revises: 9e3b7c1d5a62
+Create Date: 2026-10-18 15:20:36.904172
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d6f8a4c1e93'
+down_revision: Union[str, None] = '9e3b7c1d5a62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'mediavariant',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=False),
+        sa.Column('height', sa.Integer(), nullable=False),
+        sa.Column('mime_type', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+        sa.Column('filename', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['sha256'], ['mediablob.sha256'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('sha256', 'kind', 'width', name='uq_mediavariant_sha256_kind_width'),
+    )
+    op.create_index(op.f('ix_mediavariant_sha256'), 'mediavariant', ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_mediavariant_sha256'), table_name='mediavariant')
+    op.drop_table('mediavariant')
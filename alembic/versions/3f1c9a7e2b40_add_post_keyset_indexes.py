@@ -0,0 +1,40 @@
+"""add post keyset pagination indexes
+
+Revision ID: 3f1c9a7e2b40
+Revises: d22de8c8ddf0
+Create Date: 2026-10-18 09:12:41.503112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7e2b40'
+down_revision: Union[str, None] = 'd22de8c8ddf0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_post_channel_id_created_at_id',
+        'post',
+        ['channel_id', 'created_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_post_created_at_id',
+        'post',
+        ['created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_post_created_at_id', table_name='post')
+    op.drop_index('ix_post_channel_id_created_at_id', table_name='post')
@@ -0,0 +1,33 @@
+"""add point transaction history index
+
+Revision ID: 4e9b1d7f2a38
+Revises: f3a7c2e8d516
+Create Date: 2026-10-18 17:54:02.481376
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e9b1d7f2a38'
+down_revision: Union[str, None] = 'f3a7c2e8d516'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_pointtransaction_user_id_created_at_id',
+        'pointtransaction',
+        ['user_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_pointtransaction_user_id_created_at_id', table_name='pointtransaction')
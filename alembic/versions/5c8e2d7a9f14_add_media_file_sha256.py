@@ -0,0 +1,34 @@
+"""add media file sha256
+
+Revision ID: 5c8e2d7a9f14
+Revises: 1b7f4c9e6a25
+Create Date: 2026-10-18 14:02:47.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8e2d7a9f14'
+down_revision: Union[str, None] = '1b7f4c9e6a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'mediafile',
+        sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True),
+    )
+    op.create_index(op.f('ix_mediafile_sha256'), 'mediafile', ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_mediafile_sha256'), table_name='mediafile')
+    op.drop_column('mediafile', 'sha256')
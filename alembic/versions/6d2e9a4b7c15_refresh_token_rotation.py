@@ -0,0 +1,44 @@
+"""refresh token rotation and sweeper indexes
+
+Revision ID: 6d2e9a4b7c15
+Revises: 4e9b1d7f2a38
+Create Date: 2026-10-18 18:31:47.205913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2e9a4b7c15'
+down_revision: Union[str, None] = '4e9b1d7f2a38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # rows issued before this revision have no token_hash and can no
+    # longer be presented; the sweeper removes them once they expire
+    op.add_column('refreshtoken', sa.Column('token_hash', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True))
+    op.add_column('refreshtoken', sa.Column('replaced_by', sqlmodel.sql.sqltypes.AutoString(length=36), nullable=True))
+    op.create_index(op.f('ix_refreshtoken_token_hash'), 'refreshtoken', ['token_hash'], unique=True)
+    op.create_index(op.f('ix_refreshtoken_expires_at'), 'refreshtoken', ['expires_at'], unique=False)
+    op.create_index(
+        'ix_refreshtoken_user_id_revoked_expires_at',
+        'refreshtoken',
+        ['user_id', 'revoked', 'expires_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_refreshtoken_user_id_revoked_expires_at', table_name='refreshtoken')
+    op.drop_index(op.f('ix_refreshtoken_expires_at'), table_name='refreshtoken')
+    op.drop_index(op.f('ix_refreshtoken_token_hash'), table_name='refreshtoken')
+    op.drop_column('refreshtoken', 'replaced_by')
+    op.drop_column('refreshtoken', 'token_hash')
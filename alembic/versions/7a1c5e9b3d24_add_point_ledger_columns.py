@@ -0,0 +1,54 @@
+"""add points ledger columns
+
+Revision ID: 7a1c5e9b3d24
+Revises: 2d6f8a4c1e93
+Create Date: 2026-10-18 16:05:51.207733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1c5e9b3d24'
+down_revision: Union[str, None] = '2d6f8a4c1e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'pointtransaction',
+        sa.Column('applied', sa.Boolean(), server_default='0', nullable=False),
+    )
+    op.add_column(
+        'pointtransaction',
+        sa.Column('idempotency_key', sqlmodel.sql.sqltypes.AutoString(length=128), nullable=True),
+    )
+    op.create_index(
+        op.f('ix_pointtransaction_idempotency_key'),
+        'pointtransaction',
+        ['idempotency_key'],
+        unique=True,
+    )
+    op.create_index(
+        'ix_pointtransaction_applied_id',
+        'pointtransaction',
+        ['applied', 'id'],
+        unique=False,
+    )
+    # Every existing row was already added to user.points when it was written
+    ledger = sa.table('pointtransaction', sa.column('applied', sa.Boolean))
+    op.execute(ledger.update().values(applied=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_pointtransaction_applied_id', table_name='pointtransaction')
+    op.drop_index(op.f('ix_pointtransaction_idempotency_key'), table_name='pointtransaction')
+    op.drop_column('pointtransaction', 'idempotency_key')
+    op.drop_column('pointtransaction', 'applied')
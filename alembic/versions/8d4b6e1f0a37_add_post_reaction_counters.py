@@ -0,0 +1,62 @@
+"""add denormalized reaction counters to post
+
+Revision ID: 8d4b6e1f0a37
+Revises: 3f1c9a7e2b40
+Create Date: 2026-10-18 10:04:17.882950
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4b6e1f0a37'
+down_revision: Union[str, None] = '3f1c9a7e2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('like_count', sa.Integer(), nullable=False, server_default='0')
+        )
+        batch_op.add_column(
+            sa.Column('dislike_count', sa.Integer(), nullable=False, server_default='0')
+        )
+
+    op.create_index(
+        'ix_postreaction_post_id_reaction_type',
+        'postreaction',
+        ['post_id', 'reaction_type'],
+        unique=False,
+    )
+
+    # Backfill the counters from existing reactions
+    op.execute(
+        """
+        UPDATE post SET
+            like_count = (
+                SELECT COUNT(*) FROM postreaction
+                WHERE postreaction.post_id = post.id
+                  AND postreaction.reaction_type IN ('like', 'LIKE')
+            ),
+            dislike_count = (
+                SELECT COUNT(*) FROM postreaction
+                WHERE postreaction.post_id = post.id
+                  AND postreaction.reaction_type IN ('dislike', 'DISLIKE')
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_postreaction_post_id_reaction_type', table_name='postreaction')
+
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_column('dislike_count')
+        batch_op.drop_column('like_count')
@@ -0,0 +1,59 @@
+"""add content-addressed media blob store
+
+Revision ID: 9e3b7c1d5a62
+Revises: 5c8e2d7a9f14
+Create Date: 2026-10-18 14:41:09.552817
+
+Existing files keep their old location; run
+``python -m app.manage dedupe-uploads`` to move them into the blob store.
+"""
+import posixpath
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3b7c1d5a62'
+down_revision: Union[str, None] = '5c8e2d7a9f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'mediablob',
+        sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('sha256'),
+    )
+    op.add_column(
+        'mediafile',
+        sa.Column('original_name', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True),
+    )
+
+    # Old uploads were stored as <uuid>/<client name>; recover the name.
+    media = sa.table(
+        'mediafile',
+        sa.column('id', sa.Integer),
+        sa.column('filename', sa.String),
+        sa.column('original_name', sa.String),
+    )
+    conn = op.get_bind()
+    for file_id, filename in conn.execute(sa.select(media.c.id, media.c.filename)).all():
+        conn.execute(
+            media.update()
+            .where(media.c.id == file_id)
+            .values(original_name=posixpath.basename(filename))
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('mediafile', 'original_name')
+    op.drop_table('mediablob')
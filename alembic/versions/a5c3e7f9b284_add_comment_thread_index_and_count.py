@@ -0,0 +1,50 @@
+"""add comment thread index and post comment counter
+
+Revision ID: a5c3e7f9b284
+Revises: 6d2e9a4b7c15
+Create Date: 2026-10-18 19:12:36.640218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c3e7f9b284'
+down_revision: Union[str, None] = '6d2e9a4b7c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('comment_count', sa.Integer(), nullable=False, server_default='0')
+        )
+
+    op.create_index(
+        'ix_comment_post_id_created_at_id',
+        'comment',
+        ['post_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+    # Backfill the counter from existing comments
+    op.execute(
+        """
+        UPDATE post SET comment_count = (
+            SELECT COUNT(*) FROM comment WHERE comment.post_id = post.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comment_post_id_created_at_id', table_name='comment')
+
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_column('comment_count')
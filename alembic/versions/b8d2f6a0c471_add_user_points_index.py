@@ -0,0 +1,28 @@
+"""add user points index
+
+Revision ID: b8d2f6a0c471
+Revises: 7a1c5e9b3d24
+Create Date: 2026-10-18 16:48:13.660295
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d2f6a0c471'
+down_revision: Union[str, None] = '7a1c5e9b3d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_user_points'), 'user', ['points'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_points'), table_name='user')
@@ -0,0 +1,88 @@
+"""add full-text search index for posts and channels
+
+Revision ID: c5e2a8f41d93
+Revises: 8d4b6e1f0a37
+Create Date: 2026-10-18 11:26:53.140276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e2a8f41d93'
+down_revision: Union[str, None] = '8d4b6e1f0a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> indexed columns, in weight order
+INDEXED = {
+    'post': ('title', 'content'),
+    'channel': ('name', 'bio'),
+}
+
+
+def _sqlite_upgrade(table, columns):
+    fts = f'{table}_fts'
+    cols = ', '.join(columns)
+    new_vals = ', '.join(f'new.{c}' for c in columns)
+    old_vals = ', '.join(f'old.{c}' for c in columns)
+    op.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END"
+    )
+    # Index the rows that already exist
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _postgres_upgrade(table, columns):
+    weighted = ' || '.join(
+        f"setweight(to_tsvector('simple', coalesce({c}, '')), '{w}')"
+        for c, w in zip(columns, 'AB')
+    )
+    op.execute(
+        f'ALTER TABLE "{table}" ADD COLUMN search_vector tsvector '
+        f'GENERATED ALWAYS AS ({weighted}) STORED'
+    )
+    op.execute(
+        f'CREATE INDEX ix_{table}_search_vector ON "{table}" USING GIN (search_vector)'
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table, columns in INDEXED.items():
+        if dialect == 'sqlite':
+            _sqlite_upgrade(table, columns)
+        elif dialect == 'postgresql':
+            _postgres_upgrade(table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table in INDEXED:
+        if dialect == 'sqlite':
+            fts = f'{table}_fts'
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+            op.execute(f'DROP TABLE IF EXISTS {fts}')
+        elif dialect == 'postgresql':
+            op.execute(f'DROP INDEX IF EXISTS ix_{table}_search_vector')
+            op.execute(f'ALTER TABLE "{table}" DROP COLUMN IF EXISTS search_vector')
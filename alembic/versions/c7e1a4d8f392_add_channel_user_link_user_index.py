@@ -0,0 +1,33 @@
+"""add channel membership index by user
+
+Revision ID: c7e1a4d8f392
+Revises: a5c3e7f9b284
+Create Date: 2026-10-18 19:48:05.117342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e1a4d8f392'
+down_revision: Union[str, None] = 'a5c3e7f9b284'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_channel_user_link_user_id_channel_id',
+        'channel_user_link',
+        ['user_id', 'channel_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_channel_user_link_user_id_channel_id', table_name='channel_user_link')
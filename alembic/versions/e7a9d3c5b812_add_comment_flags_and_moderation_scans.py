@@ -0,0 +1,60 @@
+"""add comment moderation flags and moderation scan progress table
+
+Revision ID: e7a9d3c5b812
+Revises: c5e2a8f41d93
+Create Date: 2026-10-18 12:41:09.377615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a9d3c5b812'
+down_revision: Union[str, None] = 'c5e2a8f41d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Plain ADD COLUMN (no batch table rebuild) leaves the search triggers alone
+    op.add_column(
+        'comment',
+        sa.Column('flagged', sa.Boolean(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'comment',
+        sa.Column('flag_reason', sqlmodel.sql.sqltypes.AutoString(length=256), nullable=True),
+    )
+
+    op.create_table('moderationscan',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False),
+        sa.Column('reason', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True),
+        sa.Column('last_post_id', sa.Integer(), nullable=False),
+        sa.Column('last_comment_id', sa.Integer(), nullable=False),
+        sa.Column('posts_total', sa.Integer(), nullable=False),
+        sa.Column('comments_total', sa.Integer(), nullable=False),
+        sa.Column('posts_scanned', sa.Integer(), nullable=False),
+        sa.Column('comments_scanned', sa.Integer(), nullable=False),
+        sa.Column('posts_flagged', sa.Integer(), nullable=False),
+        sa.Column('comments_flagged', sa.Integer(), nullable=False),
+        sa.Column('error', sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('moderationscan')
+
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.drop_column('flag_reason')
+        batch_op.drop_column('flagged')
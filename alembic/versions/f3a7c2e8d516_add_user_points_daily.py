@@ -0,0 +1,64 @@
+"""add daily user points rollups
+
+Revision ID: f3a7c2e8d516
+Revises: b8d2f6a0c471
+Create Date: 2026-10-18 17:22:40.118934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7c2e8d516'
+down_revision: Union[str, None] = 'b8d2f6a0c471'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'userpointsdaily',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day'),
+    )
+    op.create_index(
+        'ix_userpointsdaily_day_user_id',
+        'userpointsdaily',
+        ['day', 'user_id'],
+        unique=False,
+    )
+
+    # Backfill from the rows the aggregator has already applied
+    ledger = sa.table(
+        'pointtransaction',
+        sa.column('user_id', sa.Integer),
+        sa.column('points', sa.Integer),
+        sa.column('applied', sa.Boolean),
+        sa.column('created_at', sa.DateTime),
+    )
+    day = sa.func.date(ledger.c.created_at)
+    rollups = sa.table(
+        'userpointsdaily',
+        sa.column('user_id', sa.Integer),
+        sa.column('day', sa.Date),
+        sa.column('points', sa.Integer),
+    )
+    op.execute(rollups.insert().from_select(
+        ['user_id', 'day', 'points'],
+        sa.select(ledger.c.user_id, day, sa.func.sum(ledger.c.points))
+        .where(ledger.c.applied == sa.true())
+        .group_by(ledger.c.user_id, day),
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_userpointsdaily_day_user_id', table_name='userpointsdaily')
+    op.drop_table('userpointsdaily')
@@ -1,23 +1,33 @@
-from datetime import datetime, timedelta
-from uuid import uuid4
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pydantic import BaseModel
 
-from app.database import engine
-from app.models import User, RefreshToken
+from app.db import get_async_session, get_session
+from app.models import User
+from app.core.refresh_tokens import (
+    RefreshTokenInvalid,
+    issue_refresh_token,
+    maybe_schedule_sweep,
+    rotate_refresh_token,
+)
+from app.core.user_cache import user_cache
 from app.core.security import (
-    verify_password,
-    hash_password,
+    PasswordPoolBusy,
     create_access_token,
-    create_refresh_token,
     decode_token,
+    hash_password_async,
+    needs_rehash,
+    verify_password_async,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
 # ──────────────────────────────────── request models
@@ -36,67 +46,130 @@ class UpdateUsernameRequest(BaseModel):
 
 
 # ──────────────────────────────────── helpers
-def db() -> Session:
-    with Session(engine) as session:
-        yield session
-
-
-def get_user(user_id: int, session: Session) -> User:
-    user = session.get(User, user_id)
+def _active(user: Optional[User]) -> User:
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="inactive / unknown user")
     return user
 
 
-async def current_user(token: str = Depends(oauth2_scheme),
-                       session: Session = Depends(db)) -> User:
+def _token_user_id(token: str) -> int:
     try:
-        payload = decode_token(token)
-        uid = int(payload["sub"])
+        return int(decode_token(token)["sub"])
     except Exception:
         raise HTTPException(status_code=401, detail="invalid token")
-    return get_user(uid, session)
+
+
+def get_user(user_id: int, session: Session) -> User:
+    """
+    The active user `user_id`, from the principal cache when possible.
+
+    Cached users are detached copies: read them freely, but load the row
+    into the session before changing it.
+    """
+    user = user_cache.get(user_id)
+    if user is None:
+        user = session.get(User, user_id)
+        if user is not None:
+            user_cache.put(user)
+    return _active(user)
+
+
+async def get_user_async(user_id: int, session: AsyncSession) -> User:
+    """`get_user` for routes on the async session."""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await session.get(User, user_id)
+        if user is not None:
+            user_cache.put(user)
+    return _active(user)
+
+
+async def current_user(token: str = Depends(oauth2_scheme),
+                       session: Session = Depends(get_session)) -> User:
+    return get_user(_token_user_id(token), session)
+
+
+async def current_user_async(token: str = Depends(oauth2_scheme),
+                             session: AsyncSession = Depends(get_async_session)) -> User:
+    """`current_user` sharing the route's async session."""
+    return await get_user_async(_token_user_id(token), session)
+
+
+async def optional_current_user_async(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session),
+) -> Optional[User]:
+    """Like `current_user_async`, but anonymous (or bad-token) callers get None."""
+    if not token:
+        return None
+    try:
+        return await current_user_async(token, session)
+    except HTTPException:
+        return None
 
 
 # ──────────────────────────────────── routes
+def _password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="too many sign-in attempts in progress, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _user_by_email(session: Session, email: str) -> Optional[User]:
+    return session.exec(select(User).where(User.email == email)).first()
+
+
+def _save(session: Session, *rows) -> None:
+    for row in rows:
+        session.add(row)
+    session.commit()
+    for row in rows:
+        session.refresh(row)
+
+
 @router.post("/register")
-def register(request: RegisterRequest, session: Session = Depends(db)):
-    if session.exec(select(User).where(User.email == request.email)).first():
+async def register(request: RegisterRequest, session: Session = Depends(get_session)):
+    # Hashing runs in the password pool; the blocking DB calls go to the
+    # threadpool so neither holds up the event loop.
+    if await run_in_threadpool(_user_by_email, session, request.email):
         raise HTTPException(400, "email already registered")
+    try:
+        hashed = await hash_password_async(request.password)
+    except PasswordPoolBusy:
+        raise _password_pool_busy()
     user = User(
         email=request.email, 
-        hashed_password=hash_password(request.password), 
+        hashed_password=hashed, 
         role=request.role
     )
-    session.add(user)
-    session.commit()
-    session.refresh(user)
+    await run_in_threadpool(_save, session, user)
     return {"id": user.id, "email": user.email, "role": user.role}
 
 
 @router.post("/login")
-def login(
+async def login(
     form: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(db),
+    session: Session = Depends(get_session),
 ):
-    user = session.exec(
-        select(User).where(User.email == form.username)
-    ).first()
+    user = await run_in_threadpool(_user_by_email, session, form.username)
 
-    if not user or not verify_password(form.password, user.hashed_password):
+    try:
+        valid = bool(user) and await verify_password_async(form.password, user.hashed_password)
+        if valid and needs_rehash(user.hashed_password):
+            # BCRYPT_ROUNDS changed since this hash was made; upgrade it now
+            # that we briefly hold the plain password
+            user.hashed_password = await hash_password_async(form.password)
+    except PasswordPoolBusy:
+        raise _password_pool_busy()
+    if not valid:
         raise HTTPException(status_code=400, detail="invalid credentials")
 
     access_token = create_access_token(user.id)
-    refresh_token = create_refresh_token(user.id)
-
-    session.add(
-        RefreshToken(
-            id=str(uuid4()),
-            user_id=user.id,
-            expires_at=datetime.utcnow() + timedelta(days=7),
-        )
-    )
-    session.commit()
+    token_row, refresh_token = issue_refresh_token(session, user.id)
+    await run_in_threadpool(_save, session, user, token_row)
+    maybe_schedule_sweep()
 
     return {
         "access_token": access_token,
@@ -107,21 +180,27 @@ def login(
 
 
 @router.post("/refresh")
-def refresh(request: RefreshRequest, session: Session = Depends(db)):
+def refresh(request: RefreshRequest, session: Session = Depends(get_session)):
+    """Trade a refresh token for a new access token and a new refresh token.
+
+    Each refresh token works once; keep the one returned here.
+    """
     try:
         payload = decode_token(request.refresh_token)
         uid = int(payload["sub"])
     except Exception:
         raise HTTPException(401, "invalid refresh token")
 
-    db_token = session.exec(
-        select(RefreshToken).where(RefreshToken.user_id == uid,
-                                   RefreshToken.revoked == False)  # noqa: E712
-    ).first()
-    if not db_token or db_token.expires_at < datetime.utcnow():
+    try:
+        refresh_token = rotate_refresh_token(session, uid, payload.get("jti"))
+    except RefreshTokenInvalid:
         raise HTTPException(401, "refresh token expired / revoked")
 
-    return {"access_token": create_access_token(uid), "token_type": "bearer"}
+    return {
+        "access_token": create_access_token(uid),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
 
 
 @router.get("/me")
@@ -138,8 +217,8 @@ def me(user: User = Depends(current_user)):
 @router.put("/username")
 def update_username(
     request: UpdateUsernameRequest,
-    user: User = Depends(current_user),
-    session: Session = Depends(db)
+    current: User = Depends(current_user),
+    session: Session = Depends(get_session)
 ):
     """Update the current user's username."""
     if not request.username or len(request.username.strip()) == 0:
@@ -152,16 +231,19 @@ def update_username(
     existing_user = session.exec(
         select(User).where(
             User.username == request.username.strip(),
-            User.id != user.id
+            User.id != current.id
         )
     ).first()
     
     if existing_user:
         raise HTTPException(400, "Username already taken")
     
+    # `current` may be a cached copy; change the row itself
+    user = session.get(User, current.id)
     user.username = request.username.strip()
     session.add(user)
     session.commit()
+    user_cache.invalidate(user.id)
     session.refresh(user)
     
     return {
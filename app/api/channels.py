@@ -1,18 +1,31 @@
 # app/api/channels.py
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session, select, insert
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import and_
+from sqlmodel import Session, func, select, insert
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.api.posts import PostRead, Post  
 from app.models.post import PostWithAuthor
 
-from app.db import get_session
+from app.db import get_async_session, get_session
 from app.models.channel import Channel, ChannelCreate, ChannelRead, ChannelUpdate
-from app.api.auth import current_user
+from app.api.auth import current_user, optional_current_user_async
 from app.models.user import User
 from app.models.association_tables import channel_user_link
 from app.core.dependencies import require_moderator
-from app.models.media_file import MediaFile
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    keyset_page,
+    set_next_cursor,
+    split_page,
+)
+from app.core import cascade, response_cache, search
+from app.core.jobs import enqueue
+from app.core.storage import purge_blobs
+from app.core.post_loader import build_posts_with_author, select_posts_with_author
 
 router = APIRouter(prefix="/channels", tags=["channels"])
 
@@ -55,36 +68,74 @@ def create_channel(
     return chan
 
 
+def _channel_listing(user_id: int):
+    """
+    Channels with the caller's membership flag and member/post counts.
+
+    Membership is a LEFT JOIN against channel_user_link and both counts are
+    correlated subqueries served by the (channel_id, ...) primary key and
+    post index, so any page of channels costs a single statement.
+    """
+    mine = channel_user_link.alias("mine")
+    member_count = (
+        select(func.count())
+        .select_from(channel_user_link)
+        .where(channel_user_link.c.channel_id == Channel.id)
+        .scalar_subquery()
+    )
+    post_count = (
+        select(func.count(Post.id))
+        .where(Post.channel_id == Channel.id)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(
+            Channel,
+            mine.c.user_id.is_not(None).label("joined"),
+            member_count.label("member_count"),
+            post_count.label("post_count"),
+        )
+        .outerjoin(mine, and_(mine.c.channel_id == Channel.id, mine.c.user_id == user_id))
+    )
+    return stmt, mine
+
+
+def _channel_dict(row) -> dict:
+    ch = row[0]
+    return {
+        "id": ch.id,
+        "name": ch.name,
+        "bio": ch.bio,
+        "owner_id": ch.owner_id,
+        "logo_filename": ch.logo_filename,
+        "created_at": ch.created_at,
+        "updated_at": ch.updated_at,
+        "joined": bool(row.joined),
+        "member_count": row.member_count,
+        "post_count": row.post_count,
+    }
+
+
 @router.get(
     "/",
     response_model=List[dict],
 )
 def list_channels(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    joined: Optional[bool] = None,
     session: Session = Depends(get_session),
     current: User = Depends(current_user),
 ):
-    channels = session.exec(select(Channel)).all()
-    result = []
-    for ch in channels:
-        joined = bool(
-            session.exec(
-                select(channel_user_link).where(
-                    channel_user_link.c.channel_id == ch.id,
-                    channel_user_link.c.user_id == current.id
-                )
-            ).first()
-        )
-        result.append({
-            "id": ch.id,
-            "name": ch.name,
-            "bio": ch.bio,
-            "owner_id": ch.owner_id,
-            "logo_filename": ch.logo_filename,
-            "created_at": ch.created_at,
-            "updated_at": ch.updated_at,
-            "joined": joined
-        })
-    return result
+    """Oldest channels first; pass joined=true/false to filter by membership."""
+    stmt, mine = _channel_listing(current.id)
+    if joined is not None:
+        stmt = stmt.where(mine.c.user_id.is_not(None) if joined else mine.c.user_id.is_(None))
+    stmt = keyset_page(stmt, Channel.created_at, Channel.id, cursor, limit, descending=False)
+    rows, next_cursor = split_page(session.exec(stmt).all(), limit, key=lambda row: row[0])
+    set_next_cursor(response, next_cursor)
+    return [_channel_dict(row) for row in rows]
 
 
 @router.get(
@@ -93,36 +144,19 @@ def list_channels(
 )
 def search_channels(
     q: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
     session: Session = Depends(get_session),
     current: User = Depends(current_user),
 ):
-    # Search channels by name or bio
-    channels = session.exec(
-        select(Channel).where(
-            Channel.name.ilike(f"%{q}%") | Channel.bio.ilike(f"%{q}%")
-        )
-    ).all()
-    result = []
-    for ch in channels:
-        joined = bool(
-            session.exec(
-                select(channel_user_link).where(
-                    channel_user_link.c.channel_id == ch.id,
-                    channel_user_link.c.user_id == current.id
-                )
-            ).first()
-        )
-        result.append({
-            "id": ch.id,
-            "name": ch.name,
-            "bio": ch.bio,
-            "owner_id": ch.owner_id,
-            "logo_filename": ch.logo_filename,
-            "created_at": ch.created_at,
-            "updated_at": ch.updated_at,
-            "joined": joined
-        })
-    return result
+    # Search channels by name or bio, best match first
+    channels = search.search_channels(session, q, limit, offset)
+    if not channels:
+        return []
+    stmt, _ = _channel_listing(current.id)
+    rows = session.exec(stmt.where(Channel.id.in_([ch.id for ch in channels]))).all()
+    by_id = {row[0].id: row for row in rows}
+    return [_channel_dict(by_id[ch.id]) for ch in channels if ch.id in by_id]
 
 
 @router.get(
@@ -149,63 +183,41 @@ def get_channel(
     response_model=List[PostWithAuthor],
     status_code=status.HTTP_200_OK,
 )
-def list_channel_posts(
+async def list_channel_posts(
     channel_id: int,
-    session: Session = Depends(get_session),
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_async_session),
+    viewer: Optional[User] = Depends(optional_current_user_async),
 ):
+    cached = response_cache.lookup(request, [response_cache.channel_tag(channel_id)],
+                                   cacheable=viewer is None)
+    if cached.response:
+        return cached.response
+
     # Check if channel exists
-    channel = session.get(Channel, channel_id)
+    channel = await session.get(Channel, channel_id)
     if not channel:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Channel not found"
         )
     
-    # Get all posts in channel with author information using JOIN
-    stmt = (
-        select(
-            Post.id,
-            Post.title,
-            Post.content,
-            Post.channel_id,
-            Post.author_id,
-            Post.created_at,
-            Post.updated_at,
-            User.email.label("author_email"),
-            User.username.label("author_username")
-        )
-        .join(User, Post.author_id == User.id)
-        .where(Post.channel_id == channel_id)
-        .order_by(Post.created_at.desc())
-    )
-    
-    results = session.exec(stmt).all()
+    # Get one page of posts in channel with author information using JOIN
+    stmt = select_posts_with_author().where(Post.channel_id == channel_id)
+    stmt = keyset_page(stmt, Post.created_at, Post.id, cursor, limit)
     
-    # Convert to PostWithAuthor objects
-    posts = []
-    for row in results:
-        # Get files for this post
-        files = session.exec(
-            select(MediaFile).where(MediaFile.post_id == row.id)
-        ).all()
-        post = PostWithAuthor(
-            id=row.id,
-            title=row.title,
-            content=row.content,
-            channel_id=row.channel_id,
-            author_id=row.author_id,
-            created_at=row.created_at,
-            updated_at=row.updated_at,
-            author_email=row.author_email,
-            author_username=row.author_username,
-            files=[file.dict() for file in files],
-            like_count=0,  # Will be populated separately if needed
-            dislike_count=0,  # Will be populated separately if needed
-            is_saved=False  # Will be populated separately if needed
-        )
-        posts.append(post)
+    results, next_cursor = split_page((await session.exec(stmt)).all(), limit)
+    set_next_cursor(response, next_cursor)
     
-    return posts
+    # Attachments, reaction counts and saved flags come back per page,
+    # not per post
+    result = await session.run_sync(
+        build_posts_with_author, results, viewer.id if viewer else None
+    )
+    return cached.store(result, response, headers=[NEXT_CURSOR_HEADER])
 
 
 @router.post("/{channel_id}/join")
@@ -272,8 +284,12 @@ def delete_channel(
     ):
         raise HTTPException(status_code=403, detail="Not authorized to delete this channel")
     
-    session.delete(channel)
+    # Posts, their rows and the memberships go too, one DELETE per table
+    unreferenced = cascade.delete_channel(session, channel_id)
     session.commit()
+    response_cache.invalidate(response_cache.posts_tag(), response_cache.channel_tag(channel_id))
+    if unreferenced:
+        enqueue(purge_blobs, unreferenced)
     return {"ok": True}
 
 
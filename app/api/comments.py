@@ -1,9 +1,11 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
+from app.db import get_async_session, get_session
 from app.models.comment import (
     Comment, 
     CommentCreate, 
@@ -11,14 +13,34 @@ from app.models.comment import (
     CommentWithAuthor
 )
 from app.models.post import Post
-from app.api.auth import current_user
+from app.api.auth import current_user, current_user_async
 from app.models.user import User
-from app.gamification.service import GamificationService
+from app.gamification.service import (
+    IDEMPOTENCY_KEY_HEADER,
+    GamificationService,
+    request_award_key,
+)
 from app.gamification.models import ActionType
+from app.core import response_cache
+from app.core.counters import apply_comment_change
+from app.core.moderation import flag_reason_for, get_matcher
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    keyset_page,
+    set_next_cursor,
+    split_page,
+)
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
 
+def _replayed_comment(session: Session, award_key: Optional[str]) -> Optional[Comment]:
+    """The comment created by an earlier request with the same Idempotency-Key."""
+    award = GamificationService(session).find_award(award_key)
+    return session.get(Comment, award.related_entity_id) if award else None
+
+
 @router.post(
     "/",
     response_model=CommentRead,
@@ -28,7 +50,14 @@ def create_comment(
     payload: CommentCreate,
     session: Session = Depends(get_session),
     current: User = Depends(current_user),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER, max_length=64),
 ):
+    # A retried request gets the comment its first attempt created
+    award_key = request_award_key(ActionType.COMMENT, current.id, idempotency_key)
+    earlier = _replayed_comment(session, award_key)
+    if earlier is not None:
+        return earlier
+
     # Check if post exists
     post = session.get(Post, payload.post_id)
     if not post:
@@ -43,11 +72,15 @@ def create_comment(
         post_id=payload.post_id,
         author_id=current.id
     )
+    matches = get_matcher(session).find_all(comment.content)
+    if matches:
+        comment.flagged = True
+        comment.flag_reason = flag_reason_for(matches)
     session.add(comment)
-    session.commit()
-    session.refresh(comment)
+    session.flush()  # assigns comment.id for the ledger entry
+    apply_comment_change(session, post.id, 1)
     
-    # Award points for comment (5 points)
+    # Award points for comment (5 points), committed with the comment
     gamification_service = GamificationService(session)
     gamification_service.award_points(
         user_id=current.id,
@@ -55,8 +88,21 @@ def create_comment(
         action_type=ActionType.COMMENT,
         description=f"Commented on post '{post.title}'",
         related_entity_id=comment.id,
-        related_entity_type="comment"
+        related_entity_type="comment",
+        idempotency_key=award_key,
     )
+    try:
+        session.commit()
+    except IntegrityError:
+        # a concurrent retry with the same key committed first
+        session.rollback()
+        earlier = _replayed_comment(session, award_key)
+        if earlier is None:
+            raise
+        return earlier
+    session.refresh(comment)
+    # listings show the post's comment count
+    response_cache.invalidate(*response_cache.post_tags(post.id, post.channel_id))
     
     return comment
 
@@ -65,20 +111,24 @@ def create_comment(
     "/post/{post_id}",
     response_model=List[CommentWithAuthor],
 )
-def list_post_comments(
+async def list_post_comments(
     post_id: int,
-    session: Session = Depends(get_session),
-    current: User = Depends(current_user),
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_async_session),
+    current: User = Depends(current_user_async),
 ):
+    """Oldest comments first; the next page's cursor is sent in X-Next-Cursor."""
     # Check if post exists
-    post = session.get(Post, post_id)
+    post = await session.get(Post, post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found"
         )
     
-    # Get all comments for the post with author information
+    # Get one page of comments for the post with author information
     stmt = (
         select(
             Comment.id,
@@ -92,10 +142,11 @@ def list_post_comments(
         )
         .join(User, Comment.author_id == User.id)
         .where(Comment.post_id == post_id)
-        .order_by(Comment.created_at.asc())
     )
+    stmt = keyset_page(stmt, Comment.created_at, Comment.id, cursor, limit, descending=False)
     
-    results = session.exec(stmt).all()
+    results, next_cursor = split_page((await session.exec(stmt)).all(), limit)
+    set_next_cursor(response, next_cursor)
     
     # Convert to CommentWithAuthor objects
     comments = []
@@ -140,6 +191,9 @@ def delete_comment(
         )
     
     # Delete comment
+    post = session.get(Post, comment.post_id)
     session.delete(comment)
+    apply_comment_change(session, post.id, -1)
     session.commit()
+    response_cache.invalidate(*response_cache.post_tags(post.id, post.channel_id))
     return None 
\ No newline at end of file
@@ -0,0 +1,45 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db import get_async_session
+from app.api.auth import current_user_async
+from app.models.post import PostWithAuthor
+from app.models.user import User
+from app.core import response_cache
+from app.core.feed import FEED_CACHE_MIN_CHANNELS, feed_page, joined_channel_ids
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    set_next_cursor,
+)
+
+router = APIRouter(prefix="/feed", tags=["feed"])
+
+
+@router.get("", response_model=List[PostWithAuthor])
+async def get_feed(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_async_session),
+    current: User = Depends(current_user_async),
+):
+    """Newest posts from the caller's joined channels; next cursor in X-Next-Cursor."""
+    channel_ids = await session.run_sync(joined_channel_ids, current.id)
+
+    # Heavy users' pages are cached per user. Every joined channel is a
+    # tag, so a post in any of them (or joining/leaving one) refreshes it.
+    tags = [response_cache.feed_tag(current.id),
+            *(response_cache.channel_tag(cid) for cid in channel_ids)]
+    cached = response_cache.lookup(request, tags, vary=str(current.id),
+                                   cacheable=len(channel_ids) >= FEED_CACHE_MIN_CHANNELS)
+    if cached.response:
+        return cached.response
+
+    posts, next_cursor = await session.run_sync(feed_page, current.id, channel_ids, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return cached.store(posts, response, headers=[NEXT_CURSOR_HEADER])
@@ -1,73 +1,195 @@
+import datetime as dt
+import logging
 import os
+from contextlib import suppress
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
-from uuid import uuid4
+from secrets import token_hex
 from typing import List, Optional
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
+from fastapi.staticfiles import StaticFiles
+import aiofiles.os
+import anyio
 
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 
-from app.database import engine
 from app.models.media_file import MediaFile
+from app.models.post import Post
 from app.db import get_session
 from app.api.auth import current_user, User  # reuse auth dependency
+from app.core import response_cache
+from app.core.media_variants import enqueue_variants
+from app.core.storage import MAX_UPLOAD_BYTES, UPLOAD_DIR, UploadTooLarge, link_blob, stream_to_temp
 
-UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-router = APIRouter()
-
+logger = logging.getLogger(__name__)
 
-def db() -> Session:
-    with Session(engine) as session:
-        yield session
+router = APIRouter()
 
 
-@router.post("/upload", response_model=List[MediaFile])
-async def upload_files(
-    files: List[UploadFile] = File(...),
-    post_id: Optional[int] = Form(None),
-    user: User = Depends(current_user),
-    session: Session = Depends(db),
-):
-    print(f"DEBUG: Uploading files with post_id: {post_id}")
+def _save_uploads(session: Session, received: list[tuple[UploadFile, Path, int, str]],
+                  post_id: Optional[int]) -> List[MediaFile]:
+    """Link the streamed temp files into blob storage and record them."""
     saved: list[MediaFile] = []
-
-    for up in files:
-        ext = os.path.splitext(up.filename)[1] or ""
-        folder = UPLOAD_DIR / str(uuid4())
-        folder.mkdir(parents=True, exist_ok=True)
-
-        dest = folder / (up.filename or "file" + ext)
-        contents = await up.read()
-
-        if len(contents) > 10 * 1024 * 1024:  # 10 MB
-            raise HTTPException(400, "file too large (max 10 MB)")
-
-        dest.write_bytes(contents)
-
+    for up, tmp, size, sha256 in received:
         mf = MediaFile(
-            filename=str(dest.relative_to(UPLOAD_DIR)),
+            filename=str(link_blob(session, tmp, sha256, size)),
+            # keep only the final path component of client-supplied names
+            original_name=Path(up.filename or "").name or "file",
             mime_type=up.content_type or "",
-            size=len(contents),
+            size=size,
+            sha256=sha256,
             post_id=post_id,
         )
-        print(f"DEBUG: Created MediaFile with post_id: {mf.post_id}")
         session.add(mf)
         saved.append(mf)
 
     session.commit()
     for mf in saved:
         session.refresh(mf)  # get the DB id
-        print(f"DEBUG: Saved MediaFile {mf.id} with post_id: {mf.post_id}")
-
+        logger.debug("saved MediaFile %s with post_id %s", mf.id, mf.post_id)
+    enqueue_variants(saved)
+    if post_id is not None and (post := session.get(Post, post_id)) is not None:
+        # listings embed the post's attachments
+        response_cache.invalidate(*response_cache.post_tags(post.id, post.channel_id))
     return saved
 
 
+@router.post("/upload", response_model=List[MediaFile])
+async def upload_files(
+    files: List[UploadFile] = File(...),
+    post_id: Optional[int] = Form(None),
+    user: User = Depends(current_user),
+    session: Session = Depends(get_session),
+):
+    logger.debug("uploading %s file(s) with post_id %s", len(files), post_id)
+    received: list[tuple[UploadFile, Path, int, str]] = []
+
+    # Stream everything to temp files first so the database write below
+    # does not stay open while the client is still sending bytes.
+    try:
+        for up in files:
+            tmp, size, sha256 = await stream_to_temp(up)
+            received.append((up, tmp, size, sha256))
+    except UploadTooLarge:
+        # nothing from a rejected request is kept on disk
+        for _, tmp, _, _ in received:
+            with suppress(FileNotFoundError):
+                await aiofiles.os.remove(tmp)
+        raise HTTPException(400, f"file too large (max {MAX_UPLOAD_BYTES // (1024 * 1024)} MB)")
+
+    # the database work blocks, so keep it off the event loop
+    return await run_in_threadpool(_save_uploads, session, received, post_id)
+
+
+# ──────────────────────────────────── conditional GET
+# Blob bytes never change for a given sha256, so a client may keep them forever.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# /api/files/{id} is keyed by row id, which SQLite may hand to a new file
+# once the old row is deleted, so clients revalidate it against the ETag.
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/"x" matches "x"."""
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def _not_modified_since(if_modified_since: str, last_modified: dt.datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=dt.timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+class MediaFileResponse(FileResponse):
+    """
+    FileResponse with well-formed multi-range replies.
+
+    Starlette puts the multipart media type in Content-Range and separates
+    parts with bare LF; RFC 9110 14.6 wants it in Content-Type and CRLFs.
+    """
+
+    async def _handle_multiple_ranges(self, send, ranges, file_size, send_header_only):
+        boundary = token_hex(13)
+        content_type = self.headers["content-type"]
+
+        def part_header(start: int, end: int) -> bytes:
+            return (f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Range: bytes {start}-{end - 1}/{file_size}\r\n\r\n").encode("latin-1")
+
+        closing = f"--{boundary}--\r\n".encode("latin-1")
+        length = sum(len(part_header(start, end)) + (end - start) + 2 for start, end in ranges)
+        self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+        self.headers["content-length"] = str(length + len(closing))
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            for start, end in ranges:
+                await send({"type": "http.response.body", "body": part_header(start, end), "more_body": True})
+                await file.seek(start)
+                while start < end:
+                    chunk = await file.read(min(self.chunk_size, end - start))
+                    start += len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+        await send({"type": "http.response.body", "body": closing, "more_body": False})
+
+
 @router.get("/{file_id}")
-def serve_file(file_id: int, session: Session = Depends(get_session)):
+def serve_file(file_id: int, request: Request, session: Session = Depends(get_session)):
+    """
+    Stream a file with a strong ETag (its sha256) and conditional-GET support.
+
+    Range / If-Range requests, including multi-range, are answered with
+    206 against the same ETag and Last-Modified values.
+    """
     mf = session.get(MediaFile, file_id)
     if not mf:
         raise HTTPException(404, "Not found")
     path = os.path.join(UPLOAD_DIR, mf.filename)
-    return FileResponse(path, media_type=mf.mime_type)
\ No newline at end of file
+    if not os.path.isfile(path):
+        raise HTTPException(404, "Not found")
+
+    headers = {}
+    if mf.sha256:
+        last_modified = mf.uploaded_at.replace(tzinfo=dt.timezone.utc)
+        headers = {
+            "etag": f'"{mf.sha256}"',
+            "last-modified": formatdate(last_modified.timestamp(), usegmt=True),
+            "cache-control": REVALIDATE_CACHE_CONTROL,
+        }
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, headers["etag"])
+        else:
+            not_modified = (if_modified_since is not None
+                            and _not_modified_since(if_modified_since, last_modified))
+        if not_modified:
+            return Response(status_code=304, headers=headers)
+
+    return MediaFileResponse(path, media_type=mf.mime_type, filename=mf.original_name,
+                             content_disposition_type="inline", headers=headers)
+
+
+class BlobStaticFiles(StaticFiles):
+    """The /files mount; marks content-addressed blob and variant paths as immutable."""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if self.get_path(scope).startswith(("blobs" + os.sep, "variants" + os.sep)):
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        return response
\ No newline at end of file
@@ -4,6 +4,9 @@ from app.db import get_session
 from app.models.flagged_word import FlaggedWord
 from app.api.auth import current_user
 from app.models.user import User
+from app.models.moderation_scan import ModerationScan
+from app.core.jobs import enqueue
+from app.core.moderation import claim_rescan_resume, invalidate_matcher, run_rescan, start_rescan
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/flagged-words", tags=["flagged-words"])
@@ -31,6 +34,9 @@ def add_flagged_word(data: FlaggedWordCreate, session: Session = Depends(get_ses
     session.add(fw)
     session.commit()
     session.refresh(fw)
+    invalidate_matcher()
+    # Existing posts and comments are rescanned in the background
+    start_rescan(session, reason=f"added '{word}'")
     return fw
 
 @router.delete("/{word}")
@@ -41,4 +47,39 @@ def delete_flagged_word(word: str, session: Session = Depends(get_session), user
         raise HTTPException(404, "Word not found")
     session.delete(fw)
     session.commit()
-    return {"ok": True} 
\ No newline at end of file
+    invalidate_matcher()
+    return {"ok": True} 
+
+@router.get("/rescans", response_model=list[ModerationScan])
+def list_rescans(limit: int = 20, session: Session = Depends(get_session), user: User = Depends(require_moderator)):
+    """Most recent background re-moderation scans and their progress."""
+    return session.exec(
+        select(ModerationScan).order_by(ModerationScan.id.desc()).limit(min(limit, 100))
+    ).all()
+
+@router.post("/rescans", response_model=ModerationScan, status_code=202)
+def create_rescan(session: Session = Depends(get_session), user: User = Depends(require_moderator)):
+    """Rescan every post and comment against the current word list."""
+    return start_rescan(session, reason="manual")
+
+@router.get("/rescans/{scan_id}", response_model=ModerationScan)
+def get_rescan(scan_id: int, session: Session = Depends(get_session), user: User = Depends(require_moderator)):
+    scan = session.get(ModerationScan, scan_id)
+    if not scan:
+        raise HTTPException(404, "Scan not found")
+    return scan
+
+@router.post("/rescans/{scan_id}/resume", response_model=ModerationScan, status_code=202)
+def resume_rescan(scan_id: int, session: Session = Depends(get_session), user: User = Depends(require_moderator)):
+    """Continue a failed or interrupted scan from its last finished batch."""
+    scan = session.get(ModerationScan, scan_id)
+    if not scan:
+        raise HTTPException(404, "Scan not found")
+    if scan.status == "done":
+        raise HTTPException(400, "Scan already finished")
+    claimed = claim_rescan_resume(session, scan_id)
+    session.refresh(scan)
+    if not claimed:
+        raise HTTPException(409, f"Scan is {scan.status}")
+    enqueue(run_rescan, scan_id)
+    return scan
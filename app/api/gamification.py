@@ -1,12 +1,21 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import datetime as dt
+import io
+from enum import Enum
+from typing import Iterator, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 
-from app.db import get_session
+from app.db import engine, get_session
+from app.core import response_cache
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
 from app.api.auth import current_user
 from app.models.user import User
+from app.gamification.rollups import LeaderboardWindow
 from app.gamification.service import GamificationService
 from app.gamification.models import (
+    ActionType,
     PointTransactionRead, 
     UserPointsRead
 )
@@ -27,27 +36,128 @@ def get_my_points(
 
 @router.get("/my-transactions", response_model=List[PointTransactionRead])
 def get_my_transactions(
-    limit: int = 50,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    action_type: Optional[ActionType] = None,
+    since: Optional[dt.datetime] = None,
+    until: Optional[dt.datetime] = None,
     current_user: User = Depends(current_user),
     session: Session = Depends(get_session)
 ):
-    """Get current user's point transaction history."""
+    """
+    Get current user's point transaction history, newest first.
+
+    Follow the X-Next-Cursor response header to page further back;
+    `since` is inclusive and `until` exclusive.
+    """
     service = GamificationService(session)
-    transactions = service.get_user_transactions(current_user.id, limit)
+    transactions, next_cursor = service.get_user_transactions(
+        current_user.id, limit, cursor, action_type, since, until
+    )
+    set_next_cursor(response, next_cursor)
     return transactions
 
 
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+_EXPORT_COLUMNS = [
+    "id", "created_at", "action_type", "points", "description",
+    "related_entity_type", "related_entity_id",
+]
+
+
+def _export_lines(user_id: int, fmt: ExportFormat, action_type, since, until) -> Iterator[str]:
+    # The request's session is closed before a streamed body is sent,
+    # so the export reads through a session of its own.
+    with Session(engine) as session:
+        service = GamificationService(session)
+        if fmt == ExportFormat.CSV:
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(_EXPORT_COLUMNS)
+        for batch in service.iter_user_transactions(user_id, action_type, since, until):
+            if fmt == ExportFormat.CSV:
+                for tx in batch:
+                    writer.writerow([
+                        tx.id, tx.created_at.isoformat(), tx.action_type.value, tx.points,
+                        tx.description, tx.related_entity_type, tx.related_entity_id,
+                    ])
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            else:
+                yield "".join(
+                    PointTransactionRead.model_validate(tx).model_dump_json() + "\n"
+                    for tx in batch
+                )
+        if fmt == ExportFormat.CSV and buf.tell():
+            yield buf.getvalue()  # header only, for an empty history
+
+
+@router.get("/my-transactions/export")
+def export_my_transactions(
+    format: ExportFormat = ExportFormat.CSV,
+    action_type: Optional[ActionType] = None,
+    since: Optional[dt.datetime] = None,
+    until: Optional[dt.datetime] = None,
+    current_user: User = Depends(current_user),
+):
+    """Stream the current user's full point history as CSV or NDJSON."""
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        _export_lines(current_user.id, format, action_type, since, until),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="points-history.{format.value}"'},
+    )
+
+
 @router.get("/leaderboard", response_model=List[UserPointsRead])
 def get_leaderboard(
+    request: Request,
     limit: int = 10,
+    window: LeaderboardWindow = LeaderboardWindow.ALL,
     session: Session = Depends(get_session)
 ):
-    """Get the points leaderboard."""
+    """Get the points leaderboard, all-time or for the last day/week/month."""
     if limit > 100:
         limit = 100  # Cap the limit for performance
     
+    cached = response_cache.lookup(request, [response_cache.leaderboard_tag()])
+    if cached.response:
+        return cached.response
+    service = GamificationService(session)
+    return cached.store(service.get_leaderboard(limit, window))
+
+
+@router.get("/my-rank", response_model=UserPointsRead)
+def get_my_rank(
+    current_user: User = Depends(current_user),
+    session: Session = Depends(get_session)
+):
+    """Get current user's position on the leaderboard."""
+    service = GamificationService(session)
+    entry = service.get_user_rank(current_user.id)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return entry
+
+
+@router.get("/leaderboard/around-me", response_model=List[UserPointsRead])
+def get_leaderboard_around_me(
+    radius: int = Query(5, ge=0, le=50),
+    current_user: User = Depends(current_user),
+    session: Session = Depends(get_session)
+):
+    """Get the leaderboard entries just above and below the current user."""
     service = GamificationService(session)
-    return service.get_leaderboard(limit)
+    return service.get_leaderboard_around(current_user.id, radius)
 
 
 @router.get("/user/{user_id}/points", response_model=dict)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+
+from app.core import response_cache
+from app.core.dependencies import require_moderator
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/cache")
+def cache_metrics(user=Depends(require_moderator)):
+    """Response-cache hit/miss counters of this process, overall and per route."""
+    return {
+        **response_cache.stats.snapshot(),
+        "entries": len(response_cache.get_backend()),
+    }
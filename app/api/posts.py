@@ -1,25 +1,51 @@
 # app/api/posts.py
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
+from app.db import get_async_session, get_session
 from app.models.post import Post, PostCreate, PostRead, PostWithAuthor
-from app.api.auth import current_user
+from app.api.auth import current_user, optional_current_user_async
 from app.models.user import User
 from app.models.channel import Channel
 from app.core.dependencies import require_moderator
-from app.models.flagged_word import FlaggedWord
-from app.gamification.service import GamificationService
+from app.gamification.service import (
+    IDEMPOTENCY_KEY_HEADER,
+    GamificationService,
+    request_award_key,
+)
 from app.gamification.models import ActionType
-from app.models.media_file import MediaFile
-from app.models.comment import Comment
-from app.models.post_reaction import PostReaction
-from app.models.saved_post import SavedPost
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    keyset_page,
+    set_next_cursor,
+    split_page,
+)
+from app.core import search
+from app.core.jobs import enqueue
+from app.core import cascade, response_cache
+from app.core.storage import purge_blobs
+from app.core.moderation import flag_reason_for, get_matcher
+from app.core.post_loader import (
+    build_post_reads,
+    build_posts_with_author,
+    select_posts_with_author,
+)
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
+
+def _replayed_post(session: Session, award_key: Optional[str]) -> Optional[Post]:
+    """The post created by an earlier request with the same Idempotency-Key."""
+    award = GamificationService(session).find_award(award_key)
+    return session.get(Post, award.related_entity_id) if award else None
+
+
 @router.post(
     "/",
     response_model=PostRead,
@@ -29,7 +55,14 @@ def create_post(
     payload: PostCreate,
     session: Session = Depends(get_session),
     current: User = Depends(current_user),            # ← inject current_user
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER, max_length=64),
 ):
+    # A retried request gets the post its first attempt created
+    award_key = request_award_key(ActionType.POST_UPLOAD, current.id, idempotency_key)
+    earlier = _replayed_post(session, award_key)
+    if earlier is not None:
+        return earlier
+
     # Check if channel exists
     channel = session.get(Channel, payload.channel_id)
     if not channel:
@@ -51,19 +84,15 @@ def create_post(
     #         detail="Post with that title already exists in this channel",
     #     )
     post = Post(**payload.dict(), author_id=current.id)
-    # Check for flagged words
-    flagged_words = session.exec(select(FlaggedWord)).all()
-    content = (post.content or "").lower()
-    for fw in flagged_words:
-        if fw.word in content:
-            post.flagged = True
-            post.flag_reason = fw.word
-            break
+    # Check for flagged words in one pass with the cached matcher
+    matches = get_matcher(session).find_all(post.content)
+    if matches:
+        post.flagged = True
+        post.flag_reason = flag_reason_for(matches)
     session.add(post)
-    session.commit()
-    session.refresh(post)
+    session.flush()  # assigns post.id for the ledger entry
     
-    # Award points for post upload (10 points)
+    # Award points for post upload (10 points), committed with the post
     gamification_service = GamificationService(session)
     gamification_service.award_points(
         user_id=current.id,
@@ -71,8 +100,20 @@ def create_post(
         action_type=ActionType.POST_UPLOAD,
         description=f"Posted '{post.title}' in channel {channel.name}",
         related_entity_id=post.id,
-        related_entity_type="post"
+        related_entity_type="post",
+        idempotency_key=award_key,
     )
+    try:
+        session.commit()
+    except IntegrityError:
+        # a concurrent retry with the same key committed first
+        session.rollback()
+        earlier = _replayed_post(session, award_key)
+        if earlier is None:
+            raise
+        return earlier
+    session.refresh(post)
+    response_cache.invalidate(*response_cache.post_tags(post.id, post.channel_id))
     
     return post
 
@@ -80,32 +121,46 @@ def create_post(
     "/",
     response_model=List[PostRead],
 )
-def list_posts(
-    session: Session = Depends(get_session),
+async def list_posts(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_async_session),
+    viewer: Optional[User] = Depends(optional_current_user_async),
 ):
-    return session.exec(select(Post)).all()
+    """Newest posts first; the next page's cursor is sent in X-Next-Cursor."""
+    cached = response_cache.lookup(request, [response_cache.posts_tag()],
+                                   cacheable=viewer is None)
+    if cached.response:
+        return cached.response
+    stmt = keyset_page(select(Post), Post.created_at, Post.id, cursor, limit)
+    posts, next_cursor = split_page((await session.exec(stmt)).all(), limit)
+    set_next_cursor(response, next_cursor)
+    result = await session.run_sync(build_post_reads, posts, viewer.id if viewer else None)
+    return cached.store(result, response, headers=[NEXT_CURSOR_HEADER])
 
 @router.get(
     "/search",
     response_model=List[PostRead],
 )
 def search_posts(
-    q: str,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
     session: Session = Depends(get_session),
     current: User = Depends(current_user),
 ):
-    """Search posts by title and content."""
-    query = select(Post).where(
-        Post.title.ilike(f"%{q}%") | Post.content.ilike(f"%{q}%")
-    )
-    return session.exec(query).all()
+    """Search posts by title and content, best match first."""
+    posts = search.search_posts(session, q, limit, offset)
+    return build_post_reads(session, posts, current.id)
 
 @router.get("/flagged", response_model=list[Post])
-async def list_flagged_posts(session: Session = Depends(get_session), current_user=Depends(require_moderator)):
+def list_flagged_posts(session: Session = Depends(get_session), current_user=Depends(require_moderator)):
     return session.exec(select(Post).where(Post.flagged == True)).all()
 
 @router.post("/{post_id}/approve")
-async def approve_post(post_id: int, session: Session = Depends(get_session), current_user=Depends(require_moderator)):
+def approve_post(post_id: int, session: Session = Depends(get_session), current_user=Depends(require_moderator)):
     post = session.get(Post, post_id)
     if not post:
         raise HTTPException(404, "Post not found")
@@ -116,7 +171,7 @@ async def approve_post(post_id: int, session: Session = Depends(get_session), cu
     return {"ok": True}
 
 @router.delete("/{post_id}")
-async def delete_post(
+def delete_post(
     post_id: int, 
     session: Session = Depends(get_session), 
     current_user: User = Depends(current_user)
@@ -135,30 +190,13 @@ async def delete_post(
             detail="You don't have permission to delete this post"
         )
     
-    # Manually delete related records to avoid constraint violations
-    # Delete comments
-    comments = session.exec(select(Comment).where(Comment.post_id == post_id)).all()
-    for comment in comments:
-        session.delete(comment)
-    
-    # Delete media files
-    files = session.exec(select(MediaFile).where(MediaFile.post_id == post_id)).all()
-    for file in files:
-        session.delete(file)
-    
-    # Delete reactions
-    reactions = session.exec(select(PostReaction).where(PostReaction.post_id == post_id)).all()
-    for reaction in reactions:
-        session.delete(reaction)
-    
-    # Delete saved posts
-    saved_posts = session.exec(select(SavedPost).where(SavedPost.post_id == post_id)).all()
-    for saved_post in saved_posts:
-        session.delete(saved_post)
-    
-    # Now delete the post itself
-    session.delete(post)
+    # One DELETE per related table; the files are unlinked in the background
+    tags = response_cache.post_tags(post.id, post.channel_id)
+    unreferenced = cascade.delete_post(session, post_id)
     session.commit()
+    response_cache.invalidate(*tags)
+    if unreferenced:
+        enqueue(purge_blobs, unreferenced)
     
     return {"message": "Post deleted successfully"}
 
@@ -176,23 +214,7 @@ def get_post(
     current: User = Depends(current_user),
 ):
     """Get a specific post by ID with author information."""
-    # Get post with author information using JOIN
-    stmt = (
-        select(
-            Post.id,
-            Post.title,
-            Post.content,
-            Post.channel_id,
-            Post.author_id,
-            Post.created_at,
-            Post.updated_at,
-            User.email.label("author_email"),
-            User.username.label("author_username")
-        )
-        .join(User, Post.author_id == User.id)
-        .where(Post.id == post_id)
-    )
-    
+    stmt = select_posts_with_author().where(Post.id == post_id)
     result = session.exec(stmt).first()
     if not result:
         raise HTTPException(
@@ -200,26 +222,4 @@ def get_post(
             detail="Post not found"
         )
     
-    # Get files for this post
-    files = session.exec(
-        select(MediaFile).where(MediaFile.post_id == result.id)
-    ).all()
-    
-    # Create PostWithAuthor object
-    post_with_author = PostWithAuthor(
-        id=result.id,
-        title=result.title,
-        content=result.content,
-        channel_id=result.channel_id,
-        author_id=result.author_id,
-        created_at=result.created_at,
-        updated_at=result.updated_at,
-        author_email=result.author_email,
-        author_username=result.author_username,
-        files=[file.dict() for file in files],
-        like_count=0,  # Will be populated separately if needed
-        dislike_count=0,  # Will be populated separately if needed
-        is_saved=False  # Will be populated separately if needed
-    )
-    
-    return post_with_author
+    return build_posts_with_author(session, [result], current.id)[0]
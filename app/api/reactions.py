@@ -1,9 +1,10 @@
-from typing import Dict
+from typing import Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, func
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
+from app.db import get_async_session, get_session
 from app.models.post_reaction import (
     PostReaction, 
     PostReactionCreate, 
@@ -11,10 +12,16 @@ from app.models.post_reaction import (
     ReactionType
 )
 from app.models.post import Post
-from app.api.auth import current_user
+from app.api.auth import current_user, current_user_async
 from app.models.user import User
-from app.gamification.service import GamificationService
+from app.gamification.service import (
+    IDEMPOTENCY_KEY_HEADER,
+    GamificationService,
+    request_award_key,
+)
 from app.gamification.models import ActionType
+from app.core import response_cache
+from app.core.counters import apply_reaction_change
 
 router = APIRouter(prefix="/reactions", tags=["reactions"])
 
@@ -28,6 +35,7 @@ def create_or_update_reaction(
     payload: PostReactionCreate,
     session: Session = Depends(get_session),
     current: User = Depends(current_user),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER, max_length=64),
 ):
     # Check if post exists
     post = session.get(Post, payload.post_id)
@@ -46,12 +54,20 @@ def create_or_update_reaction(
     ).first()
     
     gamification_service = GamificationService(session)
+    # a retried request can't move the author's points twice
+    like_key = request_award_key(ActionType.LIKE_RECEIVED, current.id, idempotency_key)
+    unlike_key = request_award_key(ActionType.LIKE_REMOVED, current.id, idempotency_key)
     
     if existing_reaction:
         # Handle updating existing reaction
         old_type = existing_reaction.reaction_type
         new_type = payload.reaction_type
         
+        # Update existing reaction and the post's counters together
+        existing_reaction.reaction_type = new_type
+        session.add(existing_reaction)
+        apply_reaction_change(session, post.id, old_type, new_type)
+        
         # If changing from like to dislike or vice versa
         if old_type != new_type:
             if old_type == ReactionType.LIKE:
@@ -62,7 +78,8 @@ def create_or_update_reaction(
                     action_type=ActionType.LIKE_REMOVED,
                     description=f"Like removed from post '{post.title}'",
                     related_entity_id=post.id,
-                    related_entity_type="post"
+                    related_entity_type="post",
+                    idempotency_key=unlike_key,
                 )
             
             if new_type == ReactionType.LIKE:
@@ -73,13 +90,13 @@ def create_or_update_reaction(
                     action_type=ActionType.LIKE_RECEIVED,
                     description=f"Like received on post '{post.title}'",
                     related_entity_id=post.id,
-                    related_entity_type="post"
+                    related_entity_type="post",
+                    idempotency_key=like_key,
                 )
         
-        # Update existing reaction
-        existing_reaction.reaction_type = payload.reaction_type
-        session.add(existing_reaction)
+        # reaction, counters and points all land in one commit
         session.commit()
+        response_cache.invalidate(*response_cache.post_tags(post.id, post.channel_id))
         session.refresh(existing_reaction)
         return existing_reaction
     else:
@@ -90,8 +107,7 @@ def create_or_update_reaction(
             user_id=current.id
         )
         session.add(reaction)
-        session.commit()
-        session.refresh(reaction)
+        apply_reaction_change(session, post.id, None, payload.reaction_type)
         
         # Award point if it's a like
         if payload.reaction_type == ReactionType.LIKE:
@@ -101,9 +117,13 @@ def create_or_update_reaction(
                 action_type=ActionType.LIKE_RECEIVED,
                 description=f"Like received on post '{post.title}'",
                 related_entity_id=post.id,
-                related_entity_type="post"
+                related_entity_type="post",
+                idempotency_key=like_key,
             )
         
+        session.commit()
+        response_cache.invalidate(*response_cache.post_tags(post.id, post.channel_id))
+        session.refresh(reaction)
         return reaction
 
 
@@ -138,8 +158,13 @@ def remove_reaction(
             detail="No reaction found"
         )
     
+    # Delete reaction and decrement the post's counter together
+    reaction_type = reaction.reaction_type
+    session.delete(reaction)
+    apply_reaction_change(session, post.id, reaction_type, None)
+    
     # Remove points if it was a like
-    if reaction.reaction_type == ReactionType.LIKE:
+    if reaction_type == ReactionType.LIKE:
         gamification_service = GamificationService(session)
         gamification_service.remove_points(
             user_id=post.author_id,
@@ -149,10 +174,8 @@ def remove_reaction(
             related_entity_id=post.id,
             related_entity_type="post"
         )
-    
-    # Delete reaction
-    session.delete(reaction)
     session.commit()
+    response_cache.invalidate(*response_cache.post_tags(post.id, post.channel_id))
     return None
 
 
@@ -160,51 +183,41 @@ def remove_reaction(
     "/post/{post_id}/counts",
     response_model=Dict[str, int],
 )
-def get_reaction_counts(
+async def get_reaction_counts(
     post_id: int,
-    session: Session = Depends(get_session),
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
 ):
+    cached = response_cache.lookup(request, [response_cache.post_tag(post_id)])
+    if cached.response:
+        return cached.response
+
     # Check if post exists
-    post = session.get(Post, post_id)
+    post = await session.get(Post, post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found"
         )
     
-    # Count likes
-    like_count = session.exec(
-        select(func.count(PostReaction.id)).where(
-            PostReaction.post_id == post_id,
-            PostReaction.reaction_type == ReactionType.LIKE
-        )
-    ).one()
-    
-    # Count dislikes
-    dislike_count = session.exec(
-        select(func.count(PostReaction.id)).where(
-            PostReaction.post_id == post_id,
-            PostReaction.reaction_type == ReactionType.DISLIKE
-        )
-    ).one()
-    
-    return {
-        "like_count": like_count,
-        "dislike_count": dislike_count
-    }
+    # Counters are maintained on the post row itself
+    return cached.store({
+        "like_count": post.like_count,
+        "dislike_count": post.dislike_count
+    })
 
 
 @router.get(
     "/post/{post_id}/user",
     response_model=PostReactionRead | None,
 )
-def get_user_reaction(
+async def get_user_reaction(
     post_id: int,
-    session: Session = Depends(get_session),
-    current: User = Depends(current_user),
+    session: AsyncSession = Depends(get_async_session),
+    current: User = Depends(current_user_async),
 ):
     # Check if post exists
-    post = session.get(Post, post_id)
+    post = await session.get(Post, post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -212,11 +225,11 @@ def get_user_reaction(
         )
     
     # Get user's reaction
-    reaction = session.exec(
+    reaction = (await session.exec(
         select(PostReaction).where(
             PostReaction.post_id == post_id,
             PostReaction.user_id == current.id
         )
-    ).first()
+    )).first()
     
     return reaction 
\ No newline at end of file
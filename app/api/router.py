@@ -10,6 +10,8 @@ from app.api.reactions import router as reactions_router
 from app.api.saved_posts import router as saved_posts_router
 from app.api.flagged_words import router as flagged_words_router
 from app.api.gamification import router as gamification_router
+from app.api.metrics import router as metrics_router
+from app.api.feed import router as feed_router
 # from app.api.resources import router as resources_router  # add when ready
 
 # ─── Collect them into one router ──────────────────────────────────────────
@@ -23,4 +25,6 @@ api_router.include_router(reactions_router)
 api_router.include_router(saved_posts_router)
 api_router.include_router(flagged_words_router)
 api_router.include_router(gamification_router)
+api_router.include_router(metrics_router)
+api_router.include_router(feed_router)
 # api_router.include_router(resources_router, prefix="/resources")
@@ -6,9 +6,10 @@ from sqlmodel import Session, select
 from app.db import get_session
 from app.models.saved_post import SavedPost, SavedPostCreate, SavedPostRead
 from app.models.post import Post, PostRead, PostWithAuthor
-from app.models.media_file import MediaFile
+from app.core.post_loader import build_posts_with_author, select_posts_with_author
 from app.models.user import User
 from app.api.auth import current_user
+from app.core import response_cache
 
 router = APIRouter(prefix="/saved-posts", tags=["saved-posts"])
 
@@ -54,6 +55,7 @@ def save_post(
     session.add(saved_post)
     session.commit()
     session.refresh(saved_post)
+    response_cache.invalidate(response_cache.feed_tag(current.id))  # is_saved flags
     return saved_post
 
 
@@ -84,6 +86,7 @@ def unsave_post(
     # Delete the saved post
     session.delete(saved_post)
     session.commit()
+    response_cache.invalidate(response_cache.feed_tag(current.id))  # is_saved flags
     return None
 
 
@@ -98,52 +101,14 @@ def get_saved_posts(
     """Get all posts saved by the current user with author information."""
     # Get saved posts with post and author details using JOIN
     stmt = (
-        select(
-            Post.id,
-            Post.title,
-            Post.content,
-            Post.channel_id,
-            Post.author_id,
-            Post.created_at,
-            Post.updated_at,
-            User.email.label("author_email"),
-            User.username.label("author_username"),
-            SavedPost.saved_at
-        )
-        .join(Post, SavedPost.post_id == Post.id)
-        .join(User, Post.author_id == User.id)
+        select_posts_with_author(SavedPost.saved_at)
+        .join(SavedPost, SavedPost.post_id == Post.id)
         .where(SavedPost.user_id == current.id)
         .order_by(SavedPost.saved_at.desc())
     )
     
     results = session.exec(stmt).all()
-    
-    # Convert to PostWithAuthor objects
-    posts = []
-    for row in results:
-        # Get files for this post
-        files = session.exec(
-            select(MediaFile).where(MediaFile.post_id == row.id)
-        ).all()
-        
-        post = PostWithAuthor(
-            id=row.id,
-            title=row.title,
-            content=row.content,
-            channel_id=row.channel_id,
-            author_id=row.author_id,
-            created_at=row.created_at,
-            updated_at=row.updated_at,
-            author_email=row.author_email,
-            author_username=row.author_username,
-            files=[file.dict() for file in files],
-            like_count=0,  # Will be populated separately if needed
-            dislike_count=0,  # Will be populated separately if needed
-            is_saved=True
-        )
-        posts.append(post)
-    
-    return posts
+    return build_posts_with_author(session, results, current.id, is_saved=True)
 
 
 @router.get(
@@ -0,0 +1,142 @@
+"""
+Shared fixtures for the test suite.
+
+Tests never write to the tracked data/app.db. The session gets a
+throwaway SQLite file, built with the app's own `build_engine` and
+tables, and the `get_session`/`get_async_session` dependencies are
+overridden to use it. Background jobs, sweepers and the export stream
+open sessions on `app.db.engine` themselves, so DATABASE_URL is pointed
+at the same file before anything imports the app.
+"""
+
+import datetime as dt
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="edora-tests-")
+TEST_DATABASE_URL = f"sqlite:///{os.path.join(_TEST_DB_DIR, 'test.db')}"
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+from sqlmodel import Session, SQLModel  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.db import build_async_engine, build_engine, get_async_session, get_session  # noqa: E402
+from app.models import Channel, Post, User  # noqa: E402
+from app.core.jobs import wait_for_local_jobs  # noqa: E402
+from app.core.search import ensure_search_index  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+
+engine = build_engine(TEST_DATABASE_URL)
+async_engine = build_async_engine(TEST_DATABASE_URL)
+SQLModel.metadata.create_all(engine)
+ensure_search_index(engine)
+
+AsyncTestSession = async_sessionmaker(bind=async_engine, class_=AsyncSession,
+                                      expire_on_commit=False)
+
+
+def _test_session():
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def _test_async_session():
+    async with AsyncTestSession() as session:
+        yield session
+
+
+app.dependency_overrides[get_session] = _test_session
+app.dependency_overrides[get_async_session] = _test_async_session
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _test_database():
+    yield
+    wait_for_local_jobs()
+    engine.dispose()
+    shutil.rmtree(_TEST_DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def db_engine():
+    """The engine behind the test database."""
+    return engine
+
+
+@pytest.fixture
+def make_user():
+    """Create a user with a unique email; keyword arguments set other columns."""
+    def make(**fields) -> User:
+        with Session(engine) as session:
+            user = User(email=f"{uuid4().hex}@example.com", hashed_password="x", **fields)
+            session.add(user)
+            session.commit()
+            session.refresh(user)
+            return user
+    return make
+
+
+@pytest.fixture
+def auth_headers():
+    """Bearer headers for a user or user id."""
+    def headers(user) -> dict:
+        user_id = user if isinstance(user, int) else user.id
+        return {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    return headers
+
+
+@pytest.fixture
+def make_channel(make_user):
+    """
+    Create a channel owned by `owner` (a new user by default) with `n_posts`
+    posts and return the channel id and post ids. Given `created_at`, posts
+    are stamped from it a minute apart in pairs, to exercise id tiebreaks.
+    Keyword arguments set other channel columns.
+    """
+    def make(owner: Optional[User] = None, n_posts: int = 0,
+             created_at: Optional[dt.datetime] = None, **fields) -> Tuple[int, List[int]]:
+        owner = owner or make_user()
+        fields.setdefault("name", f"chan-{uuid4().hex[:8]}")
+        with Session(engine) as session:
+            channel = Channel(owner_id=owner.id, **fields)
+            session.add(channel)
+            session.commit()
+            posts = [
+                Post(title=f"post {i}", content="body", channel_id=channel.id, author_id=owner.id,
+                     **({"created_at": created_at + dt.timedelta(minutes=i // 2)}
+                        if created_at else {}))
+                for i in range(n_posts)
+            ]
+            session.add_all(posts)
+            session.commit()
+            return channel.id, [post.id for post in posts]
+    return make
+
+
+@pytest.fixture
+def capture_statements():
+    """`with capture_statements() as statements:` records the SQL sent to the test database."""
+    @contextmanager
+    def capture():
+        statements = []
+
+        def before_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        targets = (engine, async_engine.sync_engine)
+        for target in targets:
+            event.listen(target, "before_cursor_execute", before_execute)
+        try:
+            yield statements
+        finally:
+            for target in targets:
+                event.remove(target, "before_cursor_execute", before_execute)
+    return capture
@@ -0,0 +1,71 @@
+"""
+Set-based deletion of posts and channels.
+
+A post takes its comments, attachments, reactions, saves and tags with it;
+a channel takes its posts (and all of theirs) and its member links. Each
+dependent table is cleared with one DELETE ... WHERE post_id IN (...), so
+the statement count does not grow with the number of rows.
+
+Nothing here commits. The removed attachments drop their blob references
+in the same transaction; hand the returned digests to `purge_blobs` via
+`enqueue` once committed, and the files are unlinked in the background.
+"""
+
+from typing import List
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.core.storage import release_blobs
+from app.models.association_tables import channel_user_link
+from app.models.channel import Channel
+from app.models.comment import Comment
+from app.models.media_file import MediaFile
+from app.models.post import Post
+from app.models.post_reaction import PostReaction
+from app.models.post_tag import PostTag
+from app.models.saved_post import SavedPost
+
+# every table with a post_id foreign key
+_POST_CHILDREN = (Comment, MediaFile, PostReaction, SavedPost, PostTag)
+
+
+def _delete_posts_where(session: Session, post_ids) -> List[str]:
+    """Delete the posts selected by the `post_ids` subquery and their rows."""
+    sha256s = session.exec(
+        select(MediaFile.sha256).where(MediaFile.post_id.in_(post_ids))
+    ).all()
+    for model in _POST_CHILDREN:
+        session.execute(
+            delete(model)
+            .where(model.post_id.in_(post_ids))
+            .execution_options(synchronize_session=False)
+        )
+    # last, so the subquery still finds the posts for every table above
+    session.execute(
+        delete(Post)
+        .where(Post.id.in_(post_ids))
+        .execution_options(synchronize_session=False)
+    )
+    return release_blobs(session, sha256s)
+
+
+def delete_post(session: Session, post_id: int) -> List[str]:
+    """Delete one post and its rows; returns digests for `purge_blobs`."""
+    return _delete_posts_where(session, select(Post.id).where(Post.id == post_id))
+
+
+def delete_channel(session: Session, channel_id: int) -> List[str]:
+    """Delete a channel, its posts and memberships; returns digests for `purge_blobs`."""
+    unreferenced = _delete_posts_where(
+        session, select(Post.id).where(Post.channel_id == channel_id)
+    )
+    session.execute(
+        channel_user_link.delete().where(channel_user_link.c.channel_id == channel_id)
+    )
+    session.execute(
+        delete(Channel)
+        .where(Channel.id == channel_id)
+        .execution_options(synchronize_session=False)
+    )
+    return unreferenced
@@ -0,0 +1,114 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import update
+from sqlmodel import Session, func, select
+
+from app.models.comment import Comment
+from app.models.post import Post
+from app.models.post_reaction import PostReaction, ReactionType
+
+# Which Post column tracks each reaction type
+_REACTION_COLUMNS = {
+    ReactionType.LIKE: "like_count",
+    ReactionType.DISLIKE: "dislike_count",
+}
+
+
+def apply_reaction_change(
+    session: Session,
+    post_id: int,
+    old: Optional[ReactionType],
+    new: Optional[ReactionType],
+) -> None:
+    """
+    Move a post's denormalized reaction counters from `old` to `new`.
+
+    Uses a relative UPDATE (``col = col + 1``) so concurrent reactions
+    never overwrite each other, and leaves updated_at alone: a reaction
+    is not an edit of the post. Does not commit — call it before the
+    commit that persists the reaction itself so both land together.
+    """
+    if old == new:
+        return
+    deltas = {}
+    if old is not None:
+        deltas[_REACTION_COLUMNS[old]] = -1
+    if new is not None:
+        deltas[_REACTION_COLUMNS[new]] = 1
+    values = {
+        column: getattr(Post, column) + delta
+        for column, delta in deltas.items()
+    }
+    session.exec(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(**values, updated_at=Post.updated_at)
+    )
+
+
+def recount_reactions(
+    session: Session, post_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Recompute like/dislike counters from PostReaction.
+
+    Repairs every post, or only `post_ids` when given. Returns the number
+    of posts updated.
+    """
+    def count_of(reaction_type: ReactionType):
+        return (
+            select(func.count(PostReaction.id))
+            .where(
+                PostReaction.post_id == Post.id,
+                PostReaction.reaction_type == reaction_type,
+            )
+            .scalar_subquery()
+        )
+
+    stmt = update(Post).values(
+        like_count=count_of(ReactionType.LIKE),
+        dislike_count=count_of(ReactionType.DISLIKE),
+        updated_at=Post.updated_at,  # skip the onupdate stamp
+    )
+    if post_ids is not None:
+        stmt = stmt.where(Post.id.in_(list(post_ids)))
+    result = session.exec(stmt)
+    session.commit()
+    return result.rowcount
+
+
+def apply_comment_change(session: Session, post_id: int, delta: int) -> None:
+    """
+    Add `delta` to a post's comment counter with a relative UPDATE.
+
+    Neither commits nor touches updated_at, like `apply_reaction_change`.
+    """
+    session.exec(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(comment_count=Post.comment_count + delta, updated_at=Post.updated_at)
+    )
+
+
+def recount_comments(
+    session: Session, post_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Recompute Post.comment_count from Comment.
+
+    Repairs every post, or only `post_ids` when given. Returns the number
+    of posts updated.
+    """
+    stmt = update(Post).values(
+        comment_count=(
+            select(func.count(Comment.id))
+            .where(Comment.post_id == Post.id)
+            .scalar_subquery()
+        ),
+        updated_at=Post.updated_at,  # skip the onupdate stamp
+    )
+    if post_ids is not None:
+        stmt = stmt.where(Post.id.in_(list(post_ids)))
+    result = session.exec(stmt)
+    session.commit()
+    return result.rowcount
@@ -0,0 +1,126 @@
+"""
+Background job queue.
+
+Jobs go to an rq queue on redis when ``REDIS_URL`` is set (run a worker
+with ``rq worker --url $REDIS_URL edora``). Without redis they run on a
+single in-process worker thread, which is what tests and local runs use.
+Jobs must be importable module-level functions so rq can pickle them.
+
+`enqueue_unique` keeps at most one copy of a job waiting across every
+process: it claims a key (in redis, with a TTL so a lost job can't hold
+it forever) that the job gives back with `release_unique` when it starts.
+"""
+
+import logging
+import os
+import queue
+import threading
+from typing import Any, Callable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL  = os.getenv("REDIS_URL")
+QUEUE_NAME = os.getenv("JOB_QUEUE_NAME", "edora")
+JOB_TIMEOUT_S = int(os.getenv("JOB_TIMEOUT_S", "3600"))
+UNIQUE_JOB_TTL_S = int(os.getenv("UNIQUE_JOB_TTL_S", "300"))
+
+
+class InProcessQueue:
+    """FIFO queue drained by one daemon thread; `join()` waits for it."""
+
+    def __init__(self):
+        self._jobs: "queue.Queue[tuple]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _run(self) -> None:
+        while True:
+            func, args, kwargs = self._jobs.get()
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception("background job %s failed", getattr(func, "__name__", func))
+            finally:
+                self._jobs.task_done()
+
+    def enqueue(self, func: Callable, *args: Any, **kwargs: Any) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="edora-jobs", daemon=True)
+                self._thread.start()
+        self._jobs.put((func, args, kwargs))
+
+    def join(self) -> None:
+        self._jobs.join()
+
+
+_local_queue = InProcessQueue()
+_rq_queue = None
+_local_claims: Set[str] = set()
+_claims_lock = threading.Lock()
+
+
+def _get_rq_queue():
+    global _rq_queue
+    if _rq_queue is None:
+        from redis import Redis
+        from rq import Queue
+
+        _rq_queue = Queue(QUEUE_NAME, connection=Redis.from_url(REDIS_URL),
+                          default_timeout=JOB_TIMEOUT_S)
+    return _rq_queue
+
+
+def enqueue(func: Callable, *args: Any, **kwargs: Any) -> None:
+    """Run `func(*args, **kwargs)` off the request path."""
+    if REDIS_URL:
+        try:
+            _get_rq_queue().enqueue(func, *args, **kwargs)
+            return
+        except Exception:
+            logger.exception("could not reach redis, running job in-process")
+    _local_queue.enqueue(func, *args, **kwargs)
+
+
+def _claim_key(key: str) -> str:
+    return f"{QUEUE_NAME}:unique:{key}"
+
+
+def enqueue_unique(key: str, func: Callable, *args: Any,
+                   ttl_s: int = UNIQUE_JOB_TTL_S, **kwargs: Any) -> bool:
+    """
+    Like `enqueue`, unless a job under `key` is already waiting; returns
+    whether one was queued. The job must call `release_unique(key)` first
+    thing, so work that arrives while it runs queues another copy.
+    """
+    if REDIS_URL:
+        try:
+            claimed = _get_rq_queue().connection.set(_claim_key(key), 1, nx=True, ex=ttl_s)
+        except Exception:
+            logger.exception("could not reach redis, running job in-process")
+        else:
+            if claimed:
+                enqueue(func, *args, **kwargs)
+            return bool(claimed)
+    with _claims_lock:
+        if key in _local_claims:
+            return False
+        _local_claims.add(key)
+    _local_queue.enqueue(func, *args, **kwargs)
+    return True
+
+
+def release_unique(key: str) -> None:
+    """Let the next `enqueue_unique(key, ...)` queue a job again."""
+    with _claims_lock:
+        _local_claims.discard(key)
+    if REDIS_URL:
+        try:
+            _get_rq_queue().connection.delete(_claim_key(key))
+        except Exception:
+            logger.exception("could not release job key %s", key)
+
+
+def wait_for_local_jobs() -> None:
+    """Block until the in-process queue is empty (used by tests)."""
+    _local_queue.join()
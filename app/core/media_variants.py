@@ -0,0 +1,163 @@
+"""
+Thumbnails and previews for uploaded media.
+
+After an upload, `enqueue_variants` queues `generate_variants` for every
+new image or PDF blob. The job hands the CPU-heavy decode/resize/render to
+a process pool and records the results as MediaVariant rows. Pillow
+(images) and PyMuPDF (PDFs) are optional; without them the matching
+uploads simply get no variants.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, func, select
+
+from app.core import storage
+from app.core.jobs import enqueue
+from app.db import engine
+from app.models.media_blob import MediaBlob
+from app.models.media_file import MediaFile
+from app.models.media_variant import MediaVariant
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTHS   = tuple(int(w) for w in os.getenv("THUMBNAIL_WIDTHS", "160,320,640").split(","))
+PREVIEW_WIDTH      = int(os.getenv("PREVIEW_WIDTH", "640"))
+MEDIA_WORKERS      = int(os.getenv("MEDIA_WORKERS", str(min(4, os.cpu_count() or 1))))
+VARIANT_TIMEOUT_S  = int(os.getenv("VARIANT_TIMEOUT_S", "120"))
+PDF_MIME_TYPE      = "application/pdf"
+
+
+def wants_variants(mime_type: Optional[str]) -> bool:
+    return bool(mime_type) and (mime_type.startswith("image/") or mime_type == PDF_MIME_TYPE)
+
+
+# ──────────────────────────────────── renderers (run in the process pool)
+def _save_atomically(save, dest: Path) -> int:
+    tmp = dest.with_name(dest.name + ".part")
+    save(tmp)
+    os.replace(tmp, dest)
+    return dest.stat().st_size
+
+
+def render_thumbnails(src: str, out_dir: str, widths: Iterable[int]) -> List[Dict]:
+    """Downscale an image to each width narrower than the original, as JPEG."""
+    from PIL import Image, ImageOps
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    rendered = []
+    with Image.open(src) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        for width in sorted(set(widths)):
+            if width >= image.width:
+                break  # never upscale
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            dest = out / f"thumbnail-{width}.jpg"
+            size = _save_atomically(
+                lambda path: resized.save(path, "JPEG", quality=82, optimize=True), dest
+            )
+            rendered.append({"kind": "thumbnail", "width": width, "height": height,
+                             "mime_type": "image/jpeg", "path": str(dest), "size": size})
+    return rendered
+
+
+def render_pdf_preview(src: str, out_dir: str, width: int) -> List[Dict]:
+    """Render the first page of a PDF at `width` pixels, as PNG."""
+    import fitz  # PyMuPDF
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    with fitz.open(src) as doc:
+        if doc.page_count == 0:
+            return []
+        page = doc[0]
+        zoom = width / page.rect.width
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        dest = out / f"preview-{pixmap.width}.png"
+        size = _save_atomically(lambda path: pixmap.save(str(path), output="png"), dest)
+    return [{"kind": "preview", "width": pixmap.width, "height": pixmap.height,
+             "mime_type": "image/png", "path": str(dest), "size": size}]
+
+
+# ──────────────────────────────────── jobs
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=MEDIA_WORKERS)
+    return _pool
+
+
+def enqueue_variants(files: Iterable) -> None:
+    """Queue variant generation for the distinct image/PDF blobs in `files`."""
+    seen = set()
+    for mf in files:
+        if mf.sha256 and mf.sha256 not in seen and wants_variants(mf.mime_type):
+            seen.add(mf.sha256)
+            enqueue(generate_variants, mf.sha256, mf.mime_type)
+
+
+def generate_variants(sha256: str, mime_type: str) -> int:
+    """
+    Job: render and record the variants of one blob; returns how many.
+
+    Does nothing if the blob already has variants or is gone.
+    """
+    with Session(engine) as session:
+        if session.get(MediaBlob, sha256) is None:
+            return 0
+        existing = session.exec(
+            select(func.count(MediaVariant.id)).where(MediaVariant.sha256 == sha256)
+        ).one()
+        if existing:
+            return 0
+
+    src = str(storage.UPLOAD_DIR / storage.blob_relpath(sha256))
+    out_dir = storage.UPLOAD_DIR / storage.variant_relpath(sha256)
+    if mime_type == PDF_MIME_TYPE:
+        render, args = render_pdf_preview, (src, str(out_dir), PREVIEW_WIDTH)
+    else:
+        render, args = render_thumbnails, (src, str(out_dir), THUMBNAIL_WIDTHS)
+    try:
+        rendered = _get_pool().submit(render, *args).result(timeout=VARIANT_TIMEOUT_S)
+    except ImportError as exc:
+        logger.info("no variants for %s: %s is not installed", sha256, exc.name)
+        return 0
+
+    with Session(engine) as session:
+        for variant in rendered:
+            name = Path(variant.pop("path")).name
+            session.add(MediaVariant(
+                sha256=sha256,
+                filename=(storage.variant_relpath(sha256) / name).as_posix(),
+                **variant,
+            ))
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()  # a concurrent job for the same blob won
+            return 0
+    return len(rendered)
+
+
+def backfill_variants(session: Session) -> int:
+    """Run `generate_variants` inline for every blob that has none yet."""
+    missing = session.exec(
+        select(MediaFile.sha256, func.min(MediaFile.mime_type))
+        .where(MediaFile.sha256.is_not(None))
+        .where(~select(MediaVariant.id).where(MediaVariant.sha256 == MediaFile.sha256).exists())
+        .group_by(MediaFile.sha256)
+    ).all()
+    return sum(generate_variants(sha256, mime_type)
+               for sha256, mime_type in missing if wants_variants(mime_type))
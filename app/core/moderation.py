@@ -0,0 +1,271 @@
+import datetime as dt
+import logging
+import os
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, update
+from sqlmodel import Session, func, select
+
+from app.core.jobs import enqueue
+from app.db import engine
+from app.models.comment import Comment
+from app.models.flagged_word import FlaggedWord
+from app.models.moderation_scan import ModerationScan
+from app.models.post import Post
+
+logger = logging.getLogger(__name__)
+
+FLAG_REASON_MAX = 256  # Post.flag_reason column size
+RESCAN_BATCH_SIZE = int(os.getenv("RESCAN_BATCH_SIZE", "500"))
+# a running scan with no progress for this long is taken to have died
+RESCAN_STALE_AFTER_S = int(os.getenv("RESCAN_STALE_AFTER_S", "600"))
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class FlaggedWordMatcher:
+    """
+    Aho-Corasick automaton over the flagged-word list.
+
+    Finds every flagged word in a single pass over the text, independent of
+    how many words are on the list. A word only matches on word boundaries,
+    so "ass" flags "ass" but not "class".
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.words: List[str] = sorted({w.strip().lower() for w in words if w and w.strip()})
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for index, word in enumerate(self.words):
+            state = 0
+            for ch in word:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(index)
+
+        # Breadth-first pass wires up failure links and merges outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                # children of the root always fail back to the root
+                self._fail[nxt] = self._goto[fail].get(ch, 0) if state else 0
+                self._out[nxt].extend(self._out[self._fail[nxt]])
+
+    def __bool__(self) -> bool:
+        return bool(self.words)
+
+    def _bounded(self, text: str, start: int, end: int) -> bool:
+        word = text[start:end]
+        if _is_word_char(word[0]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if _is_word_char(word[-1]) and end < len(text) and _is_word_char(text[end]):
+            return False
+        return True
+
+    def find_all(self, text: Optional[str]) -> List[str]:
+        """Every flagged word in `text`, in order of first appearance."""
+        if not text or not self.words:
+            return []
+        text = text.lower()
+        found: Dict[int, int] = {}  # word index -> first position
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for index in self._out[state]:
+                if index in found:
+                    continue
+                start = pos + 1 - len(self.words[index])
+                if self._bounded(text, start, pos + 1):
+                    found[index] = start
+        return [self.words[i] for i, _ in sorted(found.items(), key=lambda kv: kv[1])]
+
+
+def flag_reason_for(matches: List[str]) -> Optional[str]:
+    """Human-readable flag_reason listing the matched words."""
+    if not matches:
+        return None
+    reason = ", ".join(matches)
+    if len(reason) > FLAG_REASON_MAX:
+        reason = reason[:FLAG_REASON_MAX - 3] + "..."
+    return reason
+
+
+# ──────────────────────────────────── process-wide cache
+_lock = threading.Lock()
+_matcher: Optional[FlaggedWordMatcher] = None
+_fingerprint: Optional[Tuple] = None
+
+
+def _word_list_fingerprint(session: Session) -> Tuple:
+    # Cheap index-only probe that changes whenever a word is added or removed,
+    # including by another worker process.
+    return tuple(session.exec(
+        select(
+            func.count(FlaggedWord.id),
+            func.max(FlaggedWord.id),
+            func.max(FlaggedWord.created_at),
+        )
+    ).one())
+
+
+def get_matcher(session: Session) -> FlaggedWordMatcher:
+    """The compiled matcher for the current word list, rebuilt only on change."""
+    global _matcher, _fingerprint
+    fingerprint = _word_list_fingerprint(session)
+    matcher = _matcher
+    if matcher is not None and fingerprint == _fingerprint:
+        return matcher
+    with _lock:
+        if _matcher is None or fingerprint != _fingerprint:
+            words = session.exec(select(FlaggedWord.word)).all()
+            _matcher = FlaggedWordMatcher(words)
+            _fingerprint = fingerprint
+        return _matcher
+
+
+def invalidate_matcher() -> None:
+    """Drop the cached matcher; call after changing the flagged-word list."""
+    global _matcher, _fingerprint
+    with _lock:
+        _matcher = None
+        _fingerprint = None
+
+
+# ──────────────────────────────────── background re-moderation
+# (model, ModerationScan progress fields) for each scanned table
+_RESCAN_TARGETS = (
+    (Post, "last_post_id", "posts_scanned", "posts_flagged"),
+    (Comment, "last_comment_id", "comments_scanned", "comments_flagged"),
+)
+
+
+def start_rescan(session: Session, reason: Optional[str] = None) -> ModerationScan:
+    """Record a new scan and queue it for the background worker."""
+    scan = ModerationScan(reason=reason)
+    session.add(scan)
+    session.commit()
+    session.refresh(scan)
+    enqueue(run_rescan, scan.id)
+    return scan
+
+
+def claim_rescan_resume(session: Session, scan_id: int) -> bool:
+    """
+    Put a failed or stalled scan back to pending so it can be queued again.
+
+    The check and the update are one conditional statement, so of two
+    concurrent resumes only one succeeds, and a scan that is queued or still
+    making progress is never queued a second time. Commits.
+    """
+    stale = dt.datetime.utcnow() - dt.timedelta(seconds=RESCAN_STALE_AFTER_S)
+    claimed = session.execute(
+        update(ModerationScan)
+        .where(
+            ModerationScan.id == scan_id,
+            or_(
+                ModerationScan.status == "failed",
+                and_(ModerationScan.status == "running", ModerationScan.updated_at < stale),
+            ),
+        )
+        .values(status="pending")
+    ).rowcount
+    session.commit()
+    return bool(claimed)
+
+
+def _rescan_batch(session: Session, matcher: FlaggedWordMatcher, model,
+                  after_id: int, batch_size: int) -> Tuple[int, int, int]:
+    """Scan one id-ordered batch; returns (last id, rows scanned, rows flagged)."""
+    rows = session.exec(
+        select(model.id, model.content, model.flagged)
+        .where(model.id > after_id)
+        .order_by(model.id)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return after_id, 0, 0
+
+    # The scan only adds flags; rows that are already flagged keep their
+    # reason and nothing is ever unflagged here.
+    changes = []
+    for row_id, content, flagged in rows:
+        if flagged:
+            continue
+        matches = matcher.find_all(content)
+        if matches:
+            changes.append({"id": row_id, "flagged": True,
+                            "flag_reason": flag_reason_for(matches)})
+    if changes:
+        session.execute(update(model), changes)  # executemany, one statement
+    return rows[-1][0], len(rows), len(changes)
+
+
+def run_rescan(scan_id: int, batch_size: int = RESCAN_BATCH_SIZE) -> None:
+    """
+    Job: re-apply the flagged-word list to every existing post and comment.
+
+    Progress is committed after each batch together with the flag updates,
+    so re-running the job for the same scan resumes after the last batch.
+    The job claims its scan with a conditional update first; a copy that
+    finds it running or done does nothing, so batches are never counted twice.
+    """
+    with Session(engine) as session:
+        claimed = session.execute(
+            update(ModerationScan)
+            .where(ModerationScan.id == scan_id,
+                   ModerationScan.status.in_(("pending", "failed")))
+            .values(status="running", error=None)
+        ).rowcount
+        session.commit()
+        if not claimed:
+            return
+        scan = session.get(ModerationScan, scan_id)
+        if not scan.posts_total and not scan.comments_total:
+            scan.posts_total = session.exec(select(func.count(Post.id))).one()
+            scan.comments_total = session.exec(select(func.count(Comment.id))).one()
+        session.add(scan)
+        session.commit()
+
+        try:
+            matcher = get_matcher(session)
+            for model, last_field, scanned_field, flagged_field in _RESCAN_TARGETS:
+                while True:
+                    last_id, scanned, flagged = _rescan_batch(
+                        session, matcher, model, getattr(scan, last_field), batch_size
+                    )
+                    if not scanned:
+                        break
+                    setattr(scan, last_field, last_id)
+                    setattr(scan, scanned_field, getattr(scan, scanned_field) + scanned)
+                    setattr(scan, flagged_field, getattr(scan, flagged_field) + flagged)
+                    session.add(scan)
+                    session.commit()
+            scan.status = "done"
+            scan.finished_at = dt.datetime.utcnow()
+        except Exception as exc:
+            session.rollback()
+            logger.exception("moderation scan %s failed", scan_id)
+            scan = session.get(ModerationScan, scan_id)
+            scan.status = "failed"
+            scan.error = str(exc)[:1000]
+        session.add(scan)
+        session.commit()
@@ -0,0 +1,75 @@
+import base64
+import datetime as dt
+import os
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE     = int(os.getenv("MAX_PAGE_SIZE", "100"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# ──────────────────────────────────── cursors
+def encode_cursor(created_at: dt.datetime, row_id: int) -> str:
+    """Opaque cursor for a (created_at, id) keyset position."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[dt.datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return dt.datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+# ──────────────────────────────────── keyset queries
+def keyset_page(stmt, created_col, id_col, cursor: Optional[str], limit: int,
+                descending: bool = True):
+    """
+    Order `stmt` by (created_at, id) and start it after `cursor`.
+
+    Fetches one row more than `limit` so `split_page` can tell whether
+    another page exists without a COUNT query.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if descending:
+            stmt = stmt.where(or_(
+                created_col < created_at,
+                and_(created_col == created_at, id_col < row_id),
+            ))
+        else:
+            stmt = stmt.where(or_(
+                created_col > created_at,
+                and_(created_col == created_at, id_col > row_id),
+            ))
+    if descending:
+        stmt = stmt.order_by(created_col.desc(), id_col.desc())
+    else:
+        stmt = stmt.order_by(created_col.asc(), id_col.asc())
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int,
+               key: Optional[Callable[[Any], Any]] = None) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim the look-ahead row and build the cursor for the next page.
+
+    `key` picks the object carrying created_at/id when rows are tuples.
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = key(rows[-1]) if key else rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
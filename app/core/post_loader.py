@@ -0,0 +1,147 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from sqlmodel import Session, select
+
+from app.models.media_file import MediaFile
+from app.models.media_variant import MediaVariant, MediaVariantRead
+from app.models.post import MediaFileRead, Post, PostRead, PostWithAuthor
+from app.models.saved_post import SavedPost
+from app.models.user import User
+
+
+def select_posts_with_author(*extra_columns):
+    """Base statement for every listing that renders PostWithAuthor."""
+    return (
+        select(
+            Post.id,
+            Post.title,
+            Post.content,
+            Post.channel_id,
+            Post.author_id,
+            Post.created_at,
+            Post.updated_at,
+            Post.like_count,
+            Post.dislike_count,
+            Post.comment_count,
+            User.email.label("author_email"),
+            User.username.label("author_username"),
+            *extra_columns,
+        )
+        .join(User, Post.author_id == User.id)
+    )
+
+
+def load_attachments(
+    session: Session, post_ids: Iterable[int]
+) -> Dict[int, List[MediaFileRead]]:
+    """
+    Fetch the files of a whole page of posts, with their thumbnail and
+    preview variants, in a single IN query.
+    """
+    ids = {pid for pid in post_ids if pid is not None}
+    grouped: Dict[int, List[MediaFileRead]] = defaultdict(list)
+    if not ids:
+        return grouped
+    stmt = (
+        select(MediaFile, MediaVariant)
+        .outerjoin(MediaVariant, MediaVariant.sha256 == MediaFile.sha256)
+        .where(MediaFile.post_id.in_(ids))
+        .order_by(MediaFile.id, MediaVariant.kind, MediaVariant.width)
+    )
+    by_id: Dict[int, MediaFileRead] = {}
+    for mf, variant in session.exec(stmt):
+        read = by_id.get(mf.id)
+        if read is None:
+            read = by_id[mf.id] = MediaFileRead.model_validate(mf)
+            grouped[mf.post_id].append(read)
+        if variant is not None:
+            read.variants.append(MediaVariantRead(
+                **variant.model_dump(include={"kind", "width", "height", "mime_type"}),
+                url=f"/files/{variant.filename}",
+            ))
+    return grouped
+
+
+def load_saved_post_ids(
+    session: Session, post_ids: Iterable[int], user_id: Optional[int]
+) -> Set[int]:
+    """Which of the given posts `user_id` has saved, in one query."""
+    ids = {pid for pid in post_ids if pid is not None}
+    if not ids or user_id is None:
+        return set()
+    stmt = select(SavedPost.post_id).where(
+        SavedPost.user_id == user_id,
+        SavedPost.post_id.in_(ids),
+    )
+    return set(session.exec(stmt))
+
+
+class _PageExtras:
+    """Everything a post listing needs besides the post rows themselves."""
+
+    def __init__(
+        self,
+        session: Session,
+        post_ids: List[int],
+        user_id: Optional[int],
+        is_saved: Optional[bool],
+    ):
+        self.files = load_attachments(session, post_ids)
+        self.is_saved = is_saved
+        if is_saved is None:
+            self.saved_ids = load_saved_post_ids(session, post_ids, user_id)
+
+    def for_post(self, post_id: int) -> dict:
+        return {
+            "files": self.files.get(post_id, []),
+            "is_saved": (
+                self.is_saved if self.is_saved is not None
+                else post_id in self.saved_ids
+            ),
+        }
+
+
+def build_posts_with_author(
+    session: Session,
+    rows: Sequence,
+    user_id: Optional[int] = None,
+    is_saved: Optional[bool] = None,
+) -> List[PostWithAuthor]:
+    """
+    Turn rows from `select_posts_with_author` into response objects.
+
+    Files and the viewer's saved flags are fetched for the whole page at
+    once; reaction and comment counts come from the denormalized Post counters. Pass `is_saved` when it is already known for every
+    row (e.g. the saved-posts listing) to skip the membership query.
+    """
+    extras = _PageExtras(session, [row.id for row in rows], user_id, is_saved)
+    return [
+        PostWithAuthor(
+            id=row.id,
+            title=row.title,
+            content=row.content,
+            channel_id=row.channel_id,
+            author_id=row.author_id,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            author_email=row.author_email,
+            author_username=row.author_username,
+            like_count=row.like_count,
+            dislike_count=row.dislike_count,
+            comment_count=row.comment_count,
+            **extras.for_post(row.id),
+        )
+        for row in rows
+    ]
+
+
+def build_post_reads(
+    session: Session, posts: Sequence[Post], user_id: Optional[int] = None
+) -> List[PostRead]:
+    """Same as `build_posts_with_author` for plain `Post` rows."""
+    extras = _PageExtras(session, [post.id for post in posts], user_id, None)
+    return [
+        PostRead(**post.model_dump(), **extras.for_post(post.id))
+        for post in posts
+    ]
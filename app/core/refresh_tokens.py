@@ -0,0 +1,140 @@
+"""
+Refresh-token issue, rotation and expiry sweeping.
+
+Each refresh JWT names its row by a random jti and is good for exactly
+one /auth/refresh: using it revokes it and issues a successor. Presenting
+a token that was already rotated means it was copied, so every live token
+of that user is revoked.
+"""
+
+import datetime as dt
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+
+from app.core.jobs import enqueue
+from app.core.security import REFRESH_TTL_D, create_refresh_token
+from app.db import engine
+from app.models.refresh_token import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+SWEEP_BATCH_SIZE  = int(os.getenv("REFRESH_SWEEP_BATCH_SIZE", "1000"))
+SWEEP_INTERVAL_S  = int(os.getenv("REFRESH_SWEEP_INTERVAL_S", "3600"))
+
+
+class RefreshTokenInvalid(Exception):
+    pass
+
+
+def hash_jti(jti: str) -> str:
+    return hashlib.sha256(jti.encode()).hexdigest()
+
+
+def issue_refresh_token(session: Session, user_id: int) -> Tuple[RefreshToken, str]:
+    """Add a new token row to the session (no commit); returns (row, JWT)."""
+    jti = uuid4().hex
+    row = RefreshToken(
+        id=str(uuid4()),
+        user_id=user_id,
+        token_hash=hash_jti(jti),
+        expires_at=dt.datetime.utcnow() + dt.timedelta(days=REFRESH_TTL_D),
+    )
+    session.add(row)
+    return row, create_refresh_token(user_id, jti)
+
+
+def rotate_refresh_token(session: Session, user_id: int, jti: Optional[str]) -> str:
+    """
+    Spend the token `jti` of `user_id` and commit its successor.
+
+    Raises RefreshTokenInvalid for unknown, expired, revoked or reused
+    tokens. Returns the new refresh JWT.
+    """
+    if not jti:
+        raise RefreshTokenInvalid()
+    row = session.exec(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_jti(jti))
+    ).first()
+    if row is None or row.user_id != user_id or row.expires_at < dt.datetime.utcnow():
+        raise RefreshTokenInvalid()
+    if row.revoked:
+        if row.replaced_by is not None:
+            revoke_all(session, user_id)
+            logger.warning("refresh token reuse for user %s; revoked all tokens", user_id)
+        raise RefreshTokenInvalid()
+
+    successor, token = issue_refresh_token(session, user_id)
+    # the revoked = false guard makes two concurrent refreshes with the
+    # same token race for one rotation; the loser is rejected
+    spent = session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == row.id, RefreshToken.revoked == False)  # noqa: E712
+        .values(revoked=True, replaced_by=successor.id)
+    ).rowcount
+    if not spent:
+        session.rollback()
+        raise RefreshTokenInvalid()
+    session.commit()
+    return token
+
+
+def revoke_all(session: Session, user_id: int) -> None:
+    session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked == False,  # noqa: E712
+            RefreshToken.expires_at >= dt.datetime.utcnow(),
+        )
+        .values(revoked=True)
+    )
+    session.commit()
+
+
+# ──────────────────────────────────── expiry sweeping
+def sweep_expired_refresh_tokens(batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """
+    Job: delete expired token rows in small batches; returns rows deleted.
+
+    Each batch is its own short transaction so the sweep never holds the
+    write lock for long.
+    """
+    deleted = 0
+    now = dt.datetime.utcnow()
+    with Session(engine) as session:
+        while True:
+            ids = session.exec(
+                select(RefreshToken.id)
+                .where(RefreshToken.expires_at < now)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                break
+            deleted += session.execute(
+                delete(RefreshToken).where(RefreshToken.id.in_(ids))
+            ).rowcount
+            session.commit()
+    return deleted
+
+
+_sweep_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def maybe_schedule_sweep() -> None:
+    """Queue a sweep if this process hasn't queued one in SWEEP_INTERVAL_S."""
+    global _last_sweep
+    with _sweep_lock:
+        now = time.monotonic()
+        if _last_sweep and now - _last_sweep < SWEEP_INTERVAL_S:
+            return
+        _last_sweep = now
+    enqueue(sweep_expired_refresh_tokens)
@@ -0,0 +1,309 @@
+"""
+Response cache for public read endpoints.
+
+A route looks its response up under the request path and query string
+(and the versions of the tags it depends on) and, on a miss, stores the
+JSON it rendered. Only anonymous requests are served from or stored in
+the cache, since signed-in viewers get per-user fields such as
+``is_saved`` -- unless the route keys the entry by viewer with ``vary``.
+
+Write handlers invalidate by tag once they have committed, e.g. a new
+post bumps ``posts`` and ``channel:<id>``. Invalidation increments the
+tag's version rather than hunting down keys, so a response computed
+before the write and stored after it lands under the old version and is
+never served. Changes with no tag of their own (usernames, thumbnails
+generated later) show up once entries expire after
+``RESPONSE_CACHE_TTL_S``.
+
+Entries live in an in-process LRU, or in redis when
+``RESPONSE_CACHE_REDIS_URL`` (or ``REDIS_URL``) is set so that every API
+process shares entries and invalidations. Hit/miss counters are kept per
+process and per route.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.jobs import REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", REDIS_URL)
+RESPONSE_CACHE_PREFIX    = os.getenv("RESPONSE_CACHE_PREFIX", "edora:response")
+RESPONSE_CACHE_SIZE      = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_TTL_S     = int(os.getenv("RESPONSE_CACHE_TTL_S", "30"))
+CACHE_STATUS_HEADER = "X-Cache"
+
+# (body, headers)
+Entry = Tuple[bytes, Dict[str, str]]
+
+
+# ──────────────────────────────────── tags
+def posts_tag() -> str:
+    """The global post listing."""
+    return "posts"
+
+
+def channel_tag(channel_id: int) -> str:
+    """Listings of one channel's posts."""
+    return f"channel:{channel_id}"
+
+
+def post_tag(post_id: int) -> str:
+    """Per-post reads such as reaction counts."""
+    return f"post:{post_id}"
+
+
+def leaderboard_tag() -> str:
+    return "leaderboard"
+
+
+def feed_tag(user_id: int) -> str:
+    """Per-user state shown in a user's feed (saved flags)."""
+    return f"feed:{user_id}"
+
+
+def post_tags(post_id: int, channel_id: int) -> List[str]:
+    """Everything showing a post: the feeds and the post's own reads."""
+    return [posts_tag(), channel_tag(channel_id), post_tag(post_id)]
+
+
+# ──────────────────────────────────── backends
+class InProcessCache:
+    """LRU of key -> entry with a TTL, plus a version counter per tag."""
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: int = RESPONSE_CACHE_TTL_S):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Entry]]" = OrderedDict()
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def versions(self, tags: Sequence[str]) -> List[int]:
+        with self._lock:
+            return [self._versions[tag] for tag in tags]
+
+    def bump(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] += 1
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: Entry) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class RedisCache:
+    """The same cache in redis; entries expire through redis TTLs."""
+
+    def __init__(self, url: str, prefix: str = RESPONSE_CACHE_PREFIX,
+                 ttl: int = RESPONSE_CACHE_TTL_S):
+        from redis import Redis
+
+        self._redis = Redis.from_url(url)
+        self._prefix = prefix
+        self.ttl = ttl
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self._prefix}:tag:{tag}"
+
+    def versions(self, tags: Sequence[str]) -> List[int]:
+        if not tags:
+            return []
+        return [int(v or 0) for v in self._redis.mget([self._tag_key(t) for t in tags])]
+
+    def bump(self, tags: Iterable[str]) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(self._tag_key(tag))
+        pipe.execute()
+
+    def get(self, key: str) -> Optional[Entry]:
+        raw = self._redis.get(f"{self._prefix}:{key}")
+        if raw is None:
+            return None
+        body, headers = json.loads(raw)
+        return body.encode(), headers
+
+    def set(self, key: str, entry: Entry) -> None:
+        if self.ttl > 0:
+            body, headers = entry
+            self._redis.set(f"{self._prefix}:{key}", json.dumps([body.decode(), headers]),
+                            ex=self.ttl)
+
+    def __len__(self) -> int:
+        return 0  # not tracked; see redis INFO
+
+    def clear(self) -> None:
+        for key in self._redis.scan_iter(f"{self._prefix}:*"):
+            self._redis.delete(key)
+
+
+# ──────────────────────────────────── metrics
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "bypassed": 0}
+        )
+        self.invalidations = 0
+
+    def count(self, route: str, outcome: str) -> None:
+        with self._lock:
+            self._routes[route][outcome] += 1
+
+    def count_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {route: dict(counts) for route, counts in self._routes.items()}
+        hits = sum(c["hits"] for c in routes.values())
+        misses = sum(c["misses"] for c in routes.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+            "invalidations": self.invalidations,
+            "routes": routes,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self.invalidations = 0
+
+
+stats = CacheStats()
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The process-wide cache backend."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = (RedisCache(RESPONSE_CACHE_REDIS_URL) if RESPONSE_CACHE_REDIS_URL
+                            else InProcessCache())
+    return _backend
+
+
+# ──────────────────────────────────── route helpers
+class CachedLookup:
+    """
+    Outcome of `lookup`: `response` is the cached reply on a hit; on a miss
+    pass the rendered result to `store`, which returns what the route
+    should return.
+    """
+
+    def __init__(self, route: str, key: Optional[str], response: Optional[Response] = None):
+        self.route = route
+        self.key = key
+        self.response = response
+
+    def store(self, result: Any, response: Optional[Response] = None,
+              headers: Sequence[str] = ()) -> Any:
+        """
+        Cache `result` with the listed `headers` copied from `response`
+        (e.g. the next-page cursor) and return it as a finished Response.
+        """
+        if self.key is None:
+            return result
+        kept = {name: response.headers[name]
+                for name in headers if response is not None and name in response.headers}
+        body = json.dumps(jsonable_encoder(result), separators=(",", ":")).encode()
+        try:
+            get_backend().set(self.key, (body, kept))
+        except Exception:
+            logger.exception("could not store %s in the response cache", self.route)
+        return _reply(body, kept, "MISS")
+
+
+def _reply(body: bytes, headers: Dict[str, str], status: str) -> Response:
+    return Response(content=body, media_type="application/json",
+                    headers={**headers, CACHE_STATUS_HEADER: status})
+
+
+def _cache_key(request: Request, tags: Sequence[str], versions: Sequence[int],
+               vary: Optional[str]) -> str:
+    query = sorted(request.query_params.multi_items())
+    tagged = ",".join(f"{tag}@{version}" for tag, version in zip(tags, versions))
+    raw = f"{request.url.path}?{query}|{tagged}|{vary or ''}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def lookup(request: Request, tags: Sequence[str], cacheable: bool = True,
+           vary: Optional[str] = None) -> CachedLookup:
+    """
+    Look the request up under `tags`. Pass ``cacheable=False`` for signed-in
+    viewers; the lookup is then skipped and `store` returns its input.
+    `vary` keeps separate entries per value, e.g. per user.
+    """
+    route = getattr(request.scope.get("route"), "path", request.url.path)
+    if not cacheable:
+        stats.count(route, "bypassed")
+        return CachedLookup(route, None)
+    try:
+        backend = get_backend()
+        key = _cache_key(request, tags, backend.versions(tags), vary)
+        entry = backend.get(key)
+    except Exception:
+        # the cache is an optimisation; serve the request without it
+        logger.exception("response cache unavailable")
+        stats.count(route, "bypassed")
+        return CachedLookup(route, None)
+    if entry is not None:
+        stats.count(route, "hits")
+        body, headers = entry
+        return CachedLookup(route, key, _reply(body, headers, "HIT"))
+    stats.count(route, "misses")
+    return CachedLookup(route, key)
+
+
+def invalidate(*tags: str) -> None:
+    """Expire every cached response that depends on any of `tags`. Call after committing."""
+    if not tags:
+        return
+    try:
+        get_backend().bump(tags)
+        stats.count_invalidation()
+    except Exception:
+        logger.exception("could not invalidate %s; entries expire within the TTL", tags)
@@ -0,0 +1,188 @@
+"""
+Full-text search over posts and channels.
+
+SQLite uses FTS5 external-content tables (``post_fts`` / ``channel_fts``)
+kept in sync by triggers, ranked with BM25. Postgres uses stored
+``search_vector`` tsvector columns with GIN indexes, ranked with
+``ts_rank_cd``. Any other backend, or a SQLite build without FTS5, falls
+back to the old ILIKE scan so search keeps working, just slowly.
+"""
+
+import logging
+import re
+from typing import List, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+
+from app.models.channel import Channel
+from app.models.post import Post
+
+logger = logging.getLogger(__name__)
+
+# Title / name matches rank above body matches
+POST_WEIGHTS = (10.0, 1.0)      # title, content
+CHANNEL_WEIGHTS = (10.0, 2.0)   # name, bio
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# ──────────────────────────────────── DDL
+# (table, indexed columns) — the FTS table is named f"{table}_fts"
+_INDEXED = {
+    "post": ("title", "content"),
+    "channel": ("name", "bio"),
+}
+
+
+def _sqlite_ddl(table: str, columns: Sequence[str]) -> List[str]:
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in columns)
+    old_vals = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+    ]
+
+
+def _postgres_ddl(table: str, columns: Sequence[str]) -> List[str]:
+    weighted = " || ".join(
+        f"setweight(to_tsvector('simple', coalesce({c}, '')), '{w}')"
+        for c, w in zip(columns, "AB")
+    )
+    return [
+        f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS search_vector tsvector '
+        f"GENERATED ALWAYS AS ({weighted}) STORED",
+        f'CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON "{table}" '
+        f"USING GIN (search_vector)",
+    ]
+
+
+def _sqlite_index_exists(conn: Connection, table: str) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": f"{table}_fts"},
+    ).first() is not None
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Create the search index if missing. Safe to call on every startup."""
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as conn:
+            for table, columns in _INDEXED.items():
+                if dialect == "sqlite":
+                    fresh = not _sqlite_index_exists(conn, table)
+                    for stmt in _sqlite_ddl(table, columns):
+                        conn.execute(text(stmt))
+                    if fresh:
+                        _rebuild_table(conn, table)
+                elif dialect == "postgresql":
+                    for stmt in _postgres_ddl(table, columns):
+                        conn.execute(text(stmt))
+    except OperationalError:
+        logger.warning("full-text search unavailable, falling back to ILIKE", exc_info=True)
+
+
+def _rebuild_table(conn: Connection, table: str) -> None:
+    if conn.dialect.name == "sqlite":
+        conn.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+    elif conn.dialect.name == "postgresql":
+        conn.execute(text(f"REINDEX INDEX ix_{table}_search_vector"))
+
+
+def rebuild_search_index(engine: Engine) -> None:
+    """Repopulate the index from the base tables (e.g. after a bulk import)."""
+    ensure_search_index(engine)
+    with engine.begin() as conn:
+        for table in _INDEXED:
+            _rebuild_table(conn, table)
+
+
+# ──────────────────────────────────── queries
+def _terms(q: str) -> List[str]:
+    return _TOKEN_RE.findall(q.lower())
+
+
+def _has_index(session: Session, table: str) -> bool:
+    bind = session.get_bind()
+    if bind.dialect.name == "sqlite":
+        return _sqlite_index_exists(session.connection(), table)
+    return bind.dialect.name == "postgresql"
+
+
+def _ranked_ids(session: Session, table: str, weights, terms: List[str],
+                limit: int, offset: int) -> List[int]:
+    params = {"limit": limit, "offset": offset}
+    if session.get_bind().dialect.name == "sqlite":
+        # every term must match; each one also matches as a prefix
+        params["q"] = " ".join(f'"{t}"*' for t in terms)
+        w = ", ".join(str(x) for x in weights)
+        stmt = text(
+            f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH :q "
+            f"ORDER BY bm25({table}_fts, {w}) LIMIT :limit OFFSET :offset"
+        )
+    else:
+        params["q"] = " & ".join(f"{t}:*" for t in terms)
+        stmt = text(
+            f"SELECT id FROM \"{table}\" "
+            f"WHERE search_vector @@ to_tsquery('simple', :q) "
+            f"ORDER BY ts_rank_cd(search_vector, to_tsquery('simple', :q)) DESC, id DESC "
+            f"LIMIT :limit OFFSET :offset"
+        )
+    return [row[0] for row in session.execute(stmt, params)]
+
+
+def _load_in_order(session: Session, model, ids: List[int]):
+    if not ids:
+        return []
+    by_id = {obj.id: obj for obj in session.exec(select(model).where(model.id.in_(ids)))}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def search_posts(session: Session, q: str, limit: int, offset: int = 0) -> List[Post]:
+    """Posts matching every word of `q` (prefix match), best match first."""
+    terms = _terms(q)
+    if not terms:
+        return []
+    if not _has_index(session, "post"):
+        stmt = (
+            select(Post)
+            .where(Post.title.ilike(f"%{q}%") | Post.content.ilike(f"%{q}%"))
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(session.exec(stmt))
+    ids = _ranked_ids(session, "post", POST_WEIGHTS, terms, limit, offset)
+    return _load_in_order(session, Post, ids)
+
+
+def search_channels(session: Session, q: str, limit: int,
+                    offset: int = 0) -> List[Channel]:
+    """Channels whose name or bio match every word of `q`, best match first."""
+    terms = _terms(q)
+    if not terms:
+        return []
+    if not _has_index(session, "channel"):
+        stmt = (
+            select(Channel)
+            .where(Channel.name.ilike(f"%{q}%") | Channel.bio.ilike(f"%{q}%"))
+            .order_by(Channel.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(session.exec(stmt))
+    ids = _ranked_ids(session, "channel", CHANNEL_WEIGHTS, terms, limit, offset)
+    return _load_in_order(session, Channel, ids)
@@ -1,5 +1,10 @@
+import asyncio
 import os
 import datetime as dt
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
 import bcrypt
 from jose import jwt, JWTError
 
@@ -8,25 +13,77 @@ ACCESS_TTL_MIN = 30
 REFRESH_TTL_D  = 7
 JWT_SECRET     = os.getenv("JWT_SECRET", "dev-secret-change-me")
 
+BCRYPT_ROUNDS       = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_WORKERS    = int(os.getenv("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_MAX_QUEUED = int(os.getenv("PASSWORD_MAX_QUEUED", str(PASSWORD_WORKERS * 8)))
+
 # ──────────────────────────────────── password
-def hash_password(plain: str) -> str:
-    salt = bcrypt.gensalt()
+def hash_password(plain: str, rounds: Optional[int] = None) -> str:
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
     return bcrypt.hashpw(plain.encode(), salt).decode()
 
 def verify_password(plain: str, hashed: str) -> bool:
     return bcrypt.checkpw(plain.encode(), hashed.encode())
 
+def needs_rehash(hashed: str) -> bool:
+    """True when `hashed` was made with a cost other than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+# ──────────────────────────────────── password pool
+# bcrypt is deliberately slow CPU work. Running it in a separate process
+# pool keeps it off the request threadpool, and capping the work in
+# flight turns a login storm into quick 429s instead of a backlog that
+# starves every other endpoint.
+class PasswordPoolBusy(Exception):
+    pass
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_in_flight = 0
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=PASSWORD_WORKERS)
+    return _pool
+
+async def _run_in_pool(func, *args):
+    global _in_flight
+    with _pool_lock:
+        if _in_flight >= PASSWORD_WORKERS + PASSWORD_MAX_QUEUED:
+            raise PasswordPoolBusy()
+        _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), func, *args)
+    finally:
+        with _pool_lock:
+            _in_flight -= 1
+
+async def hash_password_async(plain: str) -> str:
+    """`hash_password` in the password pool; raises PasswordPoolBusy when full."""
+    return await _run_in_pool(hash_password, plain, BCRYPT_ROUNDS)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """`verify_password` in the password pool; raises PasswordPoolBusy when full."""
+    return await _run_in_pool(verify_password, plain, hashed)
+
 # ──────────────────────────────────── tokens
-def _token(exp_delta: dt.timedelta, sub: str) -> str:
+def _token(exp_delta: dt.timedelta, sub: str, **claims) -> str:
     now = dt.datetime.utcnow()
-    payload = {"sub": sub, "iat": now, "exp": now + exp_delta}
+    payload = {"sub": sub, "iat": now, "exp": now + exp_delta, **claims}
     return jwt.encode(payload, JWT_SECRET, algorithm=ALGORITHM)
 
 def create_access_token(user_id: int) -> str:
     return _token(dt.timedelta(minutes=ACCESS_TTL_MIN), str(user_id))
 
-def create_refresh_token(user_id: int) -> str:
-    return _token(dt.timedelta(days=REFRESH_TTL_D),  str(user_id))
+def create_refresh_token(user_id: int, jti: str) -> str:
+    """Refresh JWT whose `jti` names its RefreshToken row (see app.core.refresh_tokens)."""
+    return _token(dt.timedelta(days=REFRESH_TTL_D), str(user_id), jti=jti)
 
 def decode_token(token: str) -> dict:
     return jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
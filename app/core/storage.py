@@ -0,0 +1,218 @@
+"""
+Upload storage.
+
+Uploaded bytes are stored once per distinct content under
+uploads/blobs/<aa>/<bb>/<sha256>; MediaFile rows point at a blob and
+MediaBlob.ref_count tracks how many do. Thumbnails and previews of a blob
+live under uploads/variants/<aa>/<bb>/<sha256>/.
+"""
+
+import datetime as dt
+import hashlib
+import logging
+import os
+import shutil
+from collections import Counter
+from contextlib import suppress
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+from sqlalchemy import bindparam, delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.models.media_blob import MediaBlob
+from app.models.media_file import MediaFile
+from app.models.media_variant import MediaVariant
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR       = Path("uploads")
+BLOB_DIR         = UPLOAD_DIR / "blobs"
+VARIANT_DIR      = UPLOAD_DIR / "variants"
+TMP_DIR          = UPLOAD_DIR / "tmp"
+CHUNK_SIZE       = 1024 * 1024                                            # 1 MiB
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))  # 10 MB
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+async def stream_to_temp(upload: UploadFile,
+                         max_bytes: Optional[int] = None) -> Tuple[Path, int, str]:
+    """
+    Copy an upload to a temp file in CHUNK_SIZE pieces without blocking the loop.
+
+    The size limit is enforced while streaming and the sha256 is computed on
+    the fly, so the blob's final location is known once the copy finishes.
+    Returns (temp path, size in bytes, sha256 hex digest); the caller moves
+    the temp file into place with `link_blob` or removes it.
+    """
+    if max_bytes is None:
+        max_bytes = MAX_UPLOAD_BYTES
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLarge()
+
+    await aiofiles.os.makedirs(TMP_DIR, exist_ok=True)
+    tmp = TMP_DIR / f"{uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp, "wb") as out:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            await aiofiles.os.remove(tmp)
+        raise
+    return tmp, size, digest.hexdigest()
+
+
+def hash_file(path: Path) -> Tuple[int, str]:
+    """(size, sha256 hex digest) of a file already on disk."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            size += len(chunk)
+            digest.update(chunk)
+    return size, digest.hexdigest()
+
+
+# ──────────────────────────────────── content-addressed blobs
+def blob_relpath(sha256: str) -> Path:
+    """Blob location relative to UPLOAD_DIR, sharded two levels deep."""
+    return BLOB_DIR.relative_to(UPLOAD_DIR) / sha256[:2] / sha256[2:4] / sha256
+
+
+def variant_relpath(sha256: str) -> Path:
+    """Directory of a blob's thumbnails/previews, relative to UPLOAD_DIR."""
+    return VARIANT_DIR.relative_to(UPLOAD_DIR) / sha256[:2] / sha256[2:4] / sha256
+
+
+def link_blob(session: Session, src: Path, sha256: str, size: int) -> Path:
+    """
+    Take a reference on the blob for `sha256`, moving `src` into the store.
+
+    Does not commit. The reference is taken with a single upsert, so two
+    uploads of new identical content cannot both try to insert the row.
+    The file move happens after that write has taken the row lock and
+    before the caller commits, so it cannot interleave with `purge_blob`
+    removing the same blob. Replacing an existing blob is harmless since
+    the content is identical.
+    """
+    table = MediaBlob.__table__
+    row = {"sha256": sha256, "size": size, "ref_count": 1, "created_at": dt.datetime.utcnow()}
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        upsert = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(table)
+        session.execute(upsert.values(**row).on_conflict_do_update(
+            index_elements=["sha256"],
+            set_={"ref_count": table.c.ref_count + 1},
+        ))
+    else:
+        bumped = session.execute(
+            update(table)
+            .where(table.c.sha256 == sha256)
+            .values(ref_count=table.c.ref_count + 1)
+        ).rowcount
+        if not bumped:
+            session.execute(table.insert().values(**row))
+
+    dest = UPLOAD_DIR / blob_relpath(sha256)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(src, dest)
+    return blob_relpath(sha256)
+
+
+def release_blobs(session: Session, sha256s: Iterable[Optional[str]]) -> List[str]:
+    """
+    Drop one reference per entry (repeats count). Does not commit.
+
+    Returns the digests whose blobs may now be unreferenced; pass them to
+    `purge_blobs` after committing.
+    """
+    counts = Counter(sha for sha in sha256s if sha)
+    if counts:
+        blobs = MediaBlob.__table__
+        session.connection().execute(  # executemany, one statement
+            update(blobs)
+            .where(blobs.c.sha256 == bindparam("sha"))
+            .values(ref_count=blobs.c.ref_count - bindparam("n")),
+            [{"sha": sha256, "n": n} for sha256, n in counts.items()],
+        )
+    return list(counts)
+
+
+def purge_blobs(sha256s: Iterable[str]) -> int:
+    """
+    Job: delete the bytes and variants of every listed blob that has no
+    references left.
+
+    A blob that was re-linked in the meantime has ref_count > 0 again and
+    is left alone. Returns the number of blobs removed.
+    """
+    removed = 0
+    with Session(engine) as session:
+        for sha256 in sha256s:
+            unreferenced = select(MediaBlob.sha256).where(
+                MediaBlob.sha256 == sha256, MediaBlob.ref_count <= 0
+            )
+            session.execute(
+                delete(MediaVariant)
+                .where(MediaVariant.sha256 == sha256, unreferenced.exists())
+            )
+            deleted = session.execute(
+                delete(MediaBlob)
+                .where(MediaBlob.sha256 == sha256, MediaBlob.ref_count <= 0)
+            ).rowcount
+            if deleted:
+                with suppress(FileNotFoundError):
+                    os.remove(UPLOAD_DIR / blob_relpath(sha256))
+                shutil.rmtree(UPLOAD_DIR / variant_relpath(sha256), ignore_errors=True)
+                removed += 1
+            session.commit()
+    return removed
+
+
+def dedupe_uploads(session: Session) -> Tuple[int, int]:
+    """
+    Move files from the old one-directory-per-upload layout into the blob store.
+
+    Each row is committed on its own so an interrupted run can simply be
+    started again. Returns (files moved, bytes freed by deduplication).
+    """
+    moved = freed = 0
+    prefix = f"{BLOB_DIR.relative_to(UPLOAD_DIR).as_posix()}/"
+    rows = session.exec(
+        select(MediaFile.id).where(MediaFile.filename.not_like(f"{prefix}%")).order_by(MediaFile.id)
+    ).all()
+    for file_id in rows:
+        mf = session.get(MediaFile, file_id)
+        src = UPLOAD_DIR / mf.filename
+        if not src.is_file():
+            logger.warning("media file %s: %s is missing, skipped", mf.id, src)
+            continue
+        size, sha256 = hash_file(src)
+        if session.get(MediaBlob, sha256) is not None:
+            freed += size
+        mf.original_name = mf.original_name or Path(mf.filename).name
+        mf.filename = str(link_blob(session, src, sha256, size))
+        mf.sha256 = sha256
+        mf.size = size
+        session.add(mf)
+        session.commit()
+        with suppress(OSError):
+            os.rmdir(src.parent)  # only succeeds once the per-upload folder is empty
+        moved += 1
+    return moved, freed
@@ -0,0 +1,74 @@
+"""
+Short-lived in-process cache of authenticated user principals.
+
+`current_user` runs on every authenticated request; caching the user row
+by id for a few seconds lets the common case skip the database. Entries
+are dropped whenever a User row is updated through the ORM in this
+process, and expire after ``USER_CACHE_TTL_S`` so changes made by other
+processes are picked up soon after.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.models.user import User
+
+USER_CACHE_SIZE  = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_S = float(os.getenv("USER_CACHE_TTL_S", "30"))
+
+
+class UserPrincipalCache:
+    """LRU of user id -> column values, each entry valid for `ttl` seconds."""
+
+    def __init__(self, maxsize: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL_S):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[User]:
+        """A fresh, session-less User for `user_id`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # a new instance per request, so callers can't modify the cached copy
+        return User(**values)
+
+    def put(self, user: User) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        values = user.model_dump()
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserPrincipalCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _drop_changed_user(mapper, connection, target: User) -> None:
+    # role, is_active, username, ... may have changed
+    user_cache.invalidate(target.id)
@@ -1,14 +1,96 @@
 # app/db.py
+"""
+The one database engine shared by every router, job and command.
+
+Pool sizes and timeouts come from the environment. SQLite connections are
+switched to WAL on connect so readers never wait for the writer, with
+synchronous=NORMAL (durable across application crashes, fsync only at
+checkpoints), a busy timeout instead of immediate "database is locked"
+errors, and memory-mapped reads.
+
+`async_engine` is the same database through an asyncio driver (aiosqlite,
+or asyncpg for Postgres) for routes that take `get_async_session`; it is
+tuned the same way and has its own pool.
+"""
+
 import os
-from sqlmodel import SQLModel, create_engine, Session
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 # Use the synchronous SQLite driver for our API
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./data/app.db") \
     .replace("sqlite+aiosqlite", "sqlite")
 
-# Create the engine
-engine = create_engine(DATABASE_URL, echo=True)
+# The asyncio driver for the same database
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+DB_ECHO            = os.getenv("DB_ECHO", "").lower() in ("1", "true", "yes")
+DB_POOL_SIZE       = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW    = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT_S  = int(os.getenv("DB_POOL_TIMEOUT_S", "30"))
+DB_POOL_RECYCLE_S  = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS     = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE       = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256 MiB
+
+
+def _engine_options(url) -> dict:
+    options = {"echo": DB_ECHO, "pool_pre_ping": True}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {
+            "check_same_thread": False,  # sessions hop between threadpool workers
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+        if url.database in (None, "", ":memory:"):
+            return options  # in-memory databases keep their single connection
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_S,
+        pool_recycle=DB_POOL_RECYCLE_S,
+    )
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_conn, _record) -> None:
+    cursor = dbapi_conn.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    finally:
+        cursor.close()
+
+
+def build_engine(database_url: str = DATABASE_URL):
+    url = make_url(database_url)
+    engine = create_engine(url, **_engine_options(url))
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+def build_async_engine(database_url: str = DATABASE_URL):
+    url = make_url(database_url)
+    url = url.set(drivername=_ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+    options = _engine_options(url)
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"].pop("check_same_thread")  # aiosqlite owns its thread
+    engine = create_async_engine(url, **options)
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+# Create the engines
+engine = build_engine()
+async_engine = build_async_engine()
 
 # sessionmaker that yields SQLModel Session objects
 SessionLocal = sessionmaker(
@@ -25,8 +107,28 @@ def get_session():
     with SessionLocal() as session:
         yield session
 
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+async def get_async_session():
+    """
+    Dependency for `async def` routes that query without the threadpool.
+    Usage: session: AsyncSession = Depends(get_async_session)
+
+    Sync helpers can still be reused with `await session.run_sync(fn, ...)`,
+    which calls `fn(sync_session, ...)`.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
 def init_db():
     """
     Call this on app startup if you want to auto-create tables.
     """
+    from app.core.search import ensure_search_index
+
     SQLModel.metadata.create_all(engine)
+    ensure_search_index(engine)
@@ -0,0 +1,366 @@
+"""
+Incrementally maintained points leaderboard.
+
+The board is a sorted set of (user id, points) ordered by points
+descending, ties broken by user id. It lives in process as an indexable
+skip list, or in a redis sorted set when ``LEADERBOARD_REDIS_URL`` (or
+``REDIS_URL``) is set so that every API process shares one board. Top-N,
+rank and around-me lookups are O(log n + k).
+
+The ledger aggregator pushes new totals after each batch. An in-process
+board is also reloaded from User.points every ``LEADERBOARD_RELOAD_S`` to
+pick up batches applied by other processes, and ``reconcile_points``
+(``python -m app.manage reconcile-leaderboard``) re-derives User.points
+from the applied PointTransaction rows and rebuilds the board. Leaderboard
+reads also queue that as a job every ``LEADERBOARD_RECONCILE_S``.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import update
+from sqlmodel import Session, func, select
+
+from app.core import response_cache
+from app.core.jobs import REDIS_URL, enqueue_unique, release_unique
+from app.db import engine
+from app.models.user import User
+from .models import PointTransaction
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_REDIS_URL = os.getenv("LEADERBOARD_REDIS_URL", REDIS_URL)
+LEADERBOARD_KEY       = os.getenv("LEADERBOARD_KEY", "edora:leaderboard")
+LEADERBOARD_RELOAD_S  = int(os.getenv("LEADERBOARD_RELOAD_S", "300"))
+LEADERBOARD_RECONCILE_S = int(os.getenv("LEADERBOARD_RECONCILE_S", "3600"))
+RECONCILE_JOB_KEY = "reconcile-leaderboard"
+
+# (rank, user id, points); ranks start at 1
+Entry = Tuple[int, int, int]
+
+
+# ──────────────────────────────────── skip list
+class _Node:
+    __slots__ = ("key", "forward", "span")
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.forward: List[Optional["_Node"]] = [None] * level
+        self.span: List[int] = [0] * level
+
+
+class RankedSet:
+    """
+    Indexable skip list of (user id, points) ordered for a leaderboard.
+
+    Every forward link remembers how many positions it skips, so the rank
+    of a member and the member at a rank are both found in O(log n).
+    """
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self, items: Iterable[Tuple[int, int]] = ()):
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._level = 1
+        self._scores: Dict[int, int] = {}
+        for member, score in items:
+            self.set(member, score)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, member: int) -> bool:
+        return member in self._scores
+
+    @staticmethod
+    def _key(member: int, score: int) -> Tuple[int, int]:
+        return (-score, member)
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and random.random() < self.P:
+            level += 1
+        return level
+
+    def score(self, member: int) -> Optional[int]:
+        return self._scores.get(member)
+
+    def set(self, member: int, score: int) -> None:
+        old = self._scores.get(member)
+        if old == score:
+            return
+        if old is not None:
+            del self._scores[member]
+            self._delete(self._key(member, old))
+        self._insert(self._key(member, score))
+        self._scores[member] = score
+
+    def discard(self, member: int) -> None:
+        old = self._scores.pop(member, None)
+        if old is not None:
+            self._delete(self._key(member, old))
+
+    def _insert(self, key) -> None:
+        update: List[_Node] = [self._head] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        node = self._head
+        for i in reversed(range(self._level)):
+            rank[i] = 0 if i == self._level - 1 else rank[i + 1]
+            while node.forward[i] is not None and node.forward[i].key < key:
+                rank[i] += node.span[i]
+                node = node.forward[i]
+            update[i] = node
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                rank[i] = 0
+                update[i] = self._head
+                self._head.span[i] = len(self._scores)
+            self._level = level
+
+        new = _Node(key, level)
+        for i in range(level):
+            new.forward[i] = update[i].forward[i]
+            update[i].forward[i] = new
+            new.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        for i in range(level, self._level):
+            update[i].span[i] += 1
+
+    def _delete(self, key) -> None:
+        update: List[_Node] = [self._head] * self.MAX_LEVEL
+        node = self._head
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and node.forward[i].key < key:
+                node = node.forward[i]
+            update[i] = node
+        target = node.forward[0]
+        if target is None or target.key != key:
+            return
+        for i in range(self._level):
+            if update[i].forward[i] is target:
+                update[i].span[i] += target.span[i] - 1
+                update[i].forward[i] = target.forward[i]
+            else:
+                update[i].span[i] -= 1
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+
+    def rank(self, member: int) -> Optional[int]:
+        """1-based position of `member`, or None if absent."""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        key = self._key(member, score)
+        node, rank = self._head, 0
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and node.forward[i].key <= key:
+                rank += node.span[i]
+                node = node.forward[i]
+            if node.key == key:
+                return rank
+        return None
+
+    def range(self, start: int, count: int) -> List[Entry]:
+        """Up to `count` entries starting at 1-based rank `start`."""
+        if count <= 0 or start > len(self):
+            return []
+        start = max(start, 1)
+        node, traversed = self._head, 0
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and traversed + node.span[i] <= start:
+                traversed += node.span[i]
+                node = node.forward[i]
+        entries = []
+        rank = start
+        while node is not None and len(entries) < count:
+            neg_score, member = node.key
+            entries.append((rank, member, -neg_score))
+            node = node.forward[0]
+            rank += 1
+        return entries
+
+
+# ──────────────────────────────────── backends
+class InProcessLeaderboard:
+    """RankedSet behind a lock, reloaded from the database now and then."""
+
+    def __init__(self, reload_after_s: int = LEADERBOARD_RELOAD_S):
+        self._set: Optional[RankedSet] = None
+        self._loaded_at = 0.0
+        self._reload_after_s = reload_after_s
+        self._lock = threading.Lock()
+
+    def needs_load(self) -> bool:
+        return self._set is None or time.monotonic() - self._loaded_at > self._reload_after_s
+
+    def replace_all(self, scores: Iterable[Tuple[int, int]]) -> None:
+        ranked = RankedSet(scores)
+        with self._lock:
+            self._set = ranked
+            self._loaded_at = time.monotonic()
+
+    def set_scores(self, scores: Mapping[int, int]) -> None:
+        with self._lock:
+            if self._set is None:
+                return  # the next load reads the new totals anyway
+            for user_id, points in scores.items():
+                self._set.set(user_id, points)
+
+    def top(self, limit: int) -> List[Entry]:
+        with self._lock:
+            return self._set.range(1, limit) if self._set else []
+
+    def around(self, user_id: int, radius: int) -> List[Entry]:
+        with self._lock:
+            rank = self._set.rank(user_id) if self._set else None
+            if rank is None:
+                return []
+            start = max(1, rank - radius)
+            return self._set.range(start, rank + radius - start + 1)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._set = None
+
+
+class RedisLeaderboard:
+    """The same board as a redis sorted set shared by every process."""
+
+    def __init__(self, url: str, key: str = LEADERBOARD_KEY):
+        from redis import Redis
+
+        self._redis = Redis.from_url(url)
+        self._key = key
+
+    def needs_load(self) -> bool:
+        return not self._redis.exists(self._key)
+
+    def replace_all(self, scores: Iterable[Tuple[int, int]], chunk: int = 5000) -> None:
+        # build under a scratch key and swap it in, so readers never see half a board
+        scratch = f"{self._key}:loading"
+        self._redis.delete(scratch)
+        batch: Dict[str, int] = {}
+        for user_id, points in scores:
+            batch[str(user_id)] = points
+            if len(batch) >= chunk:
+                self._redis.zadd(scratch, batch)
+                batch = {}
+        if batch:
+            self._redis.zadd(scratch, batch)
+        if self._redis.exists(scratch):
+            self._redis.rename(scratch, self._key)
+        else:
+            self._redis.delete(self._key)
+
+    def set_scores(self, scores: Mapping[int, int]) -> None:
+        if scores and not self.needs_load():
+            self._redis.zadd(self._key, {str(uid): pts for uid, pts in scores.items()})
+
+    def _entries(self, start: int, stop: int) -> List[Entry]:
+        rows = self._redis.zrevrange(self._key, start, stop, withscores=True)
+        return [(start + i + 1, int(member), int(score)) for i, (member, score) in enumerate(rows)]
+
+    def top(self, limit: int) -> List[Entry]:
+        return self._entries(0, limit - 1) if limit > 0 else []
+
+    def around(self, user_id: int, radius: int) -> List[Entry]:
+        rank = self._redis.zrevrank(self._key, str(user_id))
+        if rank is None:
+            return []
+        return self._entries(max(0, rank - radius), rank + radius)
+
+    def clear(self) -> None:
+        self._redis.delete(self._key)
+
+
+_board = None
+_board_lock = threading.Lock()
+
+
+def get_board():
+    """The process-wide leaderboard backend."""
+    global _board
+    if _board is None:
+        with _board_lock:
+            if _board is None:
+                _board = (RedisLeaderboard(LEADERBOARD_REDIS_URL) if LEADERBOARD_REDIS_URL
+                          else InProcessLeaderboard())
+    return _board
+
+
+# ──────────────────────────────────── database sync
+def load_board(session: Session, force: bool = False):
+    """The leaderboard, (re)built from User.points if due."""
+    board = get_board()
+    if force or board.needs_load():
+        board.replace_all(session.exec(select(User.id, User.points)).all())
+    return board
+
+
+def push_scores(session: Session, user_ids: Iterable[int]) -> None:
+    """Copy the current User.points of `user_ids` onto the board."""
+    ids = list(user_ids)
+    if not ids:
+        return
+    try:
+        rows = session.exec(select(User.id, User.points).where(User.id.in_(ids))).all()
+        get_board().set_scores(dict(rows))
+    except Exception:
+        # the board is a cache; the next reload or reconcile repairs it
+        logger.exception("could not update the leaderboard")
+
+
+def reconcile_points(session: Session) -> int:
+    """
+    Reset User.points to the sum of each user's applied ledger rows and
+    rebuild the board. Returns how many users had drifted.
+    """
+    ledger_total = (
+        select(func.coalesce(func.sum(PointTransaction.points), 0))
+        .where(
+            PointTransaction.user_id == User.id,
+            PointTransaction.applied == True,  # noqa: E712
+        )
+        .scalar_subquery()
+    )
+    fixed = session.execute(
+        update(User)
+        .where(User.points != ledger_total)
+        .values(points=ledger_total)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    session.commit()
+    if fixed:
+        logger.warning("reconciled points for %s user(s)", fixed)
+    load_board(session, force=True)
+    response_cache.invalidate(response_cache.leaderboard_tag())
+    return fixed
+
+
+def reconcile_leaderboard() -> int:
+    """Job: `reconcile_points` on its own session."""
+    release_unique(RECONCILE_JOB_KEY)
+    with Session(engine) as session:
+        return reconcile_points(session)
+
+
+_reconcile_lock = threading.Lock()
+_last_reconcile = time.monotonic()  # the first run waits a full interval
+
+
+def maybe_schedule_reconcile() -> None:
+    """Queue a reconcile if this process hasn't queued one in LEADERBOARD_RECONCILE_S."""
+    global _last_reconcile
+    with _reconcile_lock:
+        now = time.monotonic()
+        if now - _last_reconcile < LEADERBOARD_RECONCILE_S:
+            return
+        _last_reconcile = now
+    enqueue_unique(RECONCILE_JOB_KEY, reconcile_leaderboard)
@@ -0,0 +1,124 @@
+"""
+Batched application of the points ledger.
+
+Awards are appended to PointTransaction as unapplied rows inside the
+request's own transaction. `apply_pending_points` later claims pending
+rows in id order, sums them per user and moves User.points with one
+relative UPDATE per user per batch, so a popular author's row is written
+once per batch instead of once per like. The same batch feeds the daily
+rollups behind the windowed leaderboards.
+
+Commits that add awards queue a flush through `enqueue_unique`, so
+bursts from every API process collapse onto one waiting run. Leaderboard
+reads also queue one every ``POINTS_FLUSH_INTERVAL_S`` as a safety net
+for rows whose flush was lost.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict
+
+from sqlalchemy import bindparam, update
+from sqlmodel import Session, select
+
+from app.core import response_cache
+from app.core.jobs import enqueue, enqueue_unique, release_unique
+from app.db import engine
+from app.models.user import User
+from .leaderboard import push_scores
+from .models import PointTransaction
+from .rollups import add_to_daily_rollups
+
+logger = logging.getLogger(__name__)
+
+POINTS_BATCH_SIZE       = int(os.getenv("POINTS_BATCH_SIZE", "1000"))
+POINTS_FLUSH_INTERVAL_S = int(os.getenv("POINTS_FLUSH_INTERVAL_S", "60"))
+POINTS_FLUSH_JOB_KEY    = "apply-pending-points"
+
+
+def apply_pending_batch(session: Session, batch_size: int = POINTS_BATCH_SIZE) -> int:
+    """
+    Apply one batch of pending ledger rows and commit; returns rows applied.
+
+    Rows are claimed with ``applied = false`` in the WHERE clause, so if
+    another aggregator got to some of them first the batch is rolled back
+    and nothing is counted twice.
+    """
+    rows = session.exec(
+        select(PointTransaction.id, PointTransaction.user_id, PointTransaction.points,
+               PointTransaction.created_at)
+        .where(PointTransaction.applied == False)  # noqa: E712
+        .order_by(PointTransaction.id)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+
+    ids = [row[0] for row in rows]
+    claimed = session.execute(
+        update(PointTransaction)
+        .where(PointTransaction.id.in_(ids), PointTransaction.applied == False)  # noqa: E712
+        .values(applied=True)
+    ).rowcount
+    if claimed != len(ids):
+        session.rollback()
+        return 0
+
+    deltas: Dict[int, int] = defaultdict(int)
+    for _, user_id, points, _ in rows:
+        deltas[user_id] += points
+    changes = [{"uid": user_id, "delta": delta} for user_id, delta in deltas.items() if delta]
+    if changes:
+        session.connection().execute(
+            update(User.__table__)
+            .where(User.__table__.c.id == bindparam("uid"))
+            .values(points=User.__table__.c.points + bindparam("delta")),
+            changes,
+        )
+    add_to_daily_rollups(session, [(user_id, created_at, points)
+                                   for _, user_id, points, created_at in rows])
+    session.commit()
+    push_scores(session, deltas)
+    response_cache.invalidate(response_cache.leaderboard_tag())
+    return len(rows)
+
+
+def apply_pending_points(batch_size: int = POINTS_BATCH_SIZE) -> int:
+    """Job: drain the pending ledger in batches; returns rows applied."""
+    release_unique(POINTS_FLUSH_JOB_KEY)
+    applied = 0
+    with Session(engine) as session:
+        while True:
+            done = apply_pending_batch(session, batch_size)
+            if not done:
+                break
+            applied += done
+    return applied
+
+
+def schedule_points_flush(*_args) -> None:
+    """
+    Queue `apply_pending_points` unless a run is already waiting.
+
+    Events that arrive while a run is queued are picked up by that run,
+    which is what lets bursts collapse into a few large batches.
+    """
+    enqueue_unique(POINTS_FLUSH_JOB_KEY, apply_pending_points)
+
+
+_periodic_lock = threading.Lock()
+_last_periodic_flush = 0.0
+
+
+def maybe_schedule_points_flush() -> None:
+    """Queue a flush if this process hasn't queued one in POINTS_FLUSH_INTERVAL_S."""
+    global _last_periodic_flush
+    with _periodic_lock:
+        now = time.monotonic()
+        if _last_periodic_flush and now - _last_periodic_flush < POINTS_FLUSH_INTERVAL_S:
+            return
+        _last_periodic_flush = now
+    enqueue(apply_pending_points)
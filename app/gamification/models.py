@@ -2,7 +2,7 @@ import datetime as dt
 from typing import Optional, TYPE_CHECKING
 from enum import Enum
 
-from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel import Field, Index, Relationship, SQLModel
 
 if TYPE_CHECKING:
     from ..models.user import User
@@ -16,6 +16,21 @@ class ActionType(str, Enum):
 
 
 class PointTransaction(SQLModel, table=True):
+    """
+    Append-only points ledger.
+
+    Rows are written in the same transaction as the action that earned
+    them and start out unapplied; app.gamification.ledger later folds
+    them into User.points in batches and sets `applied`.
+    """
+
+    __table_args__ = (
+        # the aggregator's scan for pending rows
+        Index("ix_pointtransaction_applied_id", "applied", "id"),
+        # per-user history, newest first, with an id tiebreak for cursors
+        Index("ix_pointtransaction_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", nullable=False)
     points: int = Field(nullable=False)  # Can be positive or negative
@@ -23,7 +38,11 @@ class PointTransaction(SQLModel, table=True):
     description: str = Field(max_length=255)
     related_entity_id: Optional[int] = Field(default=None)
     related_entity_type: Optional[str] = Field(default=None, max_length=50)
-    
+    # set once the points are included in User.points
+    applied: bool = Field(default=False, nullable=False, sa_column_kwargs={"server_default": "0"})
+    # one ledger row per key, e.g. "post_upload:post:42"; NULL means no dedup
+    idempotency_key: Optional[str] = Field(default=None, max_length=128, unique=True, index=True)
+
     created_at: dt.datetime = Field(
         default_factory=dt.datetime.utcnow, 
         nullable=False
@@ -33,6 +52,21 @@ class PointTransaction(SQLModel, table=True):
     user: "User" = Relationship()
 
 
+class UserPointsDaily(SQLModel, table=True):
+    """
+    Points earned per user per UTC day, maintained by the ledger aggregator
+    so windowed leaderboards never scan PointTransaction.
+    """
+
+    __table_args__ = (
+        Index("ix_userpointsdaily_day_user_id", "day", "user_id"),
+    )
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    day: dt.date = Field(primary_key=True)
+    points: int = Field(default=0, nullable=False)
+
+
 class PointTransactionRead(SQLModel):
     id: int
     user_id: int
@@ -0,0 +1,122 @@
+"""
+Per-day points rollups and the time-windowed leaderboards built on them.
+
+Each batch of ledger rows applied by app.gamification.ledger is also
+added to UserPointsDaily in the same transaction, so a weekly leaderboard
+sums at most seven rows per active user.
+"""
+
+import datetime as dt
+from collections import defaultdict
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, func, select
+
+from app.core import response_cache
+from app.models.user import User
+from .models import PointTransaction, UserPointsDaily, UserPointsRead
+
+
+class LeaderboardWindow(str, Enum):
+    ALL = "all"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+# how many UTC days, including today, each window covers
+_WINDOW_DAYS = {
+    LeaderboardWindow.DAY: 1,
+    LeaderboardWindow.WEEK: 7,
+    LeaderboardWindow.MONTH: 30,
+}
+
+
+def window_start(window: LeaderboardWindow, today: Optional[dt.date] = None) -> dt.date:
+    today = today or dt.datetime.utcnow().date()
+    return today - dt.timedelta(days=_WINDOW_DAYS[window] - 1)
+
+
+def add_to_daily_rollups(
+    session: Session, rows: Iterable[Tuple[int, dt.datetime, int]]
+) -> None:
+    """
+    Add (user id, created_at, points) ledger rows to the daily buckets.
+
+    Does not commit. Rows are summed per bucket first, so each touched
+    bucket gets a single upsert.
+    """
+    buckets: Dict[Tuple[int, dt.date], int] = defaultdict(int)
+    for user_id, created_at, points in rows:
+        buckets[(user_id, created_at.date())] += points
+    if not buckets:
+        return
+    values = [{"user_id": uid, "day": day, "points": pts} for (uid, day), pts in buckets.items()]
+
+    table = UserPointsDaily.__table__
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        upsert = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(table)
+        session.execute(upsert.on_conflict_do_update(
+            index_elements=["user_id", "day"],
+            set_={"points": table.c.points + upsert.excluded.points},
+        ), values)
+        return
+
+    for row in values:
+        bumped = session.execute(
+            update(table)
+            .where(table.c.user_id == row["user_id"], table.c.day == row["day"])
+            .values(points=table.c.points + row["points"])
+        ).rowcount
+        if not bumped:
+            session.execute(insert(table).values(**row))
+
+
+def rebuild_daily_rollups(session: Session) -> int:
+    """Recompute every bucket from the applied ledger; returns bucket count."""
+    session.execute(delete(UserPointsDaily))
+    day = func.date(PointTransaction.created_at)
+    rows = session.exec(
+        select(PointTransaction.user_id, day, func.sum(PointTransaction.points))
+        .where(PointTransaction.applied == True)  # noqa: E712
+        .group_by(PointTransaction.user_id, day)
+    ).all()
+    session.add_all([
+        UserPointsDaily(
+            user_id=user_id,
+            day=d if isinstance(d, dt.date) else dt.date.fromisoformat(d),
+            points=points,
+        )
+        for user_id, d, points in rows
+    ])
+    session.commit()
+    response_cache.invalidate(response_cache.leaderboard_tag())
+    return len(rows)
+
+
+def windowed_leaderboard(
+    session: Session, window: LeaderboardWindow, limit: int
+) -> List[UserPointsRead]:
+    """Top users by points earned within `window`, from the daily rollups."""
+    total = func.sum(UserPointsDaily.points).label("total")
+    ranked = (
+        select(UserPointsDaily.user_id, total)
+        .where(UserPointsDaily.day >= window_start(window))
+        .group_by(UserPointsDaily.user_id)
+        .order_by(total.desc(), UserPointsDaily.user_id)
+        .limit(limit)
+        .subquery()
+    )
+    rows = session.exec(
+        select(User.id, User.email, User.username, ranked.c.total)
+        .join(ranked, ranked.c.user_id == User.id)
+        .order_by(ranked.c.total.desc(), User.id)
+    ).all()
+    return [
+        UserPointsRead(user_id=uid, email=email, username=username, points=points, rank=rank)
+        for rank, (uid, email, username, points) in enumerate(rows, 1)
+    ]
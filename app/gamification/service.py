@@ -1,8 +1,29 @@
-from typing import List, Optional
+import datetime as dt
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import event
 from sqlmodel import Session, select, func
 
+from ..core.pagination import keyset_page, split_page
 from ..models.user import User
+from .leaderboard import load_board, maybe_schedule_reconcile, push_scores
+from .ledger import maybe_schedule_points_flush, schedule_points_flush
 from .models import PointTransaction, ActionType, UserPointsRead
+from .rollups import LeaderboardWindow, windowed_leaderboard
+
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+
+def request_award_key(action_type: ActionType, user_id: int,
+                      client_key: Optional[str]) -> Optional[str]:
+    """
+    Ledger key for an award earned by a request that carried an
+    Idempotency-Key header, or None without one. Scoped by action and user,
+    so a client only has to keep its own keys unique.
+    """
+    if not client_key:
+        return None
+    return f"{action_type.value}:{user_id}:{client_key}"
 
 
 class GamificationService:
@@ -16,78 +37,168 @@ class GamificationService:
         action_type: ActionType,
         description: str,
         related_entity_id: Optional[int] = None,
-        related_entity_type: Optional[str] = None
+        related_entity_type: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ) -> bool:
-        """Award points to a user and create a transaction record."""
-        try:
-            # Update user points
-            user = self.session.get(User, user_id)
-            if not user:
+        """
+        Record a points award in the ledger as part of the caller's transaction.
+
+        Nothing is committed here: the ledger row lands with whatever the
+        caller commits next (the post, comment or reaction that earned it),
+        and User.points is brought up to date by the batched aggregator
+        after that commit. An award whose `idempotency_key` was already
+        recorded is skipped. Returns whether a row was added.
+        """
+        if idempotency_key is not None:
+            seen = self.session.exec(
+                select(PointTransaction.id)
+                .where(PointTransaction.idempotency_key == idempotency_key)
+            ).first()
+            if seen is not None:
                 return False
-            
-            user.points += points
-            
-            # Create transaction record
-            transaction = PointTransaction(
-                user_id=user_id,
-                points=points,
-                action_type=action_type,
-                description=description,
-                related_entity_id=related_entity_id,
-                related_entity_type=related_entity_type
-            )
-            
-            self.session.add(transaction)
-            self.session.commit()
-            return True
-        except Exception:
-            self.session.rollback()
-            return False
+
+        self.session.add(PointTransaction(
+            user_id=user_id,
+            points=points,
+            action_type=action_type,
+            description=description,
+            related_entity_id=related_entity_id,
+            related_entity_type=related_entity_type,
+            idempotency_key=idempotency_key,
+        ))
+        # apply the points once the caller's commit makes them visible
+        if not event.contains(self.session, "after_commit", schedule_points_flush):
+            event.listen(self.session, "after_commit", schedule_points_flush)
+        return True
+
+    def find_award(self, idempotency_key: Optional[str]) -> Optional[PointTransaction]:
+        """The ledger row recorded under `idempotency_key`, if any."""
+        if idempotency_key is None:
+            return None
+        return self.session.exec(
+            select(PointTransaction).where(PointTransaction.idempotency_key == idempotency_key)
+        ).first()
 
     def get_user_points(self, user_id: int) -> Optional[int]:
-        """Get current points for a user."""
-        user = self.session.get(User, user_id)
-        return user.points if user else None
+        """Get current points for a user, including awards not yet applied."""
+        row = self.session.exec(
+            select(
+                User.points,
+                select(func.coalesce(func.sum(PointTransaction.points), 0))
+                .where(
+                    PointTransaction.user_id == User.id,
+                    PointTransaction.applied == False,  # noqa: E712
+                )
+                .scalar_subquery(),
+            ).where(User.id == user_id)
+        ).first()
+        return row[0] + row[1] if row else None
+
+    def _transactions_query(
+        self,
+        user_id: int,
+        action_type: Optional[ActionType] = None,
+        since: Optional[dt.datetime] = None,
+        until: Optional[dt.datetime] = None,
+    ):
+        stmt = select(PointTransaction).where(PointTransaction.user_id == user_id)
+        if action_type is not None:
+            stmt = stmt.where(PointTransaction.action_type == action_type)
+        if since is not None:
+            stmt = stmt.where(PointTransaction.created_at >= since)
+        if until is not None:
+            stmt = stmt.where(PointTransaction.created_at < until)
+        return stmt
 
     def get_user_transactions(
         self, 
         user_id: int, 
-        limit: int = 50
-    ) -> List[PointTransaction]:
-        """Get recent point transactions for a user."""
-        stmt = (
-            select(PointTransaction)
-            .where(PointTransaction.user_id == user_id)
-            .order_by(PointTransaction.created_at.desc())
-            .limit(limit)
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        action_type: Optional[ActionType] = None,
+        since: Optional[dt.datetime] = None,
+        until: Optional[dt.datetime] = None,
+    ) -> Tuple[List[PointTransaction], Optional[str]]:
+        """
+        One page of a user's point transactions, newest first, and the
+        cursor for the next page (None on the last one).
+        """
+        stmt = keyset_page(
+            self._transactions_query(user_id, action_type, since, until),
+            PointTransaction.created_at, PointTransaction.id, cursor, limit,
         )
-        return list(self.session.exec(stmt))
+        return split_page(self.session.exec(stmt).all(), limit)
 
-    def get_leaderboard(self, limit: int = 10) -> List[UserPointsRead]:
-        """Get top users by points (always fetch latest from DB)."""
-        stmt = (
-            select(
-                User.id,
-                User.email,
-                User.username,
-                User.points,
-                func.row_number().over(
-                    order_by=User.points.desc()
-                ).label("rank")
+    def iter_user_transactions(
+        self,
+        user_id: int,
+        action_type: Optional[ActionType] = None,
+        since: Optional[dt.datetime] = None,
+        until: Optional[dt.datetime] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[List[PointTransaction]]:
+        """A user's whole history, newest first, in keyset-paged batches."""
+        cursor = None
+        while True:
+            rows, cursor = self.get_user_transactions(
+                user_id, batch_size, cursor, action_type, since, until
             )
-            .order_by(User.points.desc())
-            .limit(limit)
-        )
-        results = self.session.exec(stmt)
+            if rows:
+                yield rows
+            if cursor is None:
+                return
+            self.session.expunge_all()  # keep memory flat on long histories
+
+    def get_leaderboard(
+        self, limit: int = 10, window: LeaderboardWindow = LeaderboardWindow.ALL
+    ) -> List[UserPointsRead]:
+        """
+        Get top users by points: all-time from the incrementally maintained
+        board, otherwise from the daily rollups for the window.
+        """
+        maybe_schedule_points_flush()
+        maybe_schedule_reconcile()
+        if window != LeaderboardWindow.ALL:
+            return windowed_leaderboard(self.session, window, limit)
+        return self._with_users(load_board(self.session).top(limit))
+
+    def get_user_rank(self, user_id: int) -> Optional[UserPointsRead]:
+        """A user's own leaderboard entry, or None for an unknown user."""
+        entries = self.get_leaderboard_around(user_id, radius=0)
+        return entries[0] if entries else None
+
+    def get_leaderboard_around(self, user_id: int, radius: int = 5) -> List[UserPointsRead]:
+        """The user's entry with up to `radius` neighbours on either side."""
+        maybe_schedule_points_flush()
+        maybe_schedule_reconcile()
+        board = load_board(self.session)
+        entries = board.around(user_id, radius)
+        if not entries:
+            # e.g. a user registered since the board was loaded
+            push_scores(self.session, [user_id])
+            entries = board.around(user_id, radius)
+        return self._with_users(entries)
+
+    def _with_users(self, entries) -> List[UserPointsRead]:
+        ids = [user_id for _, user_id, _ in entries]
+        if not ids:
+            return []
+        users = {
+            row.id: row
+            for row in self.session.exec(
+                select(User.id, User.email, User.username).where(User.id.in_(ids))
+            )
+        }
         return [
             UserPointsRead(
-                user_id=row[0],
-                email=row[1],
-                username=row[2],
-                points=row[3],
-                rank=row[4]
+                user_id=user_id,
+                email=users[user_id].email,
+                username=users[user_id].username,
+                points=points,
+                rank=rank,
             )
-            for row in results
+            for rank, user_id, points in entries
+            if user_id in users
         ]
 
     def remove_points(
@@ -97,7 +208,8 @@ class GamificationService:
         action_type: ActionType,
         description: str,
         related_entity_id: Optional[int] = None,
-        related_entity_type: Optional[str] = None
+        related_entity_type: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ) -> bool:
         """Remove points from a user (e.g., when a like is removed)."""
         return self.award_points(
@@ -106,5 +218,6 @@ class GamificationService:
             action_type, 
             description, 
             related_entity_id, 
-            related_entity_type
+            related_entity_type,
+            idempotency_key,
         ) 
\ No newline at end of file
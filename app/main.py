@@ -2,14 +2,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.router import api_router
 from app.db import init_db
-from fastapi.staticfiles import StaticFiles
+from app.api.files import BlobStaticFiles
+from app.core.pagination import NEXT_CURSOR_HEADER
 
 
 app = FastAPI(title="Edora API")
 
 app.mount(
     "/files",
-    StaticFiles(directory="uploads"),
+    BlobStaticFiles(directory="uploads"),
     name="files",
 )
 
@@ -24,6 +25,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],          # GET, POST, OPTIONS, etc.
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # let the browser read page cursors
 )
 
 app.include_router(api_router)
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Maintenance commands for the Edora backend.
+
+Usage:
+    python -m app.manage <command> [options]
+
+Run ``python -m app.manage --help`` for the list of commands.
+"""
+
+import argparse
+
+from sqlmodel import Session
+
+import app.models  # noqa: F401  – register every mapper before querying
+from app.db import engine
+from app.core.counters import recount_comments, recount_reactions
+from app.core.refresh_tokens import sweep_expired_refresh_tokens
+from app.core.search import rebuild_search_index
+from app.core.media_variants import backfill_variants
+from app.core.storage import dedupe_uploads
+from app.gamification.leaderboard import reconcile_points
+from app.gamification.ledger import apply_pending_points
+from app.gamification.rollups import rebuild_daily_rollups
+
+
+# ──────────────────────────────────── commands
+def cmd_recount_reactions(args: argparse.Namespace) -> None:
+    """Rebuild Post.like_count / dislike_count from PostReaction."""
+    with Session(engine) as session:
+        updated = recount_reactions(session, args.post_id or None)
+    print(f"Recounted reactions on {updated} post(s)")
+
+
+def cmd_recount_comments(args: argparse.Namespace) -> None:
+    """Rebuild Post.comment_count from Comment."""
+    with Session(engine) as session:
+        updated = recount_comments(session, args.post_id or None)
+    print(f"Recounted comments on {updated} post(s)")
+
+
+def cmd_rebuild_search_index(args: argparse.Namespace) -> None:
+    """Repopulate the post/channel full-text search index."""
+    rebuild_search_index(engine)
+    print("Search index rebuilt")
+
+
+def cmd_dedupe_uploads(args: argparse.Namespace) -> None:
+    """Move legacy per-upload folders into the deduplicated blob store."""
+    with Session(engine) as session:
+        moved, freed = dedupe_uploads(session)
+    print(f"Moved {moved} file(s) into the blob store, {freed} byte(s) freed")
+
+
+def cmd_generate_variants(args: argparse.Namespace) -> None:
+    """Create missing thumbnails/previews for stored images and PDFs."""
+    with Session(engine) as session:
+        created = backfill_variants(session)
+    print(f"Created {created} variant(s)")
+
+
+def cmd_apply_points(args: argparse.Namespace) -> None:
+    """Fold pending PointTransaction rows into User.points."""
+    applied = apply_pending_points()
+    print(f"Applied {applied} ledger row(s)")
+
+
+def cmd_reconcile_leaderboard(args: argparse.Namespace) -> None:
+    """Re-derive User.points from the ledger and rebuild the leaderboard."""
+    with Session(engine) as session:
+        fixed = reconcile_points(session)
+    print(f"Reconciled {fixed} user(s); leaderboard rebuilt")
+
+
+def cmd_rebuild_point_rollups(args: argparse.Namespace) -> None:
+    """Recompute the per-day points rollups from the ledger."""
+    with Session(engine) as session:
+        buckets = rebuild_daily_rollups(session)
+    print(f"Rebuilt {buckets} daily bucket(s)")
+
+
+def cmd_sweep_refresh_tokens(args: argparse.Namespace) -> None:
+    """Delete expired refresh-token rows in batches."""
+    deleted = sweep_expired_refresh_tokens(args.batch_size)
+    print(f"Deleted {deleted} expired refresh token(s)")
+
+
+# ──────────────────────────────────── entry point
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.manage", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    recount = commands.add_parser("recount-reactions", help=cmd_recount_reactions.__doc__)
+    recount.add_argument("--post-id", type=int, action="append",
+                         help="only repair this post (repeatable)")
+    recount.set_defaults(func=cmd_recount_reactions)
+
+    comments = commands.add_parser("recount-comments", help=cmd_recount_comments.__doc__)
+    comments.add_argument("--post-id", type=int, action="append",
+                          help="only repair this post (repeatable)")
+    comments.set_defaults(func=cmd_recount_comments)
+
+    reindex = commands.add_parser("rebuild-search-index", help=cmd_rebuild_search_index.__doc__)
+    reindex.set_defaults(func=cmd_rebuild_search_index)
+
+    dedupe = commands.add_parser("dedupe-uploads", help=cmd_dedupe_uploads.__doc__)
+    dedupe.set_defaults(func=cmd_dedupe_uploads)
+
+    variants = commands.add_parser("generate-variants", help=cmd_generate_variants.__doc__)
+    variants.set_defaults(func=cmd_generate_variants)
+
+    points = commands.add_parser("apply-points", help=cmd_apply_points.__doc__)
+    points.set_defaults(func=cmd_apply_points)
+
+    reconcile = commands.add_parser("reconcile-leaderboard", help=cmd_reconcile_leaderboard.__doc__)
+    reconcile.set_defaults(func=cmd_reconcile_leaderboard)
+
+    rollups = commands.add_parser("rebuild-point-rollups", help=cmd_rebuild_point_rollups.__doc__)
+    rollups.set_defaults(func=cmd_rebuild_point_rollups)
+
+    sweep = commands.add_parser("sweep-refresh-tokens", help=cmd_sweep_refresh_tokens.__doc__)
+    sweep.add_argument("--batch-size", type=int, default=1000,
+                       help="rows deleted per transaction (default 1000)")
+    sweep.set_defaults(func=cmd_sweep_refresh_tokens)
+
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,11 +9,11 @@ Order here:
   2. Channel   – needs User, and Post needs Channel
   3. Post      – needs Channel & User
   4. Tag / PostTag
-  5. MediaFile – needs Post
+  5. MediaFile – needs Post (MediaBlob is independent, MediaVariant needs MediaBlob)
   6. Comment   – needs Post & User
   7. PostReaction – needs Post & User
   8. SavedPost – needs Post & User
-  9. RefreshToken, AuditLog – independent
+  9. RefreshToken, AuditLog, ModerationScan – independent
   10. Gamification models – needs User
 """
 
@@ -23,13 +23,16 @@ from .post import Post                 # ← Post uses Channel & User
 from .tag import Tag
 from .post_tag import PostTag
 from .media_file import MediaFile
+from .media_blob import MediaBlob
+from .media_variant import MediaVariant
 from .comment import Comment
 from .post_reaction import PostReaction
 from .saved_post import SavedPost
 from .refresh_token import RefreshToken
 from .audit_log import AuditLog
 from .flagged_word import FlaggedWord
-from ..gamification.models import PointTransaction
+from .moderation_scan import ModerationScan
+from ..gamification.models import PointTransaction, UserPointsDaily
 
 __all__ = [
     "User",
@@ -38,11 +41,15 @@ __all__ = [
     "Tag",
     "PostTag",
     "MediaFile",
+    "MediaBlob",
+    "MediaVariant",
     "Comment",
     "PostReaction",
     "SavedPost",
     "RefreshToken",
     "AuditLog",
     "FlaggedWord",
+    "ModerationScan",
     "PointTransaction",
+    "UserPointsDaily",
 ]
@@ -1,8 +1,10 @@
-from sqlmodel import SQLModel, Table, Column, ForeignKey
+from sqlmodel import SQLModel, Table, Column, ForeignKey, Index
 
 channel_user_link = Table(
     "channel_user_link",
     SQLModel.metadata,
     Column("channel_id", ForeignKey("channel.id"), primary_key=True),
     Column("user_id", ForeignKey("user.id"), primary_key=True),
+    # the primary key leads with channel_id; this serves "channels of a user"
+    Index("ix_channel_user_link_user_id_channel_id", "user_id", "channel_id"),
 ) 
\ No newline at end of file
@@ -1,7 +1,7 @@
 import datetime as dt
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel import Field, Index, Relationship, SQLModel
 from .association_tables import channel_user_link
 
 if TYPE_CHECKING:
@@ -28,6 +28,11 @@ class ChannelRead(ChannelBase):
 
 
 class Channel(SQLModel, table=True):
+    # Channel listings page through (created_at, id) oldest-first
+    __table_args__ = (
+        Index("ix_channel_created_at_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True, max_length=120)
     bio: Optional[str] = None
@@ -1,7 +1,7 @@
 import datetime as dt
 from typing import Optional, TYPE_CHECKING
 
-from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel import Field, Index, Relationship, SQLModel
 
 if TYPE_CHECKING:
     from .user import User
@@ -13,6 +13,11 @@ class CommentBase(SQLModel):
 
 
 class Comment(CommentBase, table=True):
+    # Threads page through (created_at, id) oldest-first, per post
+    __table_args__ = (
+        Index("ix_comment_post_id_created_at_id", "post_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     content: str = Field(nullable=False, max_length=2000)
     
@@ -34,6 +39,10 @@ class Comment(CommentBase, table=True):
     post: "Post" = Relationship(back_populates="comments")
     author: "User" = Relationship(back_populates="comments")
 
+    # Moderation
+    flagged: bool = Field(default=False, nullable=False, sa_column_kwargs={"server_default": "0"})
+    flag_reason: Optional[str] = Field(default=None, max_length=256)
+
 
 class CommentCreate(CommentBase):
     post_id: int
@@ -0,0 +1,18 @@
+import datetime as dt
+
+from sqlmodel import Field, SQLModel
+
+
+class MediaBlob(SQLModel, table=True):
+    """
+    One stored copy of some uploaded bytes, keyed by their sha256.
+
+    Every MediaFile with the same content points at the same blob;
+    `ref_count` tracks how many do, and the bytes under
+    uploads/blobs/ are removed only when it drops to zero.
+    """
+
+    sha256: str = Field(primary_key=True, max_length=64)
+    size: int = Field(description="bytes")
+    ref_count: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow, nullable=False)
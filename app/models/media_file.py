@@ -5,12 +5,18 @@ from sqlmodel import Field, Relationship, SQLModel
 
 
 class MediaFile(SQLModel, table=True):
-    """Stores only metadata; the actual bytes live on disk under ./uploads/."""
+    """
+    Stores only metadata; the bytes live in the content-addressed blob
+    store under ./uploads/blobs/ (see app.core.storage), shared by every
+    file with the same sha256.
+    """
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    filename: str = Field(max_length=255, nullable=False)  # e.g. abc123.png
+    filename: str = Field(max_length=255, nullable=False)  # path under uploads/, e.g. blobs/ab/cd/abcd…
+    original_name: Optional[str] = Field(default=None, max_length=255)  # name the client uploaded
     mime_type: str = Field(max_length=100)
     size: int = Field(description="bytes")
+    sha256: Optional[str] = Field(default=None, max_length=64, index=True)  # hex digest, → MediaBlob
 
     # link to Post (nullable so you can attach later)
     post_id: Optional[int] = Field(default=None, foreign_key="post.id")
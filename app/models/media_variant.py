@@ -0,0 +1,38 @@
+import datetime as dt
+from typing import Optional
+
+from sqlalchemy import UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class MediaVariant(SQLModel, table=True):
+    """
+    A derived rendition of a stored blob: a resized image thumbnail or the
+    first page of a PDF rendered as an image.
+
+    Variants are keyed by the source blob's sha256, so every MediaFile
+    sharing those bytes shares its variants too. They are produced in the
+    background by app.core.media_variants.
+    """
+
+    __table_args__ = (
+        UniqueConstraint("sha256", "kind", "width", name="uq_mediavariant_sha256_kind_width"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    sha256: str = Field(foreign_key="mediablob.sha256", max_length=64, index=True)
+    kind: str = Field(max_length=16)  # "thumbnail" or "preview"
+    width: int
+    height: int
+    mime_type: str = Field(max_length=100)
+    filename: str = Field(max_length=255)  # path under uploads/, e.g. variants/ab/cd/abcd…/thumbnail-320.jpg
+    size: int = Field(description="bytes")
+    created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow, nullable=False)
+
+
+class MediaVariantRead(SQLModel):
+    kind: str
+    width: int
+    height: int
+    mime_type: str
+    url: str
@@ -0,0 +1,37 @@
+import datetime as dt
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class ModerationScan(SQLModel, table=True):
+    """
+    Progress of a background re-moderation pass over posts and comments.
+
+    The scan walks each table in id order and records the last id it
+    finished after every batch, so a failed or interrupted scan can be
+    resumed where it stopped.
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # "pending", "running", "done", "failed"
+    status: str = Field(default="pending", max_length=16, nullable=False)
+    reason: Optional[str] = Field(default=None, max_length=255)
+
+    last_post_id: int = Field(default=0, nullable=False)
+    last_comment_id: int = Field(default=0, nullable=False)
+    posts_total: int = Field(default=0, nullable=False)
+    comments_total: int = Field(default=0, nullable=False)
+    posts_scanned: int = Field(default=0, nullable=False)
+    comments_scanned: int = Field(default=0, nullable=False)
+    posts_flagged: int = Field(default=0, nullable=False)
+    comments_flagged: int = Field(default=0, nullable=False)
+    error: Optional[str] = Field(default=None, max_length=1000)
+
+    created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow, nullable=False)
+    updated_at: dt.datetime = Field(
+        default_factory=dt.datetime.utcnow,
+        sa_column_kwargs={"onupdate": dt.datetime.utcnow},
+        nullable=False,
+    )
+    finished_at: Optional[dt.datetime] = None
@@ -1,7 +1,7 @@
 import datetime as dt
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel import Field, Index, Relationship, SQLModel
 
 if TYPE_CHECKING:
     from .user import User
@@ -12,6 +12,7 @@ if TYPE_CHECKING:
     from .tag import Tag
     from .saved_post import SavedPost
 
+from .media_variant import MediaVariantRead
 from .post_tag import PostTag
 
 
@@ -21,6 +22,13 @@ class PostBase(SQLModel):
 
 
 class Post(PostBase, table=True):
+    # Keyset pagination walks (created_at, id) newest-first, per channel
+    # and globally, so both orders are backed by an index.
+    __table_args__ = (
+        Index("ix_post_channel_id_created_at_id", "channel_id", "created_at", "id"),
+        Index("ix_post_created_at_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Foreign keys
@@ -64,6 +72,13 @@ class Post(PostBase, table=True):
     flagged: bool = Field(default=False, nullable=False)
     flag_reason: Optional[str] = Field(default=None, max_length=256)
 
+    # Denormalized reaction and comment counters, kept in step with
+    # PostReaction / Comment by app.core.counters (run
+    # `python -m app.manage recount-reactions` / `recount-comments` to repair)
+    like_count: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    dislike_count: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    comment_count: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+
 
 class PostCreate(PostBase):
     channel_id: int
@@ -72,8 +87,10 @@ class PostCreate(PostBase):
 class MediaFileRead(SQLModel):
     id: int
     filename: str
+    original_name: Optional[str] = None
     mime_type: str
     size: int
+    variants: List[MediaVariantRead] = []  # thumbnails / previews, filled in once generated
 
     class Config:
         from_attributes = True
@@ -88,6 +105,7 @@ class PostRead(PostBase):
     files: List[MediaFileRead] = []
     like_count: int = 0
     dislike_count: int = 0
+    comment_count: int = 0
     is_saved: bool = False
 
     class Config:
@@ -103,6 +121,7 @@ class PostWithAuthor(PostBase):
     files: List[MediaFileRead] = []
     like_count: int = 0
     dislike_count: int = 0
+    comment_count: int = 0
     is_saved: bool = False
     author_email: str
     author_username: Optional[str] = None
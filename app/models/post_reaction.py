@@ -2,7 +2,7 @@ import datetime as dt
 from typing import Optional, TYPE_CHECKING
 from enum import Enum
 
-from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel import Field, Index, Relationship, SQLModel
 
 if TYPE_CHECKING:
     from .user import User
@@ -19,6 +19,10 @@ class PostReactionBase(SQLModel):
 
 
 class PostReaction(PostReactionBase, table=True):
+    __table_args__ = (
+        Index("ix_postreaction_post_id_reaction_type", "post_id", "reaction_type"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     reaction_type: ReactionType = Field(nullable=False)
     
@@ -1,11 +1,26 @@
 import datetime as dt
 from typing import Optional
 
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, Index, SQLModel
 
 
 class RefreshToken(SQLModel, table=True):
+    """
+    Server-side record of an issued refresh token.
+
+    The JWT carries a random `jti`; only its sha256 is stored, in
+    `token_hash`, so the table alone cannot be used to mint sessions.
+    A token is revoked when it is rotated and `replaced_by` points at its
+    successor.
+    """
+
+    __table_args__ = (
+        Index("ix_refreshtoken_user_id_revoked_expires_at", "user_id", "revoked", "expires_at"),
+    )
+
     id: Optional[str] = Field(default=None, primary_key=True, max_length=36)
     user_id: int = Field(foreign_key="user.id", index=True)
-    expires_at: dt.datetime = Field(nullable=False)
+    token_hash: Optional[str] = Field(default=None, max_length=64, unique=True, index=True)
+    expires_at: dt.datetime = Field(nullable=False, index=True)  # the sweeper's scan
     revoked: bool = Field(default=False, nullable=False)
+    replaced_by: Optional[str] = Field(default=None, max_length=36)
@@ -25,7 +25,7 @@ class UserBase(SQLModel):
 class User(UserBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     hashed_password: str = Field(nullable=False, max_length=1024)
-    points: int = Field(default=0, nullable=False)  # Gamification points
+    points: int = Field(default=0, nullable=False, index=True)  # Gamification points
 
     created_at: dt.datetime = Field(
         default_factory=dt.datetime.utcnow, nullable=False
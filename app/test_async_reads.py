@@ -0,0 +1,52 @@
+"""
+Tests for the read endpoints served from the async session.
+"""
+
+import inspect
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.main import app
+from app.models import Comment, Post, SavedPost
+from app.api import channels, comments, posts, reactions
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def seeded(db_engine, make_user, make_channel):
+    user = make_user()
+    channel_id, (post_id,) = make_channel(user, n_posts=1)
+    with Session(db_engine) as session:
+        post = session.get(Post, post_id)
+        post.like_count = 2
+        session.add(post)
+        session.add(Comment(content="first", post_id=post_id, author_id=user.id))
+        session.add(SavedPost(user_id=user.id, post_id=post_id))
+        session.commit()
+    return user.id, channel_id, post_id
+
+
+def test_hot_reads_are_coroutines():
+    for route in (posts.list_posts, channels.list_channel_posts,
+                  comments.list_post_comments, reactions.get_reaction_counts,
+                  reactions.get_user_reaction):
+        assert inspect.iscoroutinefunction(route)
+
+
+def test_async_reads_match_the_data(seeded, auth_headers):
+    user_id, channel_id, post_id = seeded
+    headers = auth_headers(user_id)
+
+    page = client.get(f"/channels/{channel_id}/posts", headers=headers).json()
+    assert [(p["id"], p["is_saved"], p["like_count"]) for p in page] == [(post_id, True, 2)]
+
+    listed = client.get(f"/comments/post/{post_id}", headers=headers).json()
+    assert [c["content"] for c in listed] == ["first"]
+
+    counts = client.get(f"/reactions/post/{post_id}/counts").json()
+    assert counts == {"like_count": 2, "dislike_count": 0}
+    assert client.get(f"/reactions/post/{post_id}/user", headers=headers).json() is None
+    assert client.get("/comments/post/999999", headers=headers).status_code == 404
@@ -0,0 +1,116 @@
+"""
+Tests for the auth dependencies and endpoints.
+"""
+
+import datetime as dt
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.main import app
+from app.models import RefreshToken, User
+from app.core import security
+from app.core.refresh_tokens import sweep_expired_refresh_tokens
+
+client = TestClient(app)
+
+
+def test_current_user_is_served_from_cache(make_user, auth_headers, capture_statements):
+    user = make_user()
+    for expected in (1, 0):
+        with capture_statements() as statements:
+            client.get("/auth/me", headers=auth_headers(user))
+        assert len([s for s in statements if "FROM user" in s]) == expected
+
+
+def test_username_change_is_visible_immediately(make_user, auth_headers):
+    user = make_user()
+    client.get("/auth/me", headers=auth_headers(user))  # warm the cache
+    name = f"u{uuid4().hex[:8]}"
+    response = client.put("/auth/username", json={"username": name}, headers=auth_headers(user))
+    assert response.status_code == 200
+    assert client.get("/auth/me", headers=auth_headers(user)).json()["username"] == name
+
+
+def test_deactivated_user_is_rejected_despite_cache(db_engine, make_user, auth_headers):
+    user = make_user()
+    assert client.get("/auth/me", headers=auth_headers(user)).status_code == 200
+    with Session(db_engine) as session:
+        row = session.get(User, user.id)
+        row.is_active = False
+        session.add(row)
+        session.commit()
+    assert client.get("/auth/me", headers=auth_headers(user)).status_code == 401
+
+
+def _register(email: str, password: str):
+    return client.post("/auth/register", json={"email": email, "password": password})
+
+
+def _login(email: str, password: str):
+    return client.post("/auth/login", data={"username": email, "password": password})
+
+
+def test_register_and_login_rehash_when_cost_changes(db_engine, monkeypatch):
+    monkeypatch.setattr(security, "BCRYPT_ROUNDS", 4)
+    email = f"{uuid4().hex}@example.com"
+    user_id = _register(email, "pw-123").json()["id"]
+    assert _login(email, "wrong").status_code == 400
+    assert _login(email, "pw-123").status_code == 200
+    with Session(db_engine) as session:
+        assert session.get(User, user_id).hashed_password.startswith("$2b$04$")
+
+    monkeypatch.setattr(security, "BCRYPT_ROUNDS", 5)
+    assert _login(email, "pw-123").status_code == 200
+    with Session(db_engine) as session:
+        hashed = session.get(User, user_id).hashed_password
+    assert hashed.startswith("$2b$05$")
+    assert security.verify_password("pw-123", hashed)
+
+
+def test_login_is_refused_when_password_pool_is_saturated(monkeypatch):
+    monkeypatch.setattr(security, "BCRYPT_ROUNDS", 4)
+    email = f"{uuid4().hex}@example.com"
+    _register(email, "pw-123")
+    # no room for even one more hash
+    monkeypatch.setattr(security, "PASSWORD_MAX_QUEUED", -security.PASSWORD_WORKERS)
+    response = _login(email, "pw-123")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+
+def _refresh(token: str):
+    return client.post("/auth/refresh", json={"refresh_token": token})
+
+
+def test_refresh_tokens_rotate_and_reuse_revokes_the_family(monkeypatch):
+    monkeypatch.setattr(security, "BCRYPT_ROUNDS", 4)
+    email = f"{uuid4().hex}@example.com"
+    _register(email, "pw-123")
+    first = _login(email, "pw-123").json()["refresh_token"]
+
+    rotated = _refresh(first)
+    assert rotated.status_code == 200
+    second = rotated.json()["refresh_token"]
+    assert second != first and rotated.json()["access_token"]
+
+    # a spent token is refused, and presenting it again revokes its successor
+    assert _refresh(first).status_code == 401
+    assert _refresh(second).status_code == 401
+
+
+def test_sweeper_deletes_only_expired_tokens(db_engine, make_user):
+    user = make_user()
+    now = dt.datetime.utcnow()
+    with Session(db_engine) as session:
+        for days in (-3, -2, -1, 1):
+            session.add(RefreshToken(id=str(uuid4()), user_id=user.id,
+                                     expires_at=now + dt.timedelta(days=days)))
+        session.commit()
+
+    # other tests' expired tokens may be swept too; only this user's rows are known
+    assert sweep_expired_refresh_tokens(batch_size=2) >= 3
+    with Session(db_engine) as session:
+        remaining = session.exec(select(RefreshToken).where(RefreshToken.user_id == user.id)).all()
+    assert [t.expires_at > now for t in remaining] == [True]
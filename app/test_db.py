@@ -0,0 +1,42 @@
+"""
+Tests for the engine factories and the SQLite tuning they apply.
+"""
+
+import asyncio
+
+from sqlalchemy import text
+
+from app.db import SQLITE_BUSY_TIMEOUT_MS, build_async_engine, build_engine
+
+_PRAGMAS = ("journal_mode", "synchronous", "busy_timeout")
+
+
+def _expected():
+    # synchronous=NORMAL reads back as 1
+    return {"journal_mode": "wal", "synchronous": 1, "busy_timeout": SQLITE_BUSY_TIMEOUT_MS}
+
+
+def test_sqlite_connections_are_tuned_on_connect(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    try:
+        assert engine.echo is False
+        with engine.connect() as conn:
+            pragmas = {name: conn.execute(text(f"PRAGMA {name}")).scalar() for name in _PRAGMAS}
+    finally:
+        engine.dispose()
+    assert pragmas == _expected()
+
+
+def test_async_sqlite_connections_get_the_same_tuning(tmp_path):
+    engine = build_async_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+
+    async def read_pragmas():
+        try:
+            async with engine.connect() as conn:
+                return {name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                        for name in _PRAGMAS}
+        finally:
+            await engine.dispose()
+
+    assert engine.echo is False
+    assert asyncio.run(read_pragmas()) == _expected()
@@ -0,0 +1,72 @@
+"""
+Tests for the merged home feed across joined channels.
+"""
+
+import datetime as dt
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, insert
+
+from app.main import app
+from app.api import feed as feed_api
+from app.models import Post
+from app.models.association_tables import channel_user_link
+from app.core import response_cache
+from app.core.pagination import NEXT_CURSOR_HEADER
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def feed_reader(db_engine, make_user, make_channel, auth_headers):
+    """A reader in three channels, posts interleaved in time, and one channel not joined."""
+    reader = make_user()
+    channels = [make_channel(reader)[0] for _ in range(4)]
+    with Session(db_engine) as session:
+        base = dt.datetime(2024, 3, 1)
+        posts = []
+        for i in range(12):
+            post = Post(title=f"p{i}", content="c", channel_id=channels[i % 4],
+                        author_id=reader.id,
+                        # pairs share a timestamp to exercise the id tiebreak
+                        created_at=base + dt.timedelta(minutes=i // 2))
+            session.add(post)
+            posts.append(post)
+        for channel_id in channels[:3]:
+            session.exec(insert(channel_user_link).values(channel_id=channel_id, user_id=reader.id))
+        session.commit()
+        expected = [p.id for p in sorted(posts, key=lambda p: (p.created_at, p.id), reverse=True)
+                    if p.channel_id != channels[3]]
+    return auth_headers(reader), expected
+
+
+def test_feed_merges_joined_channels_newest_first_across_pages(feed_reader):
+    headers, expected = feed_reader
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/feed", params=params, headers=headers)
+        assert response.status_code == 200
+        seen.extend(post["id"] for post in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    assert seen == expected
+
+
+def test_feed_requires_a_user():
+    assert client.get("/feed").status_code == 401
+
+
+def test_heavy_users_feed_is_cached_until_saved_flags_change(feed_reader, monkeypatch):
+    monkeypatch.setattr(response_cache, "_backend", response_cache.InProcessCache())
+    monkeypatch.setattr(feed_api, "FEED_CACHE_MIN_CHANNELS", 3)
+    headers, expected = feed_reader
+    assert client.get("/feed", headers=headers).headers["x-cache"] == "MISS"
+    assert client.get("/feed", headers=headers).headers["x-cache"] == "HIT"
+
+    client.post("/saved-posts/", json={"post_id": expected[0]}, headers=headers)
+    fresh = client.get("/feed", headers=headers)
+    assert fresh.headers["x-cache"] == "MISS"
+    assert fresh.json()[0]["is_saved"] is True
@@ -0,0 +1,144 @@
+"""
+Tests for the skip-list leaderboard, windowed leaderboards and their endpoints.
+"""
+
+import datetime as dt
+import random
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.main import app
+from app.models import User
+from app.core.jobs import wait_for_local_jobs
+from app.gamification import leaderboard
+from app.gamification.leaderboard import RankedSet, load_board, reconcile_points
+from app.gamification.ledger import apply_pending_batch
+from app.gamification.models import ActionType, PointTransaction, UserPointsDaily
+from app.gamification.rollups import rebuild_daily_rollups
+
+client = TestClient(app)
+
+
+def test_ranked_set_matches_a_sorted_list():
+    rng = random.Random(7)
+    ranked, expected = RankedSet(), {}
+    for _ in range(2000):
+        member = rng.randint(1, 200)
+        if rng.random() < 0.2:
+            ranked.discard(member)
+            expected.pop(member, None)
+        else:
+            expected[member] = rng.randint(-50, 500)
+            ranked.set(member, expected[member])
+
+    order = sorted(expected.items(), key=lambda kv: (-kv[1], kv[0]))
+    assert ranked.range(1, len(order)) == [
+        (rank, member, points) for rank, (member, points) in enumerate(order, 1)
+    ]
+    for rank, (member, _) in enumerate(order, 1):
+        assert ranked.rank(member) == rank
+    assert ranked.range(10, 3) == ranked.range(1, 12)[9:]
+
+
+@pytest.fixture
+def users_with_points(db_engine, make_user):
+    def make(*points) -> list:
+        users = [make_user() for _ in points]
+        with Session(db_engine) as session:
+            load_board(session)  # make sure the board exists before the update
+            session.add_all([
+                PointTransaction(user_id=user.id, points=p, action_type=ActionType.POST_UPLOAD,
+                                 description="seed")
+                for user, p in zip(users, points)
+            ])
+            session.commit()
+            while apply_pending_batch(session):
+                pass
+        return [user.id for user in users]
+    return make
+
+
+def test_leaderboard_is_updated_incrementally(users_with_points, auth_headers):
+    # other tests' users share the board; nothing else the suite awards falls
+    # between these, so they hold consecutive ranks wherever they start
+    first, second, third = users_with_points(30_000, 20_000, 10_000)
+
+    mine = [client.get("/api/gamification/my-rank", headers=auth_headers(user_id)).json()
+            for user_id in (first, second, third)]
+    top = mine[0]["rank"]
+    assert [(e["user_id"], e["rank"], e["points"]) for e in mine] == [
+        (first, top, 30_000), (second, top + 1, 20_000), (third, top + 2, 10_000)
+    ]
+
+    board = client.get("/api/gamification/leaderboard", params={"limit": top + 2}).json()
+    assert [e["user_id"] for e in board[top - 1:]] == [first, second, third]
+    around = client.get("/api/gamification/leaderboard/around-me",
+                        params={"radius": 1}, headers=auth_headers(second)).json()
+    assert [e["user_id"] for e in around] == [first, second, third]
+
+
+def test_reconcile_repairs_drifted_points(db_engine, users_with_points):
+    [user_id] = users_with_points(7)
+    with Session(db_engine) as session:
+        user = session.get(User, user_id)
+        user.points = 999
+        session.add(user)
+        session.commit()
+
+        assert reconcile_points(session) >= 1
+        session.refresh(user)
+        assert user.points == 7
+        assert load_board(session).around(user_id, 0)[0][2] == 7
+
+
+def test_leaderboard_reads_schedule_a_reconcile_when_due(db_engine, users_with_points,
+                                                         monkeypatch):
+    [user_id] = users_with_points(7)
+    with Session(db_engine) as session:
+        user = session.get(User, user_id)
+        user.points = 999
+        session.add(user)
+        session.commit()
+
+    monkeypatch.setattr(leaderboard, "_last_reconcile",
+                        time.monotonic() - leaderboard.LEADERBOARD_RECONCILE_S - 1)
+    client.get("/api/gamification/leaderboard")
+    wait_for_local_jobs()
+    with Session(db_engine) as session:
+        assert session.get(User, user_id).points == 7
+
+
+def test_windowed_leaderboard_reads_daily_rollups(db_engine, make_user):
+    now = dt.datetime.utcnow()
+    recent, old = make_user(), make_user()
+    with Session(db_engine) as session:
+        session.add_all([
+            # two awards on the same day share a bucket
+            PointTransaction(user_id=recent.id, points=40_000, created_at=now,
+                             action_type=ActionType.POST_UPLOAD, description="today"),
+            PointTransaction(user_id=recent.id, points=1, created_at=now,
+                             action_type=ActionType.LIKE_RECEIVED, description="today"),
+            PointTransaction(user_id=old.id, points=50_000, created_at=now - dt.timedelta(days=10),
+                             action_type=ActionType.POST_UPLOAD, description="last month"),
+        ])
+        session.commit()
+        while apply_pending_batch(session):
+            pass
+        recent_id, old_id = recent.id, old.id
+        assert session.get(UserPointsDaily, (recent_id, now.date())).points == 40_001
+
+    def window(name):
+        # other tests award points too; keep only this test's users
+        board = client.get("/api/gamification/leaderboard",
+                           params={"window": name, "limit": 100}).json()
+        return [(e["user_id"], e["points"]) for e in board if e["user_id"] in (recent_id, old_id)]
+
+    assert window("week") == [(recent_id, 40_001)]
+    assert window("month") == [(old_id, 50_000), (recent_id, 40_001)]
+
+    with Session(db_engine) as session:
+        rebuild_daily_rollups(session)
+        assert session.get(UserPointsDaily, (recent_id, now.date())).points == 40_001
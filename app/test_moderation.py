@@ -0,0 +1,49 @@
+"""
+Tests for the flagged-word matcher.
+"""
+
+import random
+import re
+
+from app.core.moderation import FlaggedWordMatcher, flag_reason_for
+
+
+def test_reports_every_match_in_order_of_appearance():
+    matcher = FlaggedWordMatcher(["spam", "scam", "free money"])
+    text = "Free money! Not a scam, definitely not SPAM."
+    assert matcher.find_all(text) == ["free money", "scam", "spam"]
+
+
+def test_respects_word_boundaries():
+    matcher = FlaggedWordMatcher(["ass", "he"])
+    assert matcher.find_all("a class about the harassment") == []
+    assert matcher.find_all("what an ass.") == ["ass"]
+    assert matcher.find_all("he said") == ["he"]
+
+
+def test_overlapping_words_are_all_found():
+    matcher = FlaggedWordMatcher(["she", "he", "hers", "his"])
+    assert matcher.find_all("hers his she he") == ["hers", "his", "she", "he"]
+
+
+def test_empty_list_matches_nothing():
+    matcher = FlaggedWordMatcher([])
+    assert not matcher
+    assert matcher.find_all("anything at all") == []
+
+
+def test_agrees_with_naive_regex_scan():
+    rng = random.Random(1234)
+    alphabet = "ab "
+    words = sorted({"".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(12)})
+    matcher = FlaggedWordMatcher(words)
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        expected = {w for w in words if re.search(rf"(?<!\w){re.escape(w)}(?!\w)", text)}
+        assert set(matcher.find_all(text)) == expected
+
+
+def test_flag_reason_fits_the_column():
+    reason = flag_reason_for([f"word{i}" for i in range(100)])
+    assert len(reason) <= 256
+    assert flag_reason_for([]) is None
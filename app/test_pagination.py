@@ -0,0 +1,101 @@
+"""
+Tests for keyset (cursor) pagination on post listings.
+"""
+
+import datetime as dt
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, insert
+
+from app.main import app
+from app.models import Post
+from app.models.association_tables import channel_user_link
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+client = TestClient(app)
+
+
+def test_cursor_round_trip():
+    created_at = dt.datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_invalid_cursor_is_rejected():
+    response = client.get("/posts/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_channel_posts_pages_cover_every_post_once(make_channel):
+    # pairs of posts share a created_at to exercise the id tiebreak
+    channel_id, _ = make_channel(n_posts=7, created_at=dt.datetime(2024, 1, 1))
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(f"/channels/{channel_id}/posts", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 3
+        seen.extend(post["id"] for post in page)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+
+
+def test_page_size_is_capped():
+    response = client.get("/posts/", params={"limit": 10_000})
+    assert response.status_code == 422
+
+
+def test_channel_listing_has_membership_and_counts_in_one_query(db_engine, make_channel, make_user,
+                                                                auth_headers, capture_statements):
+    channel_id, _ = make_channel(n_posts=3)
+    viewer = make_user()
+    with Session(db_engine) as session:
+        session.exec(insert(channel_user_link).values(channel_id=channel_id, user_id=viewer.id))
+        session.commit()
+    headers = auth_headers(viewer)
+
+    with capture_statements() as statements:
+        response = client.get("/channels/", params={"joined": True}, headers=headers)
+
+    assert response.status_code == 200
+    assert [ch["id"] for ch in response.json()] == [channel_id]
+    channel = response.json()[0]
+    assert channel["joined"] is True
+    assert (channel["member_count"], channel["post_count"]) == (1, 3)
+    # membership, member and post counts all come from the listing statement
+    assert len([s for s in statements if "channel" in s.lower()]) == 1
+
+
+def test_comment_thread_pages_oldest_first_and_counter_tracks_changes(db_engine, make_user,
+                                                                      make_channel, auth_headers):
+    author = make_user()
+    channel_id, (post_id,) = make_channel(author, n_posts=1)
+    headers = auth_headers(author)
+    with Session(db_engine) as session:
+        updated_at = session.get(Post, post_id).updated_at
+    created = [client.post("/comments/", json={"post_id": post_id, "content": f"c{i}"},
+                           headers=headers).json()["id"] for i in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/comments/post/{post_id}", params=params, headers=headers)
+        assert response.status_code == 200
+        seen.extend(c["id"] for c in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    assert seen == created
+
+    client.delete(f"/comments/{created[0]}", headers=headers)
+    page = client.get(f"/channels/{channel_id}/posts").json()
+    assert page[0]["comment_count"] == 4
+    # counting comments is not an edit of the post
+    with Session(db_engine) as session:
+        assert session.get(Post, post_id).updated_at == updated_at
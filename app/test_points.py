@@ -0,0 +1,170 @@
+"""
+Tests for the points ledger, its batched aggregator and the history endpoints.
+"""
+
+import csv
+import datetime as dt
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.main import app
+from app.models import User
+from app.core.jobs import wait_for_local_jobs
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.gamification.ledger import apply_pending_batch
+from app.gamification.models import ActionType, PointTransaction
+from app.gamification.service import GamificationService
+
+client = TestClient(app)
+
+
+def test_awards_are_committed_with_the_action_and_applied_later(db_engine, make_user, make_channel,
+                                                                auth_headers):
+    author, fan = make_user(), make_user()
+    channel_id, _ = make_channel(author)
+
+    post = client.post("/posts/", json={"title": "t", "content": "c", "channel_id": channel_id},
+                       headers=auth_headers(author)).json()
+    client.post("/comments/", json={"post_id": post["id"], "content": "nice"},
+                headers=auth_headers(author))
+    client.post("/reactions/", json={"post_id": post["id"], "reaction_type": "like"},
+                headers=auth_headers(fan))
+    wait_for_local_jobs()
+
+    with Session(db_engine) as session:
+        assert session.get(User, author.id).points == 10 + 5 + 1
+        rows = session.exec(
+            select(PointTransaction).where(PointTransaction.user_id == author.id)
+        ).all()
+        assert len(rows) == 3 and all(row.applied for row in rows)
+    points = client.get("/api/gamification/my-points", headers=auth_headers(author)).json()
+    assert points == {"points": 16}
+
+
+def test_idempotency_key_records_an_award_once(db_engine, make_user):
+    user = make_user()
+    with Session(db_engine) as session:
+        service = GamificationService(session)
+        for _ in range(2):
+            service.award_points(user.id, 10, ActionType.POST_UPLOAD, "retry",
+                                 idempotency_key=f"test:{user.id}")
+            session.commit()
+        wait_for_local_jobs()
+        assert GamificationService(session).get_user_points(user.id) == 10
+
+
+def test_retried_requests_with_an_idempotency_key_create_and_award_once(db_engine, make_user,
+                                                                       make_channel, auth_headers):
+    author = make_user()
+    channel_id, _ = make_channel(author)
+    retried = {**auth_headers(author), "Idempotency-Key": "attempt-1"}
+    body = {"title": "t", "content": "c", "channel_id": channel_id}
+    first, retry = (client.post("/posts/", json=body, headers=retried).json() for _ in range(2))
+    assert retry["id"] == first["id"]
+    comment = {"post_id": first["id"], "content": "nice"}
+    # keys are scoped by action, so the same key can name a different request
+    first_comment, retry_comment = (client.post("/comments/", json=comment, headers=retried).json()
+                                    for _ in range(2))
+    assert retry_comment["id"] == first_comment["id"]
+    # without a key, every request is a new one
+    assert client.post("/posts/", json=body, headers=auth_headers(author)).json()["id"] != first["id"]
+    wait_for_local_jobs()
+
+    with Session(db_engine) as session:
+        assert session.get(User, author.id).points == 10 + 5 + 10
+
+
+def test_awards_after_a_flush_queue_another_flush(db_engine, make_user):
+    user = make_user()
+    with Session(db_engine) as session:
+        service = GamificationService(session)
+        for points in (3, 4):
+            service.award_points(user.id, points, ActionType.COMMENT, "comment")
+            session.commit()
+            wait_for_local_jobs()
+            session.expire_all()
+        assert session.get(User, user.id).points == 7
+
+
+def test_pending_points_count_and_batch_into_one_update_per_user(db_engine, make_user):
+    user = make_user()
+    wait_for_local_jobs()  # let any flush queued by an earlier test finish
+    with Session(db_engine) as session:
+        # written directly, so nothing schedules the aggregator
+        session.add_all([
+            PointTransaction(user_id=user.id, points=1, action_type=ActionType.LIKE_RECEIVED,
+                             description="like")
+            for _ in range(5)
+        ])
+        session.commit()
+        assert session.get(User, user.id).points == 0
+        assert GamificationService(session).get_user_points(user.id) == 5
+
+        while apply_pending_batch(session):
+            pass
+        session.expire_all()
+        assert session.get(User, user.id).points == 5
+        assert GamificationService(session).get_user_points(user.id) == 5
+
+
+@pytest.fixture
+def user_with_history(db_engine, make_user):
+    def make(n: int) -> User:
+        user = make_user()
+        base = dt.datetime(2024, 3, 1)
+        with Session(db_engine) as session:
+            session.add_all([
+                PointTransaction(
+                    user_id=user.id, points=1 if i % 2 else 5,
+                    action_type=ActionType.LIKE_RECEIVED if i % 2 else ActionType.COMMENT,
+                    description=f"event {i}",
+                    # pairs share a timestamp to exercise the id tiebreak
+                    created_at=base + dt.timedelta(hours=i // 2),
+                )
+                for i in range(n)
+            ])
+            session.commit()
+        return user
+    return make
+
+
+def test_transaction_history_pages_and_filters(user_with_history, auth_headers):
+    user = user_with_history(9)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/gamification/my-transactions", params=params,
+                              headers=auth_headers(user))
+        seen.extend(tx["id"] for tx in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 9
+
+    comments = client.get(
+        "/api/gamification/my-transactions",
+        params={"action_type": "comment", "since": "2024-03-01T01:00:00",
+                "until": "2024-03-01T04:00:00"},
+        headers=auth_headers(user),
+    ).json()
+    # comments are the even events, at hours 0..4; hours 1..3 fall in range
+    assert [tx["description"] for tx in comments] == ["event 6", "event 4", "event 2"]
+
+
+def test_transaction_history_exports_stream_every_row(user_with_history, auth_headers):
+    user = user_with_history(5)
+    csv_export = client.get("/api/gamification/my-transactions/export",
+                            params={"format": "csv"}, headers=auth_headers(user))
+    assert csv_export.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(csv_export.text)))
+    assert [row["description"] for row in rows] == [f"event {i}" for i in (4, 3, 2, 1, 0)]
+
+    ndjson = client.get("/api/gamification/my-transactions/export",
+                        params={"format": "ndjson", "action_type": "comment"},
+                        headers=auth_headers(user))
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [tx["points"] for tx in lines] == [5, 5, 5]
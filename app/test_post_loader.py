@@ -0,0 +1,104 @@
+"""
+Tests for the batched post loader used by every post listing.
+"""
+
+import pytest
+from sqlmodel import Session, select
+
+from app.models import MediaFile, Post, PostReaction, SavedPost
+from app.models.post_reaction import ReactionType
+from app.core.counters import apply_reaction_change, recount_reactions
+from app.core.post_loader import build_posts_with_author, select_posts_with_author
+
+
+@pytest.fixture
+def seed_posts_with_files(db_engine, make_user, make_channel):
+    def seed(n_posts: int):
+        user = make_user()
+        channel_id, post_ids = make_channel(user, n_posts=n_posts)
+        with Session(db_engine) as session:
+            session.add_all([
+                MediaFile(filename=f"{i}/{j}.pdf", mime_type="application/pdf", size=1,
+                          post_id=post_id)
+                for i, post_id in enumerate(post_ids) for j in range(2)
+            ])
+            session.commit()
+        return user.id, channel_id
+    return seed
+
+
+def _channel_rows(session: Session, channel_id: int):
+    return session.exec(
+        select_posts_with_author()
+        .where(Post.channel_id == channel_id)
+        .order_by(Post.id)
+    ).all()
+
+
+def test_page_extras_load_in_constant_queries(db_engine, seed_posts_with_files, capture_statements):
+    user_id, channel_id = seed_posts_with_files(5)
+    with Session(db_engine) as session:
+        rows = _channel_rows(session, channel_id)
+        with capture_statements() as statements:
+            posts = build_posts_with_author(session, rows, user_id)
+
+    # files and saved flags: one query each, for any page size
+    assert len(statements) == 2
+    assert len(posts) == 5
+    assert all(len(post.files) == 2 for post in posts)
+
+
+def test_counts_and_saved_flags_are_filled_in(db_engine, seed_posts_with_files, make_user):
+    user_id, channel_id = seed_posts_with_files(2)
+    voters = [make_user() for _ in range(3)]
+    with Session(db_engine) as session:
+        first, second = (row.id for row in _channel_rows(session, channel_id))
+        for voter, reaction_type in zip(voters, [ReactionType.LIKE, ReactionType.LIKE,
+                                                 ReactionType.DISLIKE]):
+            session.add(PostReaction(post_id=first, user_id=voter.id, reaction_type=reaction_type))
+            apply_reaction_change(session, first, None, reaction_type)
+        session.add(SavedPost(post_id=second, user_id=user_id))
+        session.commit()
+
+        posts = {p.id: p for p in build_posts_with_author(
+            session, _channel_rows(session, channel_id), user_id)}
+
+    assert (posts[first].like_count, posts[first].dislike_count) == (2, 1)
+    assert (posts[second].like_count, posts[second].dislike_count) == (0, 0)
+    assert not posts[first].is_saved
+    assert posts[second].is_saved
+
+
+def test_recount_repairs_drifted_counters(db_engine, seed_posts_with_files, make_user):
+    _, channel_id = seed_posts_with_files(1)
+    voter = make_user()
+    with Session(db_engine) as session:
+        post = session.exec(select(Post).where(Post.channel_id == channel_id)).one()
+        session.add(PostReaction(post_id=post.id, user_id=voter.id, reaction_type=ReactionType.LIKE))
+        post.dislike_count = 5  # counters out of step with PostReaction
+        session.add(post)
+        session.commit()
+
+        updated_at = post.updated_at
+        assert recount_reactions(session, [post.id]) == 1
+        session.refresh(post)
+
+    assert (post.like_count, post.dislike_count) == (1, 0)
+    assert post.updated_at == updated_at
+
+
+def test_reactions_leave_updated_at_alone(db_engine, seed_posts_with_files, make_user):
+    _, channel_id = seed_posts_with_files(1)
+    voter = make_user()
+    with Session(db_engine) as session:
+        post = session.exec(select(Post).where(Post.channel_id == channel_id)).one()
+        updated_at = post.updated_at
+        session.add(PostReaction(post_id=post.id, user_id=voter.id, reaction_type=ReactionType.LIKE))
+        apply_reaction_change(session, post.id, None, ReactionType.LIKE)
+        session.commit()
+        apply_reaction_change(session, post.id, ReactionType.LIKE, ReactionType.DISLIKE)
+        session.commit()
+        session.refresh(post)
+
+    assert (post.like_count, post.dislike_count) == (0, 1)
+    assert post.updated_at == updated_at
@@ -0,0 +1,104 @@
+"""
+Tests for the background re-moderation scan.
+"""
+
+import datetime as dt
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.main import app
+from app.models import Comment, FlaggedWord, ModerationScan, Post
+from app.core.jobs import wait_for_local_jobs
+from app.core.moderation import (
+    RESCAN_STALE_AFTER_S,
+    invalidate_matcher,
+    run_rescan,
+    start_rescan,
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def seed(db_engine, make_user, make_channel):
+    def make(word: str):
+        user = make_user()
+        channel_id, _ = make_channel(user)
+        with Session(db_engine) as session:
+            posts = [
+                Post(title=f"p{i}", content=f"text {word}" if i % 2 else "clean text",
+                     channel_id=channel_id, author_id=user.id)
+                for i in range(5)
+            ]
+            session.add_all(posts)
+            session.commit()
+            comment = Comment(content=f"{word}!", post_id=posts[0].id, author_id=user.id)
+            session.add(comment)
+            session.add(FlaggedWord(word=word))
+            session.commit()
+            invalidate_matcher()
+            return [p.id for p in posts], comment.id
+    return make
+
+
+def test_rescan_flags_existing_posts_and_comments(db_engine, seed):
+    word = f"w{uuid4().hex[:8]}"
+    post_ids, comment_id = seed(word)
+    with Session(db_engine) as session:
+        scan_id = start_rescan(session, reason="test").id
+    wait_for_local_jobs()
+
+    with Session(db_engine) as session:
+        scan = session.get(ModerationScan, scan_id)
+        assert scan.status == "done"
+        assert scan.posts_scanned == scan.posts_total
+        flagged = [pid for pid in post_ids if session.get(Post, pid).flagged]
+        assert flagged == post_ids[1::2]
+        assert session.get(Post, post_ids[1]).flag_reason == word
+        assert session.get(Comment, comment_id).flagged
+
+
+def test_rescan_resumes_after_last_finished_batch(db_engine, seed):
+    word = f"w{uuid4().hex[:8]}"
+    post_ids, _ = seed(word)
+    with Session(db_engine) as session:
+        # pretend an earlier run got as far as the third post, then died
+        scan = ModerationScan(status="failed", last_post_id=post_ids[2])
+        session.add(scan)
+        session.commit()
+        scan_id = scan.id
+
+    run_rescan(scan_id, batch_size=2)
+
+    with Session(db_engine) as session:
+        assert session.get(ModerationScan, scan_id).status == "done"
+        assert not session.get(Post, post_ids[1]).flagged   # before the resume point
+        assert session.get(Post, post_ids[3]).flagged
+
+
+def test_running_scan_is_not_resumed_until_it_stalls(db_engine, make_user, auth_headers):
+    headers = auth_headers(make_user(role="moderator"))
+    with Session(db_engine) as session:
+        scan = ModerationScan(status="running")
+        session.add(scan)
+        session.commit()
+        scan_id = scan.id
+
+    url = f"/flagged-words/rescans/{scan_id}/resume"
+    assert client.post(url, headers=headers).status_code == 409
+    run_rescan(scan_id)  # a duplicate job leaves a running scan alone
+    with Session(db_engine) as session:
+        assert session.get(ModerationScan, scan_id).posts_scanned == 0
+
+        # no progress for longer than the stale limit: the worker died
+        scan = session.get(ModerationScan, scan_id)
+        scan.updated_at = dt.datetime.utcnow() - dt.timedelta(seconds=RESCAN_STALE_AFTER_S + 1)
+        session.add(scan)
+        session.commit()
+    assert client.post(url, headers=headers).status_code == 202
+    wait_for_local_jobs()
+    with Session(db_engine) as session:
+        assert session.get(ModerationScan, scan_id).status == "done"
@@ -0,0 +1,84 @@
+"""
+Tests for the response cache on public read endpoints.
+"""
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core import response_cache
+from app.core.pagination import NEXT_CURSOR_HEADER
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "_backend", response_cache.InProcessCache())
+    response_cache.stats.reset()
+
+
+@pytest.fixture
+def seed(make_user, make_channel, auth_headers):
+    def make(n_posts: int = 1, role: str = "user"):
+        user = make_user(role=role)
+        channel_id, post_ids = make_channel(user, n_posts=n_posts)
+        return auth_headers(user), channel_id, post_ids
+    return make
+
+
+def test_reaction_counts_are_cached_until_a_reaction_changes(seed):
+    headers, _, (post_id,) = seed()
+    url = f"/reactions/post/{post_id}/counts"
+    assert client.get(url).headers["x-cache"] == "MISS"
+    cached = client.get(url)
+    assert cached.headers["x-cache"] == "HIT"
+    assert cached.json() == {"like_count": 0, "dislike_count": 0}
+
+    client.post("/reactions/", json={"post_id": post_id, "reaction_type": "like"}, headers=headers)
+    fresh = client.get(url)
+    assert fresh.headers["x-cache"] == "MISS"
+    assert fresh.json()["like_count"] == 1
+
+
+def test_listing_hits_keep_the_cursor_and_writes_invalidate_the_channel(seed):
+    headers, channel_id, _ = seed(3)
+    url = f"/channels/{channel_id}/posts"
+    first = client.get(url, params={"limit": 2})
+    hit = client.get(url, params={"limit": 2})
+    assert hit.headers["x-cache"] == "HIT"
+    assert hit.headers[NEXT_CURSOR_HEADER] == first.headers[NEXT_CURSOR_HEADER]
+    assert hit.json() == first.json()
+
+    client.post("/posts/", json={"title": "new", "content": "c", "channel_id": channel_id},
+                headers=headers)
+    after = client.get(url, params={"limit": 2})
+    assert after.headers["x-cache"] == "MISS"
+    assert after.json()[0]["title"] == "new"
+
+
+def test_signed_in_viewers_bypass_the_cache(seed):
+    headers, channel_id, _ = seed()
+    for _ in range(2):
+        response = client.get(f"/channels/{channel_id}/posts", headers=headers)
+        assert "x-cache" not in response.headers
+
+
+def test_response_computed_before_an_invalidation_is_never_served():
+    request = Request({"type": "http", "method": "GET", "path": "/posts/",
+                       "query_string": b"", "headers": []})
+    tags = [response_cache.posts_tag()]
+    stale = response_cache.lookup(request, tags)
+    response_cache.invalidate(*tags)  # a write commits meanwhile
+    stale.store(["old"])
+    assert response_cache.lookup(request, tags).response is None
+
+
+def test_metrics_report_hits_and_misses(seed):
+    headers, _, (post_id,) = seed(role="moderator")
+    for _ in range(3):
+        client.get(f"/reactions/post/{post_id}/counts")
+    metrics = client.get("/metrics/cache", headers=headers).json()
+    assert (metrics["hits"], metrics["misses"]) == (2, 1)
+    assert metrics["routes"]["/reactions/post/{post_id}/counts"]["hits"] == 2
@@ -0,0 +1,67 @@
+"""
+Tests for the full-text search index over posts and channels.
+"""
+
+from uuid import uuid4
+
+import pytest
+from sqlmodel import Session
+
+from app.models import Post
+from app.core import search
+
+
+@pytest.fixture
+def seeded(make_user, make_channel):
+    user = make_user()
+    channel_id, _ = make_channel(user, name=f"Thermodynamics {uuid4().hex[:6]}",
+                                 bio="heat and entropy")
+    return user.id, channel_id
+
+
+def test_post_search_ranks_title_matches_and_matches_prefixes(db_engine, seeded):
+    user_id, channel_id = seeded
+    word = f"zeta{uuid4().hex[:6]}"
+    with Session(db_engine) as session:
+        body_hit = Post(title="Notes", content=f"mentions {word} once",
+                        channel_id=channel_id, author_id=user_id)
+        title_hit = Post(title=f"All about {word}", content="details",
+                         channel_id=channel_id, author_id=user_id)
+        session.add_all([body_hit, title_hit])
+        session.commit()
+
+        results = search.search_posts(session, word[:7], limit=10)
+
+    assert [p.id for p in results] == [title_hit.id, body_hit.id]
+
+
+def test_post_index_follows_updates_and_deletes(db_engine, seeded):
+    user_id, channel_id = seeded
+    old, new = f"old{uuid4().hex[:6]}", f"new{uuid4().hex[:6]}"
+    with Session(db_engine) as session:
+        post = Post(title=old, content="x", channel_id=channel_id, author_id=user_id)
+        session.add(post)
+        session.commit()
+        assert [p.id for p in search.search_posts(session, old, limit=10)] == [post.id]
+
+        post.title = new
+        session.add(post)
+        session.commit()
+        assert search.search_posts(session, old, limit=10) == []
+        assert [p.id for p in search.search_posts(session, new, limit=10)] == [post.id]
+
+        session.delete(post)
+        session.commit()
+        assert search.search_posts(session, new, limit=10) == []
+
+
+def test_channel_search_uses_name_and_bio(db_engine, seeded):
+    _, channel_id = seeded
+    with Session(db_engine) as session:
+        ids = [c.id for c in search.search_channels(session, "entro", limit=100)]
+    assert channel_id in ids
+
+
+def test_punctuation_only_query_returns_nothing(db_engine):
+    with Session(db_engine) as session:
+        assert search.search_posts(session, '"*()', limit=10) == []
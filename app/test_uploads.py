@@ -0,0 +1,225 @@
+"""
+Tests for the streaming upload pipeline and the deduplicated blob store.
+"""
+
+import hashlib
+import io
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, insert, select
+
+from app.main import app
+from app.api import files as files_api
+from app.models import Channel, Comment, MediaBlob, MediaFile, Post, User
+from app.models.association_tables import channel_user_link
+from app.core import storage
+from app.core.jobs import wait_for_local_jobs
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(storage, "BLOB_DIR", tmp_path / "blobs")
+    monkeypatch.setattr(storage, "TMP_DIR", tmp_path / "tmp")
+    monkeypatch.setattr(storage, "VARIANT_DIR", tmp_path / "variants")
+    monkeypatch.setattr(files_api, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def upload(auth_headers):
+    def post(user: User, name: str, body: bytes, post_id=None, mime_type="text/plain"):
+        return client.post(
+            "/api/files/upload",
+            files={"files": (name, body, mime_type)},
+            data={"post_id": str(post_id)} if post_id else None,
+            headers=auth_headers(user),
+        )
+    return post
+
+
+def test_upload_streams_to_disk_with_hash(upload_dir, upload, make_user):
+    body = b"x" * (storage.CHUNK_SIZE * 2 + 17)  # spans several chunks
+    response = upload(make_user(), "../notes.txt", body)
+    assert response.status_code == 200
+    mf = response.json()[0]
+    sha256 = hashlib.sha256(body).hexdigest()
+    assert (mf["size"], mf["sha256"]) == (len(body), sha256)
+    # client-supplied directories are dropped from the stored name
+    assert mf["original_name"] == "notes.txt"
+    assert (upload_dir / mf["filename"]).read_bytes() == body
+    assert mf["filename"] == f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+    assert not list((upload_dir / "tmp").iterdir())
+
+    served = client.get(f"/api/files/{mf['id']}")
+    assert served.content == body
+    assert 'filename="notes.txt"' in served.headers["content-disposition"]
+
+
+def test_oversized_upload_is_rejected_and_cleaned_up(upload_dir, upload, make_user, monkeypatch):
+    monkeypatch.setattr(storage, "MAX_UPLOAD_BYTES", 10)
+    response = upload(make_user(), "big.bin", b"y" * 11)
+    assert response.status_code == 400
+    assert not [p for p in upload_dir.rglob("*") if p.is_file()]
+
+
+def test_identical_uploads_share_one_blob_until_last_reference(upload_dir, upload, db_engine,
+                                                               make_user, make_channel,
+                                                               auth_headers):
+    user = make_user()
+    _, post_ids = make_channel(user, n_posts=2)
+
+    body = uuid4().bytes * 100
+    first, second = (upload(user, f"copy{i}.txt", body, post_id).json()[0]
+                     for i, post_id in enumerate(post_ids))
+    assert first["filename"] == second["filename"]
+    blob_path = upload_dir / first["filename"]
+    with Session(db_engine) as session:
+        assert session.get(MediaBlob, first["sha256"]).ref_count == 2
+
+    assert client.delete(f"/posts/{post_ids[0]}", headers=auth_headers(user)).status_code == 200
+    wait_for_local_jobs()
+    assert blob_path.exists()
+
+    assert client.delete(f"/posts/{post_ids[1]}", headers=auth_headers(user)).status_code == 200
+    wait_for_local_jobs()
+    assert not blob_path.exists()
+    with Session(db_engine) as session:
+        assert session.get(MediaBlob, first["sha256"]) is None
+        assert session.get(MediaFile, second["id"]) is None
+
+
+def test_channel_delete_cascades_in_a_bounded_number_of_statements(upload_dir, upload, db_engine,
+                                                                  make_user, make_channel,
+                                                                  auth_headers, capture_statements):
+    owner = make_user()
+    channel_id, post_ids = make_channel(owner, n_posts=5)
+    with Session(db_engine) as session:
+        for post_id in post_ids:
+            session.add(Comment(content="hi", post_id=post_id, author_id=owner.id))
+        session.exec(insert(channel_user_link).values(channel_id=channel_id, user_id=owner.id))
+        session.commit()
+    uploads = [upload(owner, f"f{i}.txt", uuid4().bytes, post_id).json()[0]
+               for i, post_id in enumerate(post_ids)]
+
+    with capture_statements() as statements:
+        response = client.delete(f"/channels/{channel_id}", headers=auth_headers(owner))
+    assert response.status_code == 200
+    # one per table, however many posts; blob purging runs as a separate job
+    deletes = [s.split()[2] for s in statements if s.lstrip().upper().startswith("DELETE")]
+    assert sorted(t for t in deletes if t not in ("mediablob", "mediavariant")) == sorted(
+        ["comment", "mediafile", "postreaction", "savedpost", "posttag", "post",
+         "channel_user_link", "channel"])
+
+    wait_for_local_jobs()
+    with Session(db_engine) as session:
+        assert session.get(Channel, channel_id) is None
+        assert not session.exec(select(Post).where(Post.channel_id == channel_id)).all()
+        assert not session.exec(select(Comment).where(Comment.post_id.in_(post_ids))).all()
+        assert not session.exec(select(channel_user_link)
+                                .where(channel_user_link.c.channel_id == channel_id)).all()
+        assert all(session.get(MediaBlob, f["sha256"]) is None for f in uploads)
+    assert not any((upload_dir / f["filename"]).exists() for f in uploads)
+
+
+def test_dedupe_moves_legacy_uploads_into_blob_store(upload_dir, db_engine):
+    body = uuid4().bytes
+    with Session(db_engine) as session:
+        for _ in range(2):
+            folder = upload_dir / str(uuid4())
+            folder.mkdir()
+            (folder / "old.txt").write_bytes(body)
+            session.add(MediaFile(filename=f"{folder.name}/old.txt", mime_type="text/plain",
+                                  size=len(body)))
+        session.commit()
+
+        moved, freed = storage.dedupe_uploads(session)
+        assert (moved, freed) == (2, len(body))
+        sha256 = hashlib.sha256(body).hexdigest()
+        assert session.get(MediaBlob, sha256).ref_count == 2
+    # the emptied per-upload folders are gone
+    assert [p.name for p in upload_dir.iterdir()] == ["blobs"]
+
+
+def test_serve_file_conditional_get_and_ranges(upload, make_user):
+    body = bytes(range(256)) * 4
+    mf = upload(make_user(), "clip.bin", body).json()[0]
+    url = f"/api/files/{mf['id']}"
+
+    full = client.get(url)
+    assert full.headers["etag"] == f'"{mf["sha256"]}"'
+    # ids can be reused, so the id route revalidates instead of caching forever
+    assert full.headers["cache-control"] == "no-cache"
+
+    assert client.get(url, headers={"If-None-Match": full.headers["etag"]}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": f'"other", W/{full.headers["etag"]}'}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+    assert client.get(url, headers={"If-Modified-Since": full.headers["last-modified"]}).status_code == 304
+    # If-None-Match wins over If-Modified-Since
+    assert client.get(url, headers={"If-None-Match": '"other"',
+                                    "If-Modified-Since": full.headers["last-modified"]}).status_code == 200
+
+    single = client.get(url, headers={"Range": "bytes=10-19"})
+    assert single.status_code == 206
+    assert single.content == body[10:20]
+    assert single.headers["content-range"] == f"bytes 10-19/{len(body)}"
+
+    multi = client.get(url, headers={"Range": "bytes=0-3,100-103"})
+    assert multi.status_code == 206
+    assert multi.headers["content-type"].startswith("multipart/byteranges")
+    assert int(multi.headers["content-length"]) == len(multi.content)
+    boundary = multi.headers["content-type"].split("boundary=")[1]
+    parts = multi.content.split(f"--{boundary}".encode())
+    assert parts[-1] == b"--\r\n"
+    assert [p.split(b"\r\n\r\n", 1)[1] for p in parts[1:-1]] == [body[0:4] + b"\r\n",
+                                                                body[100:104] + b"\r\n"]
+
+    stale = client.get(url, headers={"Range": "bytes=0-3", "If-Range": '"stale"'})
+    assert (stale.status_code, stale.content) == (200, body)
+
+
+def test_image_upload_gets_thumbnails_in_the_post_listing(upload_dir, upload, db_engine, make_user,
+                                                          make_channel, auth_headers):
+    Image = pytest.importorskip("PIL.Image")
+    buf = io.BytesIO()
+    Image.new("RGB", (400, 200), (200, 30, 30)).save(buf, "PNG")
+    user = make_user()
+    _, (post_id,) = make_channel(user, n_posts=1)
+    mf = upload(user, "red.png", buf.getvalue(), post_id, "image/png").json()[0]
+    wait_for_local_jobs()
+
+    post = client.get(f"/posts/{post_id}", headers=auth_headers(user)).json()
+    variants = post["files"][0]["variants"]
+    # the original is 400px wide, so only the narrower widths are made
+    assert [(v["kind"], v["width"], v["height"]) for v in variants] == [
+        ("thumbnail", 160, 80), ("thumbnail", 320, 160)
+    ]
+    # variant URLs point at the /files static mount over the upload dir
+    thumb = upload_dir / variants[0]["url"].removeprefix("/files/")
+    assert Image.open(thumb).size == (160, 80)
+
+    # deleting the only reference removes the variants with the blob
+    assert client.delete(f"/posts/{post_id}", headers=auth_headers(user)).status_code == 200
+    wait_for_local_jobs()
+    assert not (upload_dir / "variants" / mf["sha256"][:2] / mf["sha256"][2:4] / mf["sha256"]).exists()
+    with Session(db_engine) as session:
+        assert session.get(MediaBlob, mf["sha256"]) is None
+
+
+def test_pdf_upload_gets_first_page_preview(upload, make_user, make_channel, auth_headers):
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    doc.new_page(width=300, height=400)
+    user = make_user()
+    _, (post_id,) = make_channel(user, n_posts=1)
+    upload(user, "doc.pdf", doc.tobytes(), post_id, "application/pdf")
+    wait_for_local_jobs()
+
+    post = client.get(f"/posts/{post_id}", headers=auth_headers(user)).json()
+    [preview] = post["files"][0]["variants"]
+    assert (preview["kind"], preview["mime_type"]) == ("preview", "image/png")
+    assert (preview["width"], preview["height"]) == (640, 854)
@@ -122,7 +122,7 @@ function App() {
       }
 
       // Fetch all channels
-      const channelsResponse = await fetch(`${API}/channels/`, {
+      const channelsResponse = await fetch(`${API}/channels/?joined=true&limit=100`, {
         headers: { Authorization: `Bearer ${token}` },
       });
       if (channelsResponse.ok) {
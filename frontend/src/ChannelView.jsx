@@ -4,7 +4,9 @@ import './ChannelView.css';
 export default function ChannelView({ channelId, onPostClick, onBack, userRole, currentUser }) {
   const [channel, setChannel] = useState(null);
   const [posts, setPosts] = useState([]);
+  const [postsCursor, setPostsCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const [leaving, setLeaving] = useState(false);
   const [editing, setEditing] = useState(false);
@@ -48,22 +50,27 @@ export default function ChannelView({ channelId, onPostClick, onBack, userRole,
     }
   };
 
-  const fetchChannelPosts = async () => {
+  // Posts come a page at a time, newest first; pass the cursor from the
+  // previous page to append the next one.
+  const fetchChannelPosts = async (cursor = null) => {
+    const setBusy = cursor ? setLoadingMore : setLoading;
     try {
-      setLoading(true);
-      const response = await fetch(`${API}/channels/${channelId}/posts`, {
+      setBusy(true);
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`${API}/channels/${channelId}/posts${query}`, {
         headers: { Authorization: `Bearer ${token}` },
       });
       
       if (!response.ok) throw new Error('Failed to fetch posts');
       
       const data = await response.json();
-      setPosts(data);
+      setPosts((prev) => (cursor ? [...prev, ...data] : data));
+      setPostsCursor(response.headers.get('X-Next-Cursor'));
     } catch (err) {
       console.error('Error fetching posts:', err);
       setError(err.message);
     } finally {
-      setLoading(false);
+      setBusy(false);
     }
   };
 
@@ -210,7 +217,7 @@ export default function ChannelView({ channelId, onPostClick, onBack, userRole,
                   <h1 className="channel-title">{channel.name}</h1>
                   {channel.bio && <p className="channel-bio">{channel.bio}</p>}
                   <div className="channel-meta">
-                    <span className="post-count">{posts.length} posts</span>
+                    <span className="post-count">{posts.length}{postsCursor ? '+' : ''} posts</span>
                     <span className="created-date">
                       Created {formatDate(channel.created_at)}
                     </span>
@@ -300,6 +307,15 @@ export default function ChannelView({ channelId, onPostClick, onBack, userRole,
             ))}
           </div>
         )}
+        {postsCursor && (
+          <button
+            className="load-more-posts"
+            onClick={() => fetchChannelPosts(postsCursor)}
+            disabled={loadingMore}
+          >
+            {loadingMore ? 'Loading...' : 'Load more posts'}
+          </button>
+        )}
       </div>
     </div>
   );
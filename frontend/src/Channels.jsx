@@ -40,7 +40,9 @@ const EmptyIcon = () => (
 
 export default function Channels({ onChannelClick, onCreateClick, view, userRole }) {
   const [channels, setChannels] = useState([]);
+  const [channelsCursor, setChannelsCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const [joining, setJoining] = useState(null);
   const [editingId, setEditingId] = useState(null);
@@ -53,16 +55,32 @@ export default function Channels({ onChannelClick, onCreateClick, view, userRole
   const userId = parseInt(localStorage.getItem('user_id'));
   const API = import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000';
 
-  useEffect(() => {
-    setLoading(true);
+  // Channels come a page at a time; pass the cursor from the previous page
+  // to append the next one. "Your Channels" asks the server for joined ones
+  // so later pages are not filtered away client-side.
+  const fetchChannels = (cursor = null) => {
+    const setBusy = cursor ? setLoadingMore : setLoading;
+    const params = new URLSearchParams();
+    if (view === 'your') params.set('joined', 'true');
+    if (cursor) params.set('cursor', cursor);
+    const query = params.toString() ? `?${params}` : '';
+    setBusy(true);
     setError(null);
-    fetch(`${API}/channels/`, {
+    fetch(`${API}/channels/${query}`, {
       headers: { Authorization: `Bearer ${token}` },
     })
-      .then(res => res.json())
-      .then(data => setChannels(data))
+      .then(res => {
+        if (!res.ok) throw new Error('Failed to fetch channels');
+        setChannelsCursor(res.headers.get('X-Next-Cursor'));
+        return res.json();
+      })
+      .then(data => setChannels(prev => (cursor ? [...prev, ...data] : data)))
       .catch(err => setError(err.message))
-      .finally(() => setLoading(false));
+      .finally(() => setBusy(false));
+  };
+
+  useEffect(() => {
+    fetchChannels();
   }, [joining, view]);
 
   const handleJoin = async (channelId) => {
@@ -240,6 +258,15 @@ export default function Channels({ onChannelClick, onCreateClick, view, userRole
           </div>
         ))}
       </div>
+      {channelsCursor && (
+        <button
+          className="load-more-channels"
+          onClick={() => fetchChannels(channelsCursor)}
+          disabled={loadingMore}
+        >
+          {loadingMore ? 'Loading...' : 'Load more channels'}
+        </button>
+      )}
     </div>
   );
 }
@@ -49,14 +49,14 @@ function PostDetail({ post, onClose }) {
                   <div className="file-preview">
                     {file.mime_type?.startsWith('image/') ? (
                       <img 
-                        src={`${API}/files/${file.filename}`} 
-                        alt={file.filename.split('/').pop()}
+                        src={`${API}/api/files/${file.id}`} 
+                        alt={file.original_name}
                         className="file-preview-image"
                       />
                     ) : file.mime_type === 'application/pdf' ? (
                       <iframe
-                        src={`${API}/files/${file.filename}`}
-                        title={file.filename.split('/').pop()}
+                        src={`${API}/api/files/${file.id}`}
+                        title={file.original_name}
                         className="file-preview-pdf"
                         width="100%"
                         height="200px"
@@ -75,12 +75,12 @@ function PostDetail({ post, onClose }) {
                     )}
                   </div>
                   <div className="file-info">
-                    <span className="file-name">{file.filename.split('/').pop()}</span>
+                    <span className="file-name">{file.original_name}</span>
                     <span className="file-size">
                       {formatFileSize(file.size)}
                     </span>
                     <a
-                      href={`${API}/files/${file.filename}`}
+                      href={`${API}/api/files/${file.id}`}
                       target="_blank"
                       rel="noopener noreferrer"
                       className="download-button"
@@ -11,6 +11,8 @@ export default function PostDetailView({ postId, onBack, onSaveChange, userRole
   const [commentText, setCommentText] = useState('');
   const [comments, setComments] = useState([]);
   const [commentsLoading, setCommentsLoading] = useState(false);
+  const [commentsCursor, setCommentsCursor] = useState(null);
+  const [commentCount, setCommentCount] = useState(0);
   const [reactionLoading, setReactionLoading] = useState(false);
   const [isSaved, setIsSaved] = useState(false);
   const [saveLoading, setSaveLoading] = useState(false);
@@ -56,6 +58,7 @@ export default function PostDetailView({ postId, onBack, onSaveChange, userRole
       
       const data = await response.json();
       setPost(data);
+      setCommentCount(data.comment_count);
     } catch (err) {
       console.error('Error fetching post:', err);
       setError(err.message);
@@ -64,16 +67,20 @@ export default function PostDetailView({ postId, onBack, onSaveChange, userRole
     }
   };
 
-  const fetchComments = async () => {
+  // Comments come a page at a time, oldest first; pass the cursor from
+  // the previous page to append the next one.
+  const fetchComments = async (cursor = null) => {
     try {
       setCommentsLoading(true);
-      const response = await fetch(`${API}/comments/post/${postId}`, {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`${API}/comments/post/${postId}${query}`, {
         headers: { Authorization: `Bearer ${token}` },
       });
       
       if (response.ok) {
         const data = await response.json();
-        setComments(data);
+        setComments((prev) => (cursor ? [...prev, ...data] : data));
+        setCommentsCursor(response.headers.get('X-Next-Cursor'));
       }
     } catch (err) {
       console.error('Error fetching comments:', err);
@@ -237,8 +244,16 @@ export default function PostDetailView({ postId, onBack, onSaveChange, userRole
       if (response.ok) {
         const newComment = await response.json();
         setCommentText('');
-        setComments((prev) => [...prev, newComment]);
-        fetchComments(); // Optionally refresh to get author info
+        // The thread is oldest first, so the new comment belongs at the end;
+        // while later pages are still unloaded it arrives with the last one.
+        if (!commentsCursor) {
+          setComments((prev) => [...prev, {
+            ...newComment,
+            author_username: currentUser?.username,
+            author_email: currentUser?.email,
+          }]);
+        }
+        setCommentCount((count) => count + 1);
       } else {
         console.error('Failed to post comment');
       }
@@ -406,14 +421,14 @@ export default function PostDetailView({ postId, onBack, onSaveChange, userRole
                       <div className="attachment-preview">
                         {file.mime_type?.startsWith('image/') ? (
                           <img
-                            src={`${API}/files/${file.filename}`}
-                            alt={file.filename.split('/').pop()}
+                            src={`${API}/api/files/${file.id}`}
+                            alt={file.original_name}
                             className="attachment-image"
                           />
                         ) : file.mime_type === 'application/pdf' ? (
                           <iframe
-                            src={`${API}/files/${file.filename}`}
-                            title={file.filename.split('/').pop()}
+                            src={`${API}/api/files/${file.id}`}
+                            title={file.original_name}
                             className="file-preview-pdf"
                             width="100%"
                             height="200px"
@@ -432,10 +447,10 @@ export default function PostDetailView({ postId, onBack, onSaveChange, userRole
                         )}
                       </div>
                       <div className="attachment-info" style={{ marginTop: 16 }}>
-                        <span className="file-name">{file.filename.split('/').pop()}</span>
+                        <span className="file-name">{file.original_name}</span>
                         <span className="file-size">{formatFileSize(file.size)}</span>
                         <a
-                          href={`${API}/files/${file.filename}`}
+                          href={`${API}/api/files/${file.id}`}
                           target="_blank"
                           rel="noopener noreferrer"
                           className="download-link"
@@ -482,14 +497,14 @@ export default function PostDetailView({ postId, onBack, onSaveChange, userRole
                 <svg viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="2">
                   <path d="M21 15a2 2 0 0 1-2 2H7l-4 4V5a2 2 0 0 1 2-2h14a2 2 0 0 1 2 2z" />
                 </svg>
-                <span>{comments.length}</span>
+                <span>{commentCount}</span>
               </button>
             </div>
           </div>
         </article>
 
         <div className="comments-section">
-          <h3>Comments ({comments.length})</h3>
+          <h3>Comments ({commentCount})</h3>
           
           <form onSubmit={handleComment} className="comment-form">
             <div className="comment-input-container">
@@ -534,6 +549,11 @@ export default function PostDetailView({ postId, onBack, onSaveChange, userRole
             {!commentsLoading && comments.length === 0 && (
               <div className="no-comments">No comments yet. Be the first to comment!</div>
             )}
+            {!commentsLoading && commentsCursor && (
+              <button className="load-more-comments" onClick={() => fetchComments(commentsCursor)}>
+                Load more comments
+              </button>
+            )}
           </div>
         </div>
       </div>
@@ -52,7 +52,7 @@ function Result({ searchQuery, searchType, results = [], onBack, onChannelClick
                     {post.files.map((file) => (
                       <a
                         key={file.id}
-                        href={`${import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000'}/files/${file.filename}`}
+                        href={`${import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000'}/api/files/${file.id}`}
                         target="_blank"
                         rel="noopener noreferrer"
                         className="file-link"
@@ -65,7 +65,7 @@ function Result({ searchQuery, searchType, results = [], onBack, onChannelClick
                           <path d="M16 17H8" />
                           <path d="M10 9H8" />
                         </svg>
-                        {file.filename.split('/').pop()}
+                        {file.original_name}
                       </a>
                     ))}
                   </div>
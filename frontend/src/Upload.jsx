@@ -21,22 +21,34 @@ export default function Upload() {
     setError(null);
     console.log('Fetching channels...');
     
-    fetch(`${API}/channels/`, {
-      headers: { Authorization: `Bearer ${token}` },
-    })
-      .then(res => {
+    // The picker needs every channel the user can post to, so follow
+    // X-Next-Cursor until the last page.
+    const fetchJoinedChannels = async () => {
+      const all = [];
+      let cursor = null;
+      do {
+        const params = new URLSearchParams({ joined: 'true' });
+        if (cursor) params.set('cursor', cursor);
+        const res = await fetch(`${API}/channels/?${params}`, {
+          headers: { Authorization: `Bearer ${token}` },
+        });
         if (!res.ok) {
           throw new Error(`HTTP error! status: ${res.status}`);
         }
-        return res.json();
-      })
+        cursor = res.headers.get('X-Next-Cursor');
+        all.push(...(await res.json()));
+      } while (cursor);
+      return all;
+    };
+
+    fetchJoinedChannels()
       .then(data => {
         console.log('Fetched channels:', data);
         setChannels(data);
         if (data.length > 0) {
           setSelectedChannel(String(data[0].id));
         } else {
-          setError('You need to create a channel first before posting.');
+          setError('You need to create or join a channel first before posting.');
         }
       })
       .catch(err => {